@@ -0,0 +1,303 @@
+import asyncio
+import json
+import math
+import os
+import sqlite3
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Expected completion tokens per admitted route, added to the prompt estimate
+ROUTE_OUTPUT_TOKENS = {
+    "/api/career-advice": 800,
+    "/api/career-advice/stream": 800,
+    "/api/resume/process": 2500,
+    "/api/resume/process/stream": 2500,
+    "/api/resume/generate-portfolio": 8000,
+    "/api/resume/generate-ats": 1500,
+    "/api/resume/generate-ats/batch": 7500,
+    "/api/resume/generate-cover-letter": 1000,
+    "/api/resume/generate-cover-letter/stream": 1000,
+}
+# Requests without a Content-Length are assumed to carry this many prompt tokens
+DEFAULT_PROMPT_TOKENS = 2000
+# Prompt tokens for file upload routes, whose body size is the file's, not the prompt's:
+# only the text extracted from the file reaches the LLM
+ROUTE_UPLOAD_PROMPT_TOKENS = {
+    "/api/resume/process": 3000,
+    "/api/resume/process/stream": 3000,
+}
+
+
+class Clock:
+    """Monotonic time and sleeping, replaceable by :class:`FakeClock` in tests."""
+
+    def now(self) -> float:
+        return time.monotonic()
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+
+class FakeClock(Clock):
+    """Clock that only moves when advanced; sleeping advances it instantly."""
+
+    def __init__(self, start: float = 0.0):
+        self.time = start
+
+    def now(self) -> float:
+        return self.time
+
+    def advance(self, seconds: float) -> None:
+        self.time += seconds
+
+    async def sleep(self, seconds: float) -> None:
+        self.advance(seconds)
+        await asyncio.sleep(0)
+
+
+class InMemoryBucketStore:
+    """Token bucket levels keyed by bucket name, as ``(tokens, updated_at)``."""
+
+    def __init__(self):
+        self.buckets: Dict[str, Tuple[float, float]] = {}
+
+    def get(self, key: str) -> Optional[Tuple[float, float]]:
+        return self.buckets.get(key)
+
+    def set(self, key: str, tokens: float, updated_at: float) -> None:
+        self.buckets[key] = (tokens, updated_at)
+
+    def transaction(self):
+        # Nothing is awaited between a check and its charge, so within one process this is atomic
+        return nullcontext()
+
+
+class SQLiteBucketStore:
+    """Token bucket levels in a SQLite file, shared by the worker processes of one host.
+
+    Checks and charges run inside :meth:`transaction`, which holds the
+    database write lock, so two workers cannot spend the same tokens. The
+    transactions are a few row reads and writes on a local file and run on
+    the event loop. Levels are stamped with the monotonic clock, which is
+    system-wide, so the file must not outlive a reboot (``run.py`` puts it
+    in a fresh directory per server start).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL, updated_at REAL)")
+
+    def get(self, key: str) -> Optional[Tuple[float, float]]:
+        return self._conn.execute("SELECT tokens, updated_at FROM buckets WHERE key = ?", (key,)).fetchone()
+
+    def set(self, key: str, tokens: float, updated_at: float) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                           (key, tokens, updated_at))
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+
+BucketStore = Union[InMemoryBucketStore, SQLiteBucketStore]
+
+
+class TokenBucket:
+    """Buckets of ``capacity`` tokens refilled at ``rate`` tokens per second, one per key."""
+
+    def __init__(self, name: str, rate: float, capacity: float, store: BucketStore, clock: Clock):
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self.store = store
+        self.clock = clock
+
+    def _level(self, key: str) -> float:
+        state = self.store.get(f"{self.name}:{key}")
+        if state is None:
+            return self.capacity
+        tokens, updated_at = state
+        return min(self.capacity, tokens + (self.clock.now() - updated_at) * self.rate)
+
+    def wait_time(self, key: str, cost: float) -> float:
+        """Seconds until ``cost`` tokens are available for ``key``; 0 when they are now."""
+        missing = min(cost, self.capacity) - self._level(key)
+        return max(0.0, missing / self.rate)
+
+    def take(self, key: str, cost: float) -> None:
+        self.store.set(f"{self.name}:{key}", self._level(key) - min(cost, self.capacity), self.clock.now())
+
+
+class RateLimited(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Admits LLM-backed requests against per-user, per-IP and global token-per-minute budgets.
+
+    A request that does not fit waits for up to ``max_wait`` seconds; if it
+    would have to wait longer, or ``max_queue`` requests are already
+    waiting, it is rejected with the time after which it would fit.
+
+    Budgets are per process with the default in-memory store; with several
+    workers, pass a :class:`SQLiteBucketStore` (``ADMISSION_STORE_PATH``)
+    so they share one set of buckets.
+    """
+
+    def __init__(
+        self,
+        user_per_minute: float = 20,
+        user_burst: float = 5,
+        ip_per_minute: float = 60,
+        ip_burst: float = 15,
+        tokens_per_minute: float = 0,
+        max_wait: float = 10.0,
+        max_queue: int = 100,
+        store: Optional[BucketStore] = None,
+        clock: Optional[Clock] = None,
+    ):
+        self.store = store or InMemoryBucketStore()
+        self.clock = clock or Clock()
+        self.user = TokenBucket("user", user_per_minute / 60, user_burst, self.store, self.clock)
+        self.ip = TokenBucket("ip", ip_per_minute / 60, ip_burst, self.store, self.clock)
+        # 0 disables the global budget
+        self.tokens = (
+            TokenBucket("tpm", tokens_per_minute / 60, tokens_per_minute, self.store, self.clock)
+            if tokens_per_minute else None
+        )
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self.waiting = 0
+        self.stats = {"admitted": 0, "queued": 0, "rejected": 0}
+
+    @classmethod
+    def from_env(cls, clock: Optional[Clock] = None) -> "AdmissionController":
+        return cls(
+            user_per_minute=float(os.getenv("RATE_LIMIT_USER_PER_MINUTE", "20")),
+            user_burst=float(os.getenv("RATE_LIMIT_USER_BURST", "5")),
+            ip_per_minute=float(os.getenv("RATE_LIMIT_IP_PER_MINUTE", "60")),
+            ip_burst=float(os.getenv("RATE_LIMIT_IP_BURST", "15")),
+            tokens_per_minute=float(os.getenv("LLM_TOKENS_PER_MINUTE", "0")),
+            max_wait=float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "10")),
+            max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "100")),
+            store=SQLiteBucketStore(os.environ["ADMISSION_STORE_PATH"]) if os.getenv("ADMISSION_STORE_PATH") else None,
+            clock=clock,
+        )
+
+    def _charges(self, user: Optional[str], ip: str, tokens: float) -> List[Tuple[TokenBucket, str, float]]:
+        charges = [(self.ip, ip, 1)]
+        if user:
+            charges.append((self.user, user, 1))
+        if self.tokens is not None:
+            charges.append((self.tokens, "global", tokens))
+        return charges
+
+    @staticmethod
+    def _wait_time(charges: List[Tuple[TokenBucket, str, float]]) -> Tuple[float, str]:
+        return max((bucket.wait_time(key, cost), bucket.name) for bucket, key, cost in charges)
+
+    async def admit(self, user: Optional[str], ip: str, tokens: float) -> None:
+        """Wait until the request fits every budget; raises :class:`RateLimited` when it cannot in time."""
+        charges = self._charges(user, ip, tokens)
+        deadline = self.clock.now() + self.max_wait
+        queued = False
+        try:
+            while True:
+                with self.store.transaction():
+                    wait, name = self._wait_time(charges)
+                    if wait == 0:
+                        for bucket, key, cost in charges:
+                            bucket.take(key, cost)
+                if wait == 0:
+                    self.stats["admitted"] += 1
+                    return
+                if wait > deadline - self.clock.now() or (not queued and self.waiting >= self.max_queue):
+                    self.stats["rejected"] += 1
+                    raise RateLimited(f"Rate limit exceeded ({name})", wait)
+                if not queued:
+                    queued = True
+                    self.waiting += 1
+                    self.stats["queued"] += 1
+                await self.clock.sleep(wait)
+        finally:
+            if queued:
+                self.waiting -= 1
+
+
+def estimate_tokens(path: str, headers: Dict[bytes, bytes]) -> int:
+    """Prompt tokens estimated from the body size (~4 bytes per token) plus the route's expected output.
+
+    Upload routes use a fixed prompt estimate instead. Raises ``ValueError``
+    for a malformed Content-Length.
+    """
+    content_length = headers.get(b"content-length")
+    if path in ROUTE_UPLOAD_PROMPT_TOKENS:
+        prompt = ROUTE_UPLOAD_PROMPT_TOKENS[path]
+    elif content_length:
+        if not content_length.isdigit():
+            raise ValueError(f"Invalid Content-Length: {content_length!r}")
+        prompt = int(content_length) // 4
+    else:
+        prompt = DEFAULT_PROMPT_TOKENS
+    return prompt + ROUTE_OUTPUT_TOKENS.get(path, 0)
+
+
+class AdmissionMiddleware:
+    """Apply an :class:`AdmissionController` to POST requests on the given LLM-backed paths.
+
+    Callers are identified by the X-User-Id header and the client IP;
+    rejected requests get a 429 with ``Retry-After``, and requests with a
+    malformed Content-Length a 400.
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController, paths=ROUTE_OUTPUT_TOKENS):
+        self.app = app
+        self.controller = controller
+        self.paths = set(paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        user = headers.get(b"x-user-id", b"").decode("latin-1") or None
+        ip = scope["client"][0] if scope.get("client") else "anonymous"
+        try:
+            tokens = estimate_tokens(scope["path"], headers)
+        except ValueError as e:
+            await self._reject(send, 400, str(e))
+            return
+        try:
+            await self.controller.admit(user, ip, tokens)
+        except RateLimited as e:
+            await self._reject(send, 429, str(e), [(b"retry-after", str(max(1, math.ceil(e.retry_after))).encode())])
+            return
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _reject(send: Send, status: int, reason: str, headers: Optional[List[Tuple[bytes, bytes]]] = None) -> None:
+        body = json.dumps({"detail": reason}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                *(headers or []),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,255 @@
+import json
+import math
+import os
+import re
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+# Canonical term -> aliases that mean the same thing in resumes and job descriptions
+SYNONYMS: Dict[str, List[str]] = {
+    "kubernetes": ["k8s", "kube"],
+    "javascript": ["js", "ecmascript", "es6"],
+    "typescript": ["ts"],
+    "python": ["python3", "py"],
+    "golang": ["go lang", "go-lang"],
+    "postgresql": ["postgres", "psql"],
+    "mongodb": ["mongo"],
+    "aws": ["amazon web services"],
+    "gcp": ["google cloud", "google cloud platform"],
+    "azure": ["microsoft azure"],
+    "ci/cd": ["cicd", "ci cd", "ci-cd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "machine learning": ["ml"],
+    "artificial intelligence": ["ai"],
+    "natural language processing": ["nlp"],
+    "node.js": ["node", "nodejs"],
+    "react": ["react.js", "reactjs"],
+    "vue": ["vue.js", "vuejs"],
+    "infrastructure as code": ["iac"],
+    "terraform": ["tf"],
+    "rest api": ["restful", "rest apis", "restful api", "restful apis"],
+    "microservices": ["microservice", "micro services"],
+    "sql": ["structured query language"],
+    "linux": ["unix", "gnu/linux"],
+    "github actions": ["gh actions"],
+    "site reliability engineering": ["sre"],
+    "devops": ["dev ops"],
+    "c++": ["cpp"],
+    "c#": ["csharp"],
+    "agile": ["scrum", "kanban"],
+}
+
+# Terms weighted up when they appear in a job description
+KNOWN_SKILLS = set(SYNONYMS) | {
+    "ansible", "jenkins", "helm", "prometheus", "grafana", "elk", "kafka", "redis", "nginx", "git",
+    "bash", "java", "rust", "scala", "spark", "hadoop", "airflow", "django", "flask", "fastapi",
+    "spring", "angular", "graphql", "mysql", "dynamodb", "cassandra", "elasticsearch", "snowflake",
+    "tableau", "pandas", "numpy", "pytorch", "tensorflow", "openshift", "argocd", "istio", "puppet",
+    "chef", "cloudformation", "lambda", "ec2", "s3", "eks", "aks", "gke", "networking", "security",
+    "monitoring", "observability", "automation", "scripting", "testing", "html", "css", "figma",
+}
+
+STOPWORDS = set("""
+a about above after all also an and any are as at be been being both but by can could did do does
+doing for from had has have having he her here his how i if in into is it its just more most my no
+nor not of on once only or other our out over own same she should so some such than that the their
+them then there these they this those through to too under until up very was we were what when where
+which while who whom why will with would you your yours etc e.g i.e per via within across
+ability able about experience experienced years year work working team teams strong excellent good
+great knowledge understanding required requirements preferred plus role job position candidate
+candidates responsibilities responsible including include includes using use used looking join
+company must skills skill proficiency proficient familiarity familiar hands-on hands demonstrated
+proven solid deep new well highly environment environments ensure help build building develop
+developing design designing support supporting related relevant opportunity opportunities apply
+minimum least bachelor's master's degree field equivalent day days week weeks based senior junior
+""".split())
+
+MAX_KEYWORDS = 40
+# Terms kept in a document frequency table built with ATSScorer.fit
+MAX_VOCABULARY = 50000
+# Document frequency table loaded when ATS_IDF_PATH is unset, if one was deployed with the package
+DEFAULT_IDF_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ats_idf.json")
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+_LETTER_RE = re.compile(r"[a-z]")
+_ALIASES = {alias: canonical for canonical, aliases in SYNONYMS.items() for alias in aliases}
+_PHRASES = {term: term for term in KNOWN_SKILLS if " " in term}
+_PHRASES.update({alias: canonical for alias, canonical in _ALIASES.items() if " " in alias})
+_PHRASE_STARTS = {phrase.split()[0] for phrase in _PHRASES}
+_MAX_PHRASE = max(len(phrase.split()) for phrase in _PHRASES)
+
+
+def normalize(term: str) -> str:
+    term = term.lower().strip(".-/")
+    return _ALIASES.get(term, term)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase ``text`` into canonical terms, joining known multi-word phrases."""
+    words = []
+    for word in _TOKEN_RE.findall(text.lower()):
+        # "agile/scrum" is two terms, "ci/cd" is one
+        if "/" in word and normalize(word) not in KNOWN_SKILLS:
+            words.extend(part for part in word.split("/") if part)
+        else:
+            words.append(word)
+    terms = []
+    i = 0
+    while i < len(words):
+        sizes = range(min(_MAX_PHRASE, len(words) - i), 1, -1) if words[i] in _PHRASE_STARTS else ()
+        for size in sizes:
+            phrase = " ".join(words[i:i + size])
+            if phrase in _PHRASES:
+                terms.append(_PHRASES[phrase])
+                i += size
+                break
+        else:
+            term = normalize(words[i])
+            if term in KNOWN_SKILLS or (len(term) > 1 and term not in STOPWORDS and _LETTER_RE.search(term)):
+                terms.append(term)
+            i += 1
+    return terms
+
+
+def _strings(value: Any) -> Iterable[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def resume_terms(resume_data: Dict[str, Any]) -> set:
+    """Canonical terms from the resume's skills, technologies used and ATS keywords."""
+    values = [resume_data.get("skills") or {}, (resume_data.get("ats_optimization") or {}).get("keywords") or []]
+    values += [job.get("technologies_used") or [] for job in resume_data.get("workExperience") or [] if isinstance(job, dict)]
+    terms = set()
+    for value in _strings(values):
+        terms.add(normalize(value))
+        terms.update(tokenize(value))
+    return terms
+
+
+class ATSScorer:
+    """Scores a resume against a job description by TF-IDF weighted keyword overlap.
+
+    Inverse document frequencies come from a fixed corpus of job
+    descriptions, so terms every posting uses ("cloud", "engineer") count
+    less than the ones specific to this job. The table is loaded once and
+    never changes, so a score depends only on the resume and the job
+    description, whichever worker computes it. Build one with
+    ``ATSScorer.fit(postings).save(path)`` and either point ATS_IDF_PATH
+    at it or save it as ``ats_idf.json`` next to this module.
+
+    No table ships with the repository, as there is no licensed posting
+    corpus to fit one from. Without one every term has the same IDF, so
+    keywords are weighted by frequency in the posting and the known-skill
+    boost alone, and common words like "team" are not discounted;
+    :meth:`from_env` warns when it falls back to this.
+    """
+
+    def __init__(self, document_frequency: Optional[Mapping[str, int]] = None, documents: int = 0,
+                 max_keywords: int = MAX_KEYWORDS):
+        self.max_keywords = max_keywords
+        self.document_frequency: Dict[str, int] = dict(document_frequency or {})
+        self.documents = documents
+
+    @classmethod
+    def from_env(cls) -> "ATSScorer":
+        path = os.getenv("ATS_IDF_PATH") or DEFAULT_IDF_PATH
+        if not os.path.exists(path) and not os.getenv("ATS_IDF_PATH"):
+            print(f"Warning: No ATS IDF table at {path}; weighting keywords by term frequency only")
+            return cls()
+        with open(path, encoding="utf-8") as f:
+            table = json.load(f)
+        return cls(table["document_frequency"], table["documents"])
+
+    @classmethod
+    def fit(cls, job_descriptions: Iterable[str], max_keywords: int = MAX_KEYWORDS) -> "ATSScorer":
+        """A scorer whose document frequencies come from ``job_descriptions``."""
+        document_frequency: Counter = Counter()
+        documents = 0
+        for job_description in job_descriptions:
+            documents += 1
+            document_frequency.update(set(tokenize(job_description)))
+        return cls(dict(document_frequency.most_common(MAX_VOCABULARY)), documents, max_keywords)
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"documents": self.documents, "document_frequency": self.document_frequency}, f)
+
+    def idf(self, term: str) -> float:
+        return math.log((1 + self.documents) / (1 + self.document_frequency.get(term, 0))) + 1
+
+    def keywords(self, job_description: str) -> Dict[str, float]:
+        """The job description's ``max_keywords`` highest-weighted terms.
+
+        Ordered by weight, ties alphabetically, the same order :meth:`rank` uses.
+        """
+        counts = Counter(tokenize(job_description))
+        weights = {
+            term: (1 + math.log(count)) * self.idf(term) * (2 if term in KNOWN_SKILLS else 1)
+            for term, count in counts.items()
+        }
+        return dict(sorted(weights.items(), key=lambda item: (-item[1], item[0]))[:self.max_keywords])
+
+    def score(self, resume_data: Dict[str, Any], job_description: str) -> Dict[str, Any]:
+        start = time.perf_counter()
+        weights = self.keywords(job_description)
+        terms = resume_terms(resume_data)
+        matched = [term for term in weights if term in terms]
+        missing = [term for term in weights if term not in terms]
+        total = sum(weights.values())
+        return {
+            "ats_score": round(100 * sum(weights[term] for term in matched) / total) if total else 0,
+            "keyword_matches": matched,
+            "missing_keywords": missing,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
+
+    def rank(self, resume_data: Dict[str, Any], job_descriptions: List[str]) -> List[Dict[str, Any]]:
+        """Score one resume against many job descriptions at once, best match first.
+
+        The resume's terms are computed once and every posting is scored with
+        the same weighting as :meth:`score`, as one matrix product.
+        """
+        # Only batch ranking needs numpy, so importing the scorer does not load it
+        import numpy as np
+
+        terms = resume_terms(resume_data)
+        counts = [Counter(tokenize(job_description)) for job_description in job_descriptions]
+        vocabulary = sorted(set().union(*counts))
+        column = {term: i for i, term in enumerate(vocabulary)}
+
+        tf = np.zeros((len(counts), len(vocabulary)))
+        for row, document in enumerate(counts):
+            for term, count in document.items():
+                tf[row, column[term]] = count
+        idf = np.array([self.idf(term) * (2 if term in KNOWN_SKILLS else 1) for term in vocabulary])
+        weights = np.where(tf > 0, 1 + np.log(np.maximum(tf, 1)), 0) * idf
+        if len(vocabulary) > self.max_keywords:
+            # Keep each posting's max_keywords highest-weighted terms; the vocabulary is
+            # sorted, so a stable sort breaks ties alphabetically like keywords() does
+            top = np.argsort(-weights, axis=1, kind="stable")[:, :self.max_keywords]
+            mask = np.zeros_like(weights, dtype=bool)
+            np.put_along_axis(mask, top, True, axis=1)
+            weights = np.where(mask, weights, 0)
+
+        present = np.array([term in terms for term in vocabulary], dtype=bool)
+        totals = weights.sum(axis=1)
+        scores = np.divide(100 * (weights @ present), totals, out=np.zeros_like(totals), where=totals > 0)
+
+        results = []
+        for row in range(len(counts)):
+            keywords = np.flatnonzero(weights[row])
+            keywords = keywords[np.argsort(-weights[row, keywords], kind="stable")]
+            results.append({
+                "index": row,
+                "ats_score": int(round(scores[row])),
+                "keyword_matches": [vocabulary[i] for i in keywords if present[i]],
+                "missing_keywords": [vocabulary[i] for i in keywords if not present[i]],
+            })
+        return sorted(results, key=lambda result: -result["ats_score"])
@@ -0,0 +1,62 @@
+"""Simulate one abusive client and several normal users against admission control.
+
+Runs on a fake clock, so a simulated minute takes milliseconds. The
+abusive user fires a request every 100ms, and normal users one every 10s.
+The script reports what each kind of caller got through and the highest
+token rate admitted in any 60-second window, which must stay within the
+global budget.
+
+Usage: python benchmarks/admission_control.py [--minutes 5] [--users 10] [--tpm 90000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from admission import AdmissionController, FakeClock, RateLimited, estimate_tokens
+
+
+async def simulate(minutes: int, users: int, tpm: float) -> None:
+    clock = FakeClock()
+    # Waiting for a slot would stall the simulated arrivals, so only immediate admission is tried
+    controller = AdmissionController(tokens_per_minute=tpm, max_wait=0, clock=clock)
+    tokens = estimate_tokens("/api/career-advice", {b"content-length": b"4000"})
+
+    # (time, user, ip) arrivals, in order
+    arrivals = [(t / 10, "abuser", "10.0.0.1") for t in range(minutes * 600)]
+    arrivals += [(t * 10.0 + u, f"user-{u}", f"10.0.1.{u}") for u in range(users) for t in range(minutes * 6)]
+    arrivals.sort()
+
+    admitted, rejected, admitted_at = Counter(), Counter(), []
+    for at, user, ip in arrivals:
+        if at > clock.now():
+            clock.advance(at - clock.now())
+        kind = "abuser" if user == "abuser" else "normal"
+        try:
+            await controller.admit(user, ip, tokens)
+            admitted[kind] += 1
+            admitted_at.append(clock.now())
+        except RateLimited:
+            rejected[kind] += 1
+
+    peak = max(sum(1 for t in admitted_at if start <= t < start + 60) for start in admitted_at) * tokens
+    for kind in ("abuser", "normal"):
+        total = admitted[kind] + rejected[kind]
+        print(f"{kind:7} {admitted[kind]:5}/{total:<5} admitted ({admitted[kind] / total:.0%})")
+    print(f"peak admitted tokens in any minute: {peak} (budget {tpm:.0f}/min plus the initial full bucket)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=int, default=5)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--tpm", type=float, default=90000)
+    args = parser.parse_args()
+    asyncio.run(simulate(args.minutes, args.users, args.tpm))
+
+
+if __name__ == "__main__":
+    main()
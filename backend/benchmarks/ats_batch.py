@@ -0,0 +1,76 @@
+"""One-by-one generate-ats calls vs batch matching against a mock LLM.
+
+The baseline optimizes the resume for every posting in turn, as the
+frontend does today. The batch path ranks all postings locally and only
+optimizes the top-K, with results arriving as they finish.
+
+Usage: python benchmarks/ats_batch.py [--jobs 30] [--top-k 5] [--latency 0.3]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mocks import MockServer, create_mock_openai
+
+ATS_REPLY = json.dumps({
+    "optimized_summary": "DevOps engineer", "optimized_experience": [], "optimized_skills": [],
+    "optimized_education": [], "optimized_projects": [], "ats_score": 80,
+    "keyword_matches": [], "improvement_suggestions": [],
+})
+
+
+def job_descriptions(count: int) -> list:
+    from ats import KNOWN_SKILLS
+
+    rng = random.Random(0)
+    skills = sorted(KNOWN_SKILLS)
+    return [
+        f"We are hiring an engineer experienced with {', '.join(rng.sample(skills, 8))}. "
+        f"You will own {rng.choice(skills)} infrastructure and mentor the team."
+        for _ in range(count)
+    ]
+
+
+async def run(jobs: int, top_k: int) -> None:
+    import main
+
+    resume = json.load(open(os.path.join(os.path.dirname(main.__file__), "resume_analysis.json")))["data"]
+    postings = job_descriptions(jobs)
+    main.deps.persistence.start()
+
+    start = time.perf_counter()
+    for posting in postings:
+        await main.resume_processor.generate_ats_resume(resume, posting, force_refresh=True)
+    print(f"one by one  {time.perf_counter() - start:6.2f}s for {jobs} LLM calls")
+
+    start = time.perf_counter()
+    async for event, data in main.resume_processor.match_jobs(resume, postings, top_k, force_refresh=True):
+        elapsed = time.perf_counter() - start
+        if event == "ranking":
+            best = [(match["index"], match["ats_score"]) for match in data[:top_k]]
+            print(f"batch       {elapsed:6.3f}s ranking of {jobs}, top {top_k}: {best}")
+        else:
+            print(f"batch       {elapsed:6.2f}s {event} for posting {data[0]}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=30)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.3, help="mock LLM latency in seconds")
+    args = parser.parse_args()
+
+    with MockServer(create_mock_openai(args.latency, lambda body: ATS_REPLY)) as server:
+        os.environ["OPENAI_BASE_URL"] = f"{server.url}/v1"
+        os.environ.setdefault("OPENAI_API_KEY", "mock")
+        asyncio.run(run(args.jobs, args.top_k))
+
+
+if __name__ == "__main__":
+    main()
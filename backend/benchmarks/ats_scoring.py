@@ -0,0 +1,59 @@
+"""Latency of the local ATS scorer.
+
+Scores the sample extractions in backend/resume_analysis*.json against
+generated job descriptions of increasing length and prints median and p99
+scoring time; the target is well under 10ms.
+
+Usage: python benchmarks/ats_scoring.py [--rounds 200]
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+from ats import KNOWN_SKILLS, STOPWORDS, ATSScorer
+
+FILLER = sorted(STOPWORDS) + ["platform", "customers", "product", "cloud", "engineer", "infrastructure", "services"]
+
+
+def job_description(rng: random.Random, words: int) -> str:
+    skills = sorted(KNOWN_SKILLS)
+    return " ".join(rng.choice(skills) if rng.random() < 0.15 else rng.choice(FILLER) for _ in range(words))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    resumes = []
+    for path in sorted(glob.glob(os.path.join(BACKEND, "resume_analysis*.json"))):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        resumes.append(data.get("data", data))
+
+    rng = random.Random(0)
+    scorer = ATSScorer()
+    print(f"{'JD words':>8} {'median ms':>10} {'p99 ms':>8} {'mean score':>10}")
+    for words in (100, 300, 1000, 3000):
+        timings, scores = [], []
+        for _ in range(args.rounds):
+            jd = job_description(rng, words)
+            start = time.perf_counter()
+            result = scorer.score(rng.choice(resumes), jd)
+            timings.append((time.perf_counter() - start) * 1000)
+            scores.append(result["ats_score"])
+        timings.sort()
+        print(f"{words:8} {statistics.median(timings):10.3f} {timings[int(len(timings) * 0.99) - 1]:8.3f} "
+              f"{statistics.mean(scores):10.1f}")
+
+
+if __name__ == "__main__":
+    main()
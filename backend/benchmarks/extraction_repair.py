@@ -0,0 +1,131 @@
+"""Cost of bad extraction responses: full retry vs streamed parsing with targeted repair.
+
+The mock LLM answers extraction prompts with the sections of a real
+extracted resume, at a fixed rate per output token. The first answer to
+each prompt is damaged in one of three ways; asking again gets a good one.
+
+"before" is the old behaviour: json.loads fails and the whole extraction
+is run again (a section of the wrong type is not noticed at all). "after"
+streams the response through stream_resume_extraction, which keeps the
+good sections, repairs what it can locally and re-asks for the rest. It
+also reports when the client got its first section.
+
+Usage: python benchmarks/extraction_repair.py [--resumes 5] [--token-delay 0.002]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+from mocks import MockServer, create_mock_openai, requested_schema
+from pdf_corpus import resume_pdf
+
+RESUME = json.load(open(os.path.join(BACKEND, "resume_analysis.json"), encoding="utf-8"))["data"]
+
+
+def damage(answer: str, fault: str) -> str:
+    if fault == "truncated":
+        # The stream stops two thirds of the way through
+        return answer[:len(answer) * 2 // 3]
+    if fault == "malformed":
+        # A trailing comma inside the skills section
+        return answer.replace('"skills": {', '"skills": {"soft": [],', 1).replace("]\n  },", "],\n  },", 1)
+    # A section of the wrong type
+    data = json.loads(answer)
+    data["skills"] = "Python, AWS, Docker"
+    return json.dumps(data, indent=2)
+
+
+def faulty_reply(faults: dict):
+    """Damages the first answer to each prompt with ``faults["current"]``."""
+    seen = set()
+
+    def reply(body: dict) -> str:
+        schema = requested_schema(body)
+        if schema is None:
+            return json.dumps({"mock": True})
+        answer = json.dumps({name: RESUME.get(name, value) for name, value in schema.items()}, indent=2)
+        prompt = hashlib.sha256(body["messages"][-1]["content"].encode()).hexdigest()
+        if prompt in seen:
+            return answer
+        seen.add(prompt)
+        return damage(answer, faults["current"])
+
+    return reply
+
+
+async def before(main, content: bytes) -> float:
+    from extraction import extraction_prompt
+
+    text = await main.resume_processor.text_extractor.extract(content)
+    prompt = extraction_prompt(text)
+    start = time.perf_counter()
+    for _ in range(2):
+        response = await main.deps.llm.chat("extract_resume", model=main.EXTRACTION_MODEL,
+                                       messages=[{"role": "user", "content": prompt}],
+                                       response_format={"type": "json_object"})
+        try:
+            json.loads(response.choices[0].message.content)
+            break
+        except json.JSONDecodeError:
+            continue
+    return time.perf_counter() - start
+
+
+async def after(main, content: bytes) -> tuple:
+    # Parse the document first so only LLM time is compared
+    await main.resume_processor.text_extractor.extract(content)
+    start = time.perf_counter()
+    first = None
+    async for event, _ in main.resume_processor.stream_resume_extraction(content):
+        if event == "section" and first is None:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+async def run(faults: dict, resumes: int) -> None:
+    import main
+
+    for index, fault in enumerate(("truncated", "malformed", "invalid")):
+        faults["current"] = fault
+        # Different documents for every run, so each gets a damaged first answer
+        seeds = range(2 * index * resumes, (2 * index + 1) * resumes)
+        await compare(main, fault, seeds, resumes)
+
+
+async def compare(main, fault: str, seeds: range, resumes: int) -> None:
+    old = [await before(main, resume_pdf(seed=seed)) for seed in seeds]
+    stats_before = dict(main.resume_processor.repair_stats.totals)
+    new = [await after(main, resume_pdf(seed=seed + resumes)) for seed in seeds]
+    totals = main.resume_processor.repair_stats.totals
+    saved = totals["tokens_saved"] - stats_before["tokens_saved"]
+    print(f"{fault:10} before {sum(old) / resumes:6.2f}s   after {sum(t for _, t in new) / resumes:6.2f}s "
+          f"(first section {sum(f or 0 for f, _ in new) / resumes:5.2f}s)   "
+          f"local repairs {totals['local_repairs'] - stats_before['local_repairs']:2}  "
+          f"re-asked sections {totals['reasked_sections'] - stats_before['reasked_sections']:2}  "
+          f"~{saved // resumes} tokens saved per resume")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.3, help="time to first token in seconds")
+    parser.add_argument("--token-delay", type=float, default=0.002, help="seconds per generated token")
+    args = parser.parse_args()
+
+    os.environ["SEARCH_INDEX_PATH"] = ""
+    os.environ.setdefault("OPENAI_API_KEY", "mock")
+    faults = {}
+    with MockServer(create_mock_openai(args.latency, faulty_reply(faults), args.token_delay)) as server:
+        os.environ["OPENAI_BASE_URL"] = f"{server.url}/v1"
+        asyncio.run(run(faults, args.resumes))
+
+
+if __name__ == "__main__":
+    main()
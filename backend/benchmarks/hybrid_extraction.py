@@ -0,0 +1,132 @@
+"""Offline accuracy and latency of hybrid vs full resume extraction.
+
+Builds a fixture corpus of resumes with known contact details, renders each
+to PDF and parses it back, then:
+
+* scores the local pre-parser's personalInfo fields against the truth and
+  times it, and checks that the location, which the LLM still extracts in
+  hybrid mode, survives into the hybrid prompt;
+* compares the prompt tokens, expected output tokens and modelled LLM
+  latency of the full prompt with the hybrid one.
+
+LLM latency is modelled as ``--ttft + prompt_tokens * --prefill + output_tokens * --decode``
+so the comparison runs without a model.
+
+Usage: python benchmarks/hybrid_extraction.py [--resumes 50]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+from documents import extract_pdf_text
+from extraction import EXTRACTION_SCHEMA, HYBRID_LOCAL_FIELDS, extraction_prompt, schema_subset
+from pdf_corpus import make_pdf
+from preparse import preparse_resume
+from prompting import count_tokens
+
+FIRST = ["Asha", "Vikrant", "Maria", "John", "Wei", "Fatima", "Lucas", "Priya", "Omar", "Elena"]
+LAST = ["Nalawade", "Smith", "Garcia", "Chen", "Khan", "Rossi", "Okafor", "Iyer", "Novak", "Brown"]
+LOCATIONS = ["Pune, India", "Austin, TX", "Berlin, Germany", "London, United Kingdom", "Toronto, ON"]
+SKILLS = ["Kubernetes", "Docker", "Terraform", "Python", "AWS", "Ansible", "Jenkins", "Grafana", "Go", "Linux"]
+CHECKED_FIELDS = ["name", "email", "phone", "linkedin", "github", "portfolio"]
+
+
+def fixture(rng: random.Random) -> tuple:
+    first, last = rng.choice(FIRST), rng.choice(LAST)
+    handle = f"{first}{last}".lower()
+    truth = {
+        "name": f"{first} {last}",
+        "email": f"{first.lower()}.{last.lower()}@example.com",
+        "phone": rng.choice(["(+91) ", "+1 ", ""]) + "".join(rng.choice("0123456789") for _ in range(10)),
+        "linkedin": f"linkedin.com/in/{handle}",
+        "github": f"github.com/{handle}" if rng.random() < 0.7 else "",
+        "portfolio": f"https://{handle}.dev" if rng.random() < 0.5 else "",
+        "location": rng.choice(LOCATIONS),
+    }
+    skills = rng.sample(SKILLS, 6)
+    contact = " | ".join(v for v in (truth["location"], truth["email"], truth["phone"], truth["linkedin"],
+                                     truth["github"], truth["portfolio"]) if v)
+    lines = [truth["name"], contact, "", "PROFESSIONAL SUMMARY",
+             f"DevOps engineer with {rng.randint(2, 12)} years of experience in {skills[0]} and {skills[1]}.",
+             "", "WORK EXPERIENCE"]
+    for job in range(rng.randint(1, 3)):
+        start = rng.randint(2010, 2021)
+        lines += [f"Senior Engineer, Company {job}    Jan {start} - {rng.choice(['Present', f'Dec {start + 2}'])}",
+                  f"- Built pipelines with {skills[job]} and {skills[job + 1]}, reducing deploy time by {rng.randint(10, 60)}%.",
+                  f"- Operated {skills[job + 2]} clusters for {rng.randint(5, 50)} teams."]
+    lines += ["", "EDUCATION", f"B.E. Computer Engineering, University of Mumbai {rng.randint(2005, 2015)}",
+              "", "SKILLS", ", ".join(skills)]
+    return "\n".join(lines), truth, skills
+
+
+def expected_output(truth: dict, skills: list, hybrid: bool) -> dict:
+    """A stand-in for the model's answer: the schema filled with this resume's values."""
+    answer = json.loads(json.dumps(EXTRACTION_SCHEMA))
+    answer["personalInfo"].update(truth)
+    answer["skills"]["technical"] = skills
+    answer["ats_optimization"]["keywords"] = skills
+    answer["ats_optimization"]["keyword_density"] = {skill: 1.5 for skill in skills}
+    if hybrid:
+        answer["personalInfo"] = {"location": truth["location"]}
+        answer["ats_optimization"].pop("keyword_density")
+    return answer
+
+
+def normalize(value: str) -> str:
+    return "".join(ch for ch in value.lower() if ch.isalnum())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=50)
+    parser.add_argument("--ttft", type=float, default=0.8, help="seconds to first token")
+    parser.add_argument("--prefill", type=float, default=0.0002, help="seconds per prompt token")
+    parser.add_argument("--decode", type=float, default=0.03, help="seconds per output token")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    correct = {field: 0 for field in CHECKED_FIELDS}
+    located = 0
+    parse_ms, rows = [], {"full": [], "hybrid": []}
+    for _ in range(args.resumes):
+        text, truth, skills = fixture(rng)
+        text = extract_pdf_text(make_pdf([text.splitlines()]), max_pages=5)
+
+        start = time.perf_counter()
+        local = preparse_resume(text)
+        parse_ms.append((time.perf_counter() - start) * 1000)
+        for field in CHECKED_FIELDS:
+            correct[field] += normalize(local["personalInfo"][field]) == normalize(truth[field])
+        located += truth["location"] in local["body"]
+
+        for mode in rows:
+            hybrid = mode == "hybrid"
+            if hybrid:
+                prompt = extraction_prompt(local["body"], schema_subset(omit=HYBRID_LOCAL_FIELDS))
+            else:
+                prompt = extraction_prompt(text)
+            prompt_tokens = count_tokens(prompt)
+            output_tokens = count_tokens(json.dumps(expected_output(truth, skills, hybrid)))
+            latency = args.ttft + prompt_tokens * args.prefill + output_tokens * args.decode
+            rows[mode].append((prompt_tokens, output_tokens, latency))
+
+    print(f"pre-parser over {args.resumes} PDF fixtures: median {statistics.median(parse_ms):.2f}ms, "
+          f"max {max(parse_ms):.2f}ms")
+    for field in CHECKED_FIELDS:
+        print(f"  {field:10} accuracy {correct[field] / args.resumes:6.1%}")
+    print(f"  location   left to the LLM, in the hybrid prompt for {located / args.resumes:6.1%}")
+    print(f"{'mode':8} {'prompt tok':>10} {'output tok':>10} {'modelled latency':>17}")
+    for mode, values in rows.items():
+        prompt_tokens, output_tokens, latency = (statistics.mean(column) for column in zip(*values))
+        print(f"{mode:8} {prompt_tokens:10.0f} {output_tokens:10.0f} {latency:16.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""LinkedIn login latency against a mock of the LinkedIn APIs, before and after.
+
+"before" reproduces the original callback: a new httpx client per login
+and the profile and email requests one after the other. "after" posts to
+/api/linkedin/callback, which uses the app's shared connection pool, fetches
+both concurrently and caches the profile per authorization code. The last
+run repeats callbacks with the same code, as a double-submitted login does.
+
+Usage: python benchmarks/linkedin_login.py [--logins 20] [--latency 0.1]
+"""
+import argparse
+import asyncio
+import os
+import secrets
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from mocks import FAKE_SUPABASE_KEY, MockServer, create_fake_postgrest, create_mock_linkedin
+
+
+async def before(main, code: str) -> None:
+    async with httpx.AsyncClient() as client:
+        token_response = await client.post(f"{main.LINKEDIN_OAUTH_URL}/accessToken", data={"code": code})
+        headers = {"Authorization": f"Bearer {token_response.json()['access_token']}"}
+        profile = (await client.get(f"{main.LINKEDIN_API_URL}/me", headers=headers)).json()
+        email_data = (await client.get(
+            f"{main.LINKEDIN_API_URL}/emailAddress?q=members&projection=(elements*(handle~))", headers=headers
+        )).json()
+    email = email_data["elements"][0]["handle~"]["emailAddress"]
+    await asyncio.to_thread(lambda: main.deps.supabase.auth.sign_up({
+        "email": email, "password": secrets.token_urlsafe(16), "options": {"data": {"linkedin_id": profile["id"]}}
+    }))
+
+
+async def run(linkedin, logins: int) -> None:
+    import main
+
+    def report(label: str, timings: list) -> None:
+        calls = sum(linkedin.state.calls.values())
+        print(f"{label:30} p50 {statistics.median(timings) * 1000:7.1f}ms  max {max(timings) * 1000:7.1f}ms  "
+              f"{calls:3} LinkedIn calls  {len(linkedin.state.connections):3} connections")
+        linkedin.state.calls.clear()
+        linkedin.state.connections.clear()
+
+    async def timed(login) -> float:
+        start = time.perf_counter()
+        await login
+        return time.perf_counter() - start
+
+    report("before, sequential logins", [await timed(before(main, f"before-{i}")) for i in range(logins)])
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.lifespan(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            async def after(code: str) -> None:
+                response = await client.post("/api/linkedin/callback", json={"code": code})
+                response.raise_for_status()
+
+            report("after, sequential logins", [await timed(after(f"after-{i}")) for i in range(logins)])
+            report("before, concurrent logins",
+                   await asyncio.gather(*(timed(before(main, f"before-c{i}")) for i in range(logins))))
+            report("after, concurrent logins",
+                   await asyncio.gather(*(timed(after(f"after-c{i}")) for i in range(logins))))
+            report("after, repeated callback",
+                   await asyncio.gather(*(timed(after("repeated")) for _ in range(logins))))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.1, help="mock LinkedIn latency per call in seconds")
+    parser.add_argument("--db-latency", type=float, default=0.02, help="fake Supabase latency in seconds")
+    args = parser.parse_args()
+
+    linkedin = create_mock_linkedin(latency=args.latency)
+    with MockServer(linkedin) as linkedin_server, MockServer(create_fake_postgrest(latency=args.db_latency)) as supabase:
+        os.environ["LINKEDIN_OAUTH_URL"] = f"{linkedin_server.url}/oauth/v2"
+        os.environ["LINKEDIN_API_URL"] = f"{linkedin_server.url}/v2"
+        os.environ["VITE_SUPABASE_URL"] = supabase.url
+        os.environ["VITE_SUPABASE_ANON_KEY"] = FAKE_SUPABASE_KEY
+        os.environ["SEARCH_INDEX_PATH"] = ""
+        os.environ.setdefault("OPENAI_API_KEY", "mock")
+        asyncio.run(run(linkedin, args.logins))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Plain vs resilient LLM client against a fault-injecting mock OpenAI server.
+
+Each scenario sends the same calls through a client without retries,
+deadlines or fallbacks (what the backend did before) and through the
+resilient one. It prints the success rate, p50/p99/max latency, and
+how many calls each model received.
+
+Scenarios: transient 500s, a slow tail, a stalled model, and the primary
+model being down.
+
+Usage: python benchmarks/llm_resilience.py [--calls 100] [--concurrency 10]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openai import AsyncOpenAI
+
+from llm import LLMClient
+from mocks import MockServer, create_mock_openai
+
+PRIMARY, FALLBACK = "gpt-4-turbo-preview", "gpt-4o-mini"
+SCENARIOS = {
+    "30% transient 500s": {"error_rate": 0.3},
+    "10% of calls 3s slow": {"slow_rate": 0.1, "slow_latency": 3.0},
+    "20% of calls stall 20s": {"slow_rate": 0.2, "slow_latency": 20.0},
+    "primary model down": {"failing_models": {PRIMARY}},
+}
+
+
+def clients(base_url: str) -> dict:
+    openai = AsyncOpenAI(base_url=base_url, api_key="mock", max_retries=0)
+    return {
+        "plain": LLMClient(openai, limits={}, default_timeout=600, max_retries=0, hedge_after={}, fallbacks={},
+                           breaker_threshold=10**9),
+        "resilient": LLMClient(openai, limits={}, default_timeout=2, max_retries=3, backoff=0.05,
+                               hedge_after={"bench": 1}, fallbacks={PRIMARY: FALLBACK}),
+    }
+
+
+async def run(client: LLMClient, calls: int, concurrency: int) -> tuple:
+    gate = asyncio.Semaphore(concurrency)
+    timings, failures = [], 0
+
+    async def one():
+        nonlocal failures
+        async with gate:
+            start = time.perf_counter()
+            try:
+                await client.chat("bench", model=PRIMARY, messages=[{"role": "user", "content": "hi"}])
+                timings.append(time.perf_counter() - start)
+            except Exception:
+                failures += 1
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return timings, failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.1, help="normal mock latency in seconds")
+    args = parser.parse_args()
+
+    mock = create_mock_openai(args.latency)
+    with MockServer(mock) as server:
+        for scenario, faults in SCENARIOS.items():
+            print(f"\n{scenario}")
+            for name, client in clients(f"{server.url}/v1").items():
+                mock.state.error_rate = faults.get("error_rate", 0.0)
+                mock.state.slow_rate = faults.get("slow_rate", 0.0)
+                mock.state.slow_latency = faults.get("slow_latency", 0.0)
+                mock.state.failing_models = set(faults.get("failing_models", ()))
+                mock.state.calls.clear()
+                timings, failures = asyncio.run(run(client, args.calls, args.concurrency))
+                timings.sort()
+                latency = (f"p50 {statistics.median(timings):5.2f}s  p99 {timings[int(len(timings) * 0.99) - 1]:5.2f}s  "
+                           f"max {timings[-1]:5.2f}s" if timings else "no successful calls")
+                print(f"  {name:9} {1 - failures / args.calls:5.0%} ok  {latency}  upstream calls {dict(mock.state.calls)}")
+
+
+if __name__ == "__main__":
+    main()
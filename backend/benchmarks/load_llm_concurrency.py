@@ -0,0 +1,62 @@
+"""Load test: N concurrent career-advice requests against a mock OpenAI server.
+
+With non-blocking LLM calls, N concurrent requests should finish in roughly
+the time of one, and the health check should stay responsive meanwhile.
+
+Usage: python benchmarks/load_llm_concurrency.py [--requests 20] [--latency 1.0]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from mocks import MockServer, create_mock_openai
+
+
+async def run(requests: int) -> None:
+    import main
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://app", timeout=120) as client:
+        async def advice():
+            response = await client.post("/api/career-advice", json={"query": "How do I move into DevOps?"})
+            response.raise_for_status()
+
+        start = time.perf_counter()
+        await advice()
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        load = asyncio.gather(*(advice() for _ in range(requests)))
+        await asyncio.sleep(0.1)
+        health_start = time.perf_counter()
+        await client.get("/")
+        health = time.perf_counter() - health_start
+        await load
+        concurrent = time.perf_counter() - start
+
+    print(f"1 request:            {single:.2f}s")
+    print(f"{requests} concurrent requests: {concurrent:.2f}s ({concurrent / single:.2f}x a single request)")
+    print(f"health check under load: {health * 1000:.1f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=1.0, help="mock completion latency in seconds")
+    args = parser.parse_args()
+
+    with MockServer(create_mock_openai(latency=args.latency)) as server:
+        os.environ["OPENAI_BASE_URL"] = f"{server.url}/v1"
+        os.environ.setdefault("OPENAI_API_KEY", "mock")
+        os.environ.setdefault("LLM_DEFAULT_CONCURRENCY", str(args.requests))
+        asyncio.run(run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+"""Load suite: every route of the backend against mock OpenAI and PostgREST servers.
+
+The app runs under uvicorn in a subprocess, configured to talk to a mock
+OpenAI server (fixed time to first token, then ``--tokens-per-second``
+for ``--completion-tokens`` tokens per reply), a fake PostgREST server
+with ``--db-latency`` and a mock of the LinkedIn APIs with
+``--linkedin-latency``. Each scenario sends ``--requests`` requests at
+``--concurrency`` and reports p50/p95/p99 latency, throughput, errors and
+the server's peak RSS while it ran. A streamed response only counts as a
+success if it ends with a ``done`` event and carries no ``error`` event.
+
+Generated inputs differ per request, so caches and memoization only help
+where the same input really repeats. Rate limits are raised out of the way.
+
+    python benchmarks/load_suite.py --save baseline.json
+    python benchmarks/load_suite.py --compare baseline.json   # exits 1 on regressions
+
+Usage: python benchmarks/load_suite.py [--requests 50] [--concurrency 10] [--only process,search]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+
+from mocks import (
+    FAKE_SUPABASE_KEY, MockServer, create_fake_postgrest, create_mock_linkedin, create_mock_openai, free_port,
+    requested_schema,
+)
+from pdf_corpus import resume_pdf
+
+RESUME = json.load(open(os.path.join(BACKEND, "resume_analysis.json"), encoding="utf-8"))["data"]
+JOB_DESCRIPTION = (
+    "Senior Python engineer to build FastAPI services on AWS. Experience with PostgreSQL, Docker, "
+    "Kubernetes and CI/CD required; React and machine learning a plus."
+)
+
+
+def completion_reply(completion_tokens: int) -> Callable[[dict], str]:
+    """Replies of ``completion_tokens`` words that every prompt of the backend accepts."""
+    words = [f"word{i}" for i in range(completion_tokens)]
+    # Career advice is split into a response and suggestions on blank lines
+    text = "\n\n".join(" ".join(words[start:start + 20]) for start in range(0, len(words), 20))
+
+    def reply(body: dict) -> str:
+        if body.get("response_format", {}).get("type") == "json_object":
+            return json.dumps({**(requested_schema(body) or {}), "mock": True, "text": text})
+        return text
+
+    return reply
+
+
+class Scenario(NamedTuple):
+    name: str
+    # Sends request number i and returns the response whose status is checked
+    send: Callable[[httpx.AsyncClient, int, Dict[str, Any]], Any]
+    expected: int = 200
+    # Server-Sent Events: the body is checked as well, see stream_failure
+    stream: bool = False
+
+
+def stream_failure(response: httpx.Response) -> Optional[str]:
+    """Why a Server-Sent Events body failed, or None when it ended with a ``done`` event and no error."""
+    events = [line[len("event:"):].strip() for line in response.text.splitlines() if line.startswith("event:")]
+    if "error" in events:
+        return "event: error"
+    if "done" not in events:
+        return "no done event"
+    return None
+
+
+def job_posting(scenario: str, i: int) -> str:
+    """A posting unique to the scenario and request, so generations are not memoized across them."""
+    return f"{JOB_DESCRIPTION} Posting {scenario}-{i}."
+
+
+async def upload(client: httpx.AsyncClient, i: int, seeded: Dict[str, Any]) -> httpx.Response:
+    files = {"file": (f"resume-{i}.pdf", resume_pdf(seed=1000 + i), "application/pdf")}
+    return await client.post("/api/resume/process", files=files)
+
+
+async def upload_stream(client: httpx.AsyncClient, i: int, seeded: Dict[str, Any]) -> httpx.Response:
+    files = {"file": (f"resume-stream-{i}.pdf", resume_pdf(seed=5000 + i), "application/pdf")}
+    return await client.post("/api/resume/process/stream", files=files)
+
+
+async def portfolio(client: httpx.AsyncClient, i: int, seeded: Dict[str, Any]) -> httpx.Response:
+    """Submit a portfolio job and poll it until it finishes; latency covers the whole job."""
+    response = await client.post("/api/resume/generate-portfolio", json=RESUME, headers={"X-User-Id": f"portfolio-{i}"})
+    if response.status_code != 202:
+        return response
+    while True:
+        await asyncio.sleep(0.05)
+        job = await client.get(response.json()["status_url"])
+        if job.status_code != 200 or job.json()["data"]["status"] not in ("queued", "running"):
+            return job
+
+
+async def cancel_job(client: httpx.AsyncClient, i: int, seeded: Dict[str, Any]) -> httpx.Response:
+    """Submit a portfolio job and cancel it right away; latency covers both requests."""
+    response = await client.post("/api/resume/generate-portfolio", json=RESUME, headers={"X-User-Id": f"cancel-{i}"})
+    if response.status_code != 202:
+        return response
+    return await client.delete(response.json()["status_url"])
+
+
+SCENARIOS = [
+    Scenario("health", lambda c, i, s: c.get("/")),
+    Scenario("cache-stats", lambda c, i, s: c.get("/api/cache/stats")),
+    Scenario("metrics", lambda c, i, s: c.get("/metrics")),
+    Scenario("career-advice", lambda c, i, s: c.post("/api/career-advice", json={"query": f"How do I move into DevOps? ({i})"})),
+    Scenario("career-advice-stream", lambda c, i, s: c.post("/api/career-advice/stream", json={"query": f"How do I negotiate salary? ({i})"}), stream=True),
+    Scenario("career-interactions", lambda c, i, s: c.get("/api/test-career-interactions")),
+    Scenario("process", upload),
+    Scenario("process-stream", upload_stream, stream=True),
+    Scenario("ats-score", lambda c, i, s: c.post("/api/resume/ats-score", json={"resume_data": RESUME, "job_description": {"description": job_posting("score", i)}})),
+    Scenario("generate-ats", lambda c, i, s: c.post("/api/resume/generate-ats", json={"resume_data": RESUME, "job_description": {"description": job_posting("ats", i)}})),
+    Scenario("generate-ats-batch", lambda c, i, s: c.post(
+        "/api/resume/generate-ats/batch", params={"top_k": 3},
+        json={"resume_data": RESUME, "job_descriptions": [{"description": job_posting("batch", i * 20 + j)} for j in range(20)]}
+    )),
+    Scenario("cover-letter", lambda c, i, s: c.post("/api/resume/generate-cover-letter", json={"resume_data": RESUME, "job_description": {"description": job_posting("letter", i)}})),
+    Scenario("cover-letter-stream", lambda c, i, s: c.post("/api/resume/generate-cover-letter/stream", json={"resume_data": RESUME, "job_description": {"description": job_posting("letter-stream", i)}}), stream=True),
+    Scenario("portfolio-job", portfolio),
+    Scenario("job-cancel", cancel_job),
+    Scenario("linkedin-callback", lambda c, i, s: c.post("/api/linkedin/callback", json={"code": f"load-{i}"})),
+    Scenario("search", lambda c, i, s: c.get("/api/resume/search", params={"q": "python aws", "limit": 20})),
+    Scenario("history", lambda c, i, s: c.get("/api/resume/history", params={"limit": 20})),
+    Scenario("latest", lambda c, i, s: c.get("/api/resume/latest")),
+    Scenario("analysis", lambda c, i, s: c.get(f"/api/resume/analysis/{s['resume_id']}")),
+]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+class RSSSampler:
+    """Samples the resident set size of a process from /proc (Linux only; None elsewhere)."""
+
+    def __init__(self, pid: int, interval: float = 0.02):
+        self.path = f"/proc/{pid}/status"
+        self.interval = interval
+        self.peak: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _read(self) -> Optional[int]:
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            return None
+        return None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            rss = self._read()
+            if rss is not None:
+                self.peak = max(self.peak or 0, rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "RSSSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int,
+                       seeded: Dict[str, Any], pid: int) -> Dict[str, Any]:
+    gate = asyncio.Semaphore(concurrency)
+    timings: List[float] = []
+    errors: Dict[str, int] = {}
+
+    async def one(i: int) -> None:
+        async with gate:
+            start = time.perf_counter()
+            try:
+                response = await scenario.send(client, i, seeded)
+                if response.status_code != scenario.expected:
+                    status = str(response.status_code)
+                else:
+                    status = stream_failure(response) if scenario.stream else None
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            timings.append(time.perf_counter() - start)
+            if status:
+                errors[status] = errors.get(status, 0) + 1
+
+    with RSSSampler(pid) as rss:
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+    timings.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(percentile(timings, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(timings, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(timings, 0.99) * 1000, 2),
+        "max_ms": round(timings[-1] * 1000, 2),
+        "throughput_rps": round(requests / elapsed, 2),
+        "peak_rss_mb": round(rss.peak / 1024 / 1024, 1) if rss.peak else None,
+    }
+
+
+def server_env(openai_url: str, postgrest_url: str, storage: str, concurrency: int,
+               linkedin_url: Optional[str] = None) -> Dict[str, str]:
+    unlimited = str(10 ** 9)
+    linkedin = {
+        "LINKEDIN_OAUTH_URL": f"{linkedin_url}/oauth/v2",
+        "LINKEDIN_API_URL": f"{linkedin_url}/v2",
+        "LINKEDIN_CLIENT_ID": "load-suite",
+        "LINKEDIN_CLIENT_SECRET": "load-suite",
+    } if linkedin_url else {}
+    return {
+        **os.environ,
+        "OPENAI_BASE_URL": f"{openai_url}/v1",
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "mock"),
+        "VITE_SUPABASE_URL": postgrest_url,
+        "VITE_SUPABASE_ANON_KEY": FAKE_SUPABASE_KEY,
+        "RESUME_STORAGE": "local",
+        "RESUME_STORAGE_DIR": storage,
+        "SEARCH_INDEX_PATH": "",
+        "EXTRACTION_CACHE_PATH": "",
+        "LLM_DEFAULT_CONCURRENCY": str(max(8, concurrency * 4)),
+        "JOB_WORKERS": str(concurrency),
+        "RATE_LIMIT_USER_PER_MINUTE": unlimited,
+        "RATE_LIMIT_USER_BURST": unlimited,
+        "RATE_LIMIT_IP_PER_MINUTE": unlimited,
+        "RATE_LIMIT_IP_BURST": unlimited,
+        **linkedin,
+    }
+
+
+async def wait_until_ready(client: httpx.AsyncClient, process: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("Server did not start in time")
+
+
+async def run_suite(base_url: str, process: subprocess.Popen, scenarios: List[Scenario],
+                    requests: int, concurrency: int) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency * 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+        await wait_until_ready(client, process)
+        # Resumes for the read and search scenarios to find
+        seeded: Dict[str, Any] = {}
+        for i in range(10):
+            response = await upload(client, -1 - i, seeded)
+            response.raise_for_status()
+            seeded["resume_id"] = response.json()["resume_id"]
+        # Let the write-behind queue flush the seeded rows
+        await asyncio.sleep(1.5)
+
+        results = {}
+        for scenario in scenarios:
+            result = await run_scenario(client, scenario, requests, concurrency, seeded, process.pid)
+            results[scenario.name] = result
+            errors = ", ".join(f"{status} x{count}" for status, count in result["errors"].items()) or "-"
+            rss = f"{result['peak_rss_mb']:7.1f}" if result["peak_rss_mb"] is not None else "    n/a"
+            print(f"{scenario.name:22} {result['p50_ms']:9.1f} {result['p95_ms']:9.1f} {result['p99_ms']:9.1f} "
+                  f"{result['throughput_rps']:8.1f} {rss}  {errors}")
+        return results
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> bool:
+    """Print changes against ``baseline``; True when some scenario regressed beyond ``tolerance``."""
+    regressed = False
+    print(f"\n{'scenario':22} {'p95 before':>11} {'p95 after':>10} {'rps before':>11} {'rps after':>10}")
+    for name, after in results["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            print(f"{name:22} (not in baseline)")
+            continue
+        slower = after["p95_ms"] > before["p95_ms"] * (1 + tolerance)
+        fewer = after["throughput_rps"] < before["throughput_rps"] * (1 - tolerance)
+        new_errors = sum(after["errors"].values()) > sum(before["errors"].values())
+        flag = "  REGRESSION" if slower or fewer or new_errors else ""
+        regressed |= bool(flag)
+        print(f"{name:22} {before['p95_ms']:11.1f} {after['p95_ms']:10.1f} "
+              f"{before['throughput_rps']:11.1f} {after['throughput_rps']:10.1f}{flag}")
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.2, help="mock OpenAI time to first token in seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=500, help="mock OpenAI generation rate")
+    parser.add_argument("--completion-tokens", type=int, default=100, help="tokens in each mock completion")
+    parser.add_argument("--db-latency", type=float, default=0.01, help="fake PostgREST latency in seconds")
+    parser.add_argument("--linkedin-latency", type=float, default=0.05, help="mock LinkedIn latency per call in seconds")
+    parser.add_argument("--only", default="", help="comma-separated scenario names to run")
+    parser.add_argument("--save", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative p95/throughput change")
+    args = parser.parse_args()
+
+    only = {name.strip() for name in args.only.split(",") if name.strip()}
+    unknown = only - {scenario.name for scenario in SCENARIOS}
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    scenarios = [scenario for scenario in SCENARIOS if not only or scenario.name in only]
+
+    config = {key: value for key, value in vars(args).items() if key not in ("save", "compare", "only")}
+    mock_openai = create_mock_openai(args.latency, completion_reply(args.completion_tokens), 1 / args.tokens_per_second)
+    with MockServer(mock_openai) as openai_server, \
+            MockServer(create_fake_postgrest(latency=args.db_latency)) as postgrest, \
+            MockServer(create_mock_linkedin(latency=args.linkedin_latency)) as linkedin, \
+            tempfile.TemporaryDirectory() as storage, \
+            tempfile.TemporaryFile("w+") as log:
+        port = free_port()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+            cwd=BACKEND, env=server_env(openai_server.url, postgrest.url, storage, args.concurrency, linkedin.url),
+            stdout=log, stderr=subprocess.STDOUT,
+        )
+        print(f"{'scenario':22} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8} {'RSS MB':>7}  errors")
+        try:
+            scenario_results = asyncio.run(
+                run_suite(f"http://127.0.0.1:{port}", process, scenarios, args.requests, args.concurrency)
+            )
+        except Exception:
+            log.seek(0)
+            print(log.read()[-4000:], file=sys.stderr)
+            raise
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    results = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "scenarios": scenario_results,
+    }
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            if compare(results, json.load(f), args.tolerance):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
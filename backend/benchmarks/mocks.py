@@ -0,0 +1,304 @@
+"""Local stand-ins for the upstream services used by the benchmarks."""
+import asyncio
+import json
+import random
+import re
+import socket
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def requested_schema(body: dict) -> Optional[dict]:
+    """The JSON template of a resume extraction prompt, which is itself a valid (empty) answer."""
+    prompt = body["messages"][-1]["content"]
+    start = prompt.find("Return the data in this detailed JSON format:")
+    end = prompt.find("Resume text:")
+    if start == -1 or end == -1:
+        return None
+    return json.loads(prompt[prompt.index("{", start):end])
+
+
+def default_reply(body: dict) -> str:
+    """Return a response that is valid for every prompt the backend sends."""
+    if body.get("response_format", {}).get("type") == "json_object":
+        return json.dumps(requested_schema(body) or {"mock": True})
+    return "Mock career advice.\n\nUpdate your resume.\n\nNetwork with peers."
+
+
+def completion_chunk(model: str, delta: dict, finish_reason: Optional[str] = None) -> str:
+    chunk = {
+        "id": "chatcmpl-mock",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(chunk)}\n\n"
+
+
+def usage_chunk(model: str, usage: dict) -> str:
+    """The final chunk sent when the request sets ``stream_options.include_usage``."""
+    chunk = {
+        "id": "chatcmpl-mock",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [],
+        "usage": usage,
+    }
+    return f"data: {json.dumps(chunk)}\n\n"
+
+
+def create_mock_openai(
+    latency: float = 1.0,
+    reply: Callable[[dict], str] = default_reply,
+    token_delay: float = 0.0,
+    error_rate: float = 0.0,
+    error_status: int = 500,
+    slow_rate: float = 0.0,
+    slow_latency: float = 0.0,
+    failing_models: Iterable[str] = (),
+) -> FastAPI:
+    """Mock of the OpenAI chat completions API.
+
+    Each call waits ``latency`` seconds before the first token and
+    ``token_delay`` seconds per generated token (approximated as words and
+    punctuation), for both regular and ``stream=True`` requests.
+
+    Faults can be injected, and changed later through ``app.state``: a
+    fraction ``error_rate`` of calls fails with ``error_status``, a fraction
+    ``slow_rate`` takes ``slow_latency`` extra seconds, and every call for a
+    model in ``failing_models`` fails. ``app.state.calls`` counts calls per model.
+    """
+    mock = FastAPI()
+    mock.state.error_rate = error_rate
+    mock.state.error_status = error_status
+    mock.state.slow_rate = slow_rate
+    mock.state.slow_latency = slow_latency
+    mock.state.failing_models = set(failing_models)
+    mock.state.calls = Counter()
+
+    @mock.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "mock")
+        mock.state.calls[model] += 1
+        await asyncio.sleep(latency)
+        if model in mock.state.failing_models or random.random() < mock.state.error_rate:
+            error = {"error": {"message": "injected failure", "type": "server_error", "code": None}}
+            return Response(status_code=mock.state.error_status, content=json.dumps(error), media_type="application/json")
+        if random.random() < mock.state.slow_rate:
+            await asyncio.sleep(mock.state.slow_latency)
+        content = reply(body)
+        tokens = re.findall(r"\s*\S+", content) or [content]
+        # Roughly four characters per token, like tiktoken for English text
+        prompt_tokens = len(json.dumps(body.get("messages", []))) // 4
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(tokens), "total_tokens": prompt_tokens + len(tokens)}
+        if body.get("stream"):
+            async def chunks():
+                yield completion_chunk(model, {"role": "assistant", "content": ""})
+                for token in tokens:
+                    await asyncio.sleep(token_delay)
+                    yield completion_chunk(model, {"content": token})
+                yield completion_chunk(model, {}, "stop")
+                if (body.get("stream_options") or {}).get("include_usage"):
+                    yield usage_chunk(model, usage)
+                yield "data: [DONE]\n\n"
+            return StreamingResponse(chunks(), media_type="text/event-stream")
+        await asyncio.sleep(token_delay * len(tokens))
+        return {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        }
+
+    return mock
+
+
+# The keyset filter built by pagination.keyset_filter
+KEYSET_RE = re.compile(r'\(created_at\.lt\."([^"]*)",and\(created_at\.eq\."([^"]*)",id\.lt\."([^"]*)"\)\)')
+
+
+# Columns of the tables whose inserts are checked, as created by supabase/migrations:
+# column -> whether it is NOT NULL without a default
+TABLE_SCHEMAS: Dict[str, Dict[str, bool]] = {
+    "resumes": {
+        "id": False, "file_name": True, "file_content": False, "storage_path": False, "file_type": True,
+        "file_size": True, "extracted_data": True, "created_at": False, "updated_at": False,
+    },
+}
+
+
+def schema_error(schema: Dict[str, bool], row: dict) -> Optional[dict]:
+    """The error PostgREST answers an insert of ``row`` with, if any."""
+    for column in row:
+        if column not in schema:
+            return {"code": "PGRST204", "message": f"Could not find the '{column}' column in the schema cache"}
+    for column, required in schema.items():
+        if required and row.get(column) is None:
+            return {"code": "23502", "message": f'null value in column "{column}" violates not-null constraint'}
+    return None
+
+
+def create_fake_postgrest(latency: float = 0.05, fail_rate: float = 0.0,
+                          schemas: Dict[str, Dict[str, bool]] = TABLE_SCHEMAS) -> FastAPI:
+    """Fake PostgREST endpoint that keeps inserted rows in ``app.state.tables``.
+
+    ``fail_rate`` is the probability of answering a request with a 503, for
+    exercising retries. Inserts into tables in ``schemas`` are rejected with
+    a 400 for unknown columns or missing NOT NULL values, like PostgREST.
+    """
+    fake = FastAPI()
+    fake.state.tables: Dict[str, List[dict]] = {}
+    fake.state.requests = 0
+    fake.state.fail_rate = fail_rate
+    fake.state.bytes_sent = 0
+
+    @fake.post("/rest/v1/{table}")
+    async def insert(table: str, request: Request):
+        fake.state.requests += 1
+        await asyncio.sleep(latency)
+        if random.random() < fake.state.fail_rate:
+            return Response(status_code=503, content=json.dumps({"message": "injected failure"}))
+        body = await request.json()
+        rows = body if isinstance(body, list) else [body]
+        if table in schemas:
+            for row in rows:
+                error = schema_error(schemas[table], row)
+                if error:
+                    return Response(status_code=400, content=json.dumps(error), media_type="application/json")
+        fake.state.tables.setdefault(table, []).extend(rows)
+        return Response(status_code=201, content=json.dumps(rows), media_type="application/json")
+
+    @fake.post("/auth/v1/signup")
+    async def signup(request: Request):
+        fake.state.requests += 1
+        await asyncio.sleep(latency)
+        body = await request.json()
+        user = {
+            "id": str(uuid.uuid4()),
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": body["email"],
+            "app_metadata": {},
+            "user_metadata": body.get("data") or {},
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+        fake.state.tables.setdefault("auth.users", []).append(user)
+        return user
+
+    @fake.get("/rest/v1/{table}")
+    async def select(table: str, request: Request):
+        """Supports the subset of PostgREST the backend uses: select, eq, order, limit and keyset ``or``."""
+        fake.state.requests += 1
+        await asyncio.sleep(latency)
+        rows = list(fake.state.tables.get(table, []))
+        params = request.query_params
+        for column, value in params.items():
+            if value.startswith("eq."):
+                rows = [row for row in rows if str(row.get(column)) == value[3:]]
+        if "or" in params:
+            match = KEYSET_RE.fullmatch(params["or"])
+            created_at, row_id = match.group(1), match.group(3)
+            rows = [row for row in rows if (row["created_at"], row["id"]) < (created_at, row_id)]
+        for order in reversed(params.get("order", "").split(",") if params.get("order") else []):
+            column, _, direction = order.partition(".")
+            rows.sort(key=lambda row: row.get(column) or "", reverse=direction.startswith("desc"))
+        if "limit" in params:
+            rows = rows[:int(params["limit"])]
+        columns = params.get("select", "*")
+        if columns != "*":
+            rows = [{column: row.get(column) for column in columns.split(",")} for row in rows]
+        content = json.dumps(rows)
+        fake.state.bytes_sent += len(content)
+        return Response(content=content, media_type="application/json")
+
+    return fake
+
+
+def create_mock_linkedin(latency: float = 0.1) -> FastAPI:
+    """Mock of the LinkedIn OAuth token endpoint and the profile and email APIs.
+
+    Serve it at LINKEDIN_OAUTH_URL=<url>/oauth/v2 and LINKEDIN_API_URL=<url>/v2.
+    Every call waits ``latency`` seconds; ``app.state.calls`` counts calls per
+    path and ``app.state.connections`` holds the client ports seen, i.e. the
+    number of TCP connections opened.
+    """
+    mock = FastAPI()
+    mock.state.calls = Counter()
+    mock.state.connections = set()
+
+    async def record(request: Request) -> None:
+        mock.state.calls[request.url.path] += 1
+        mock.state.connections.add(request.client.port)
+        await asyncio.sleep(latency)
+
+    @mock.post("/oauth/v2/accessToken")
+    async def access_token(request: Request):
+        await record(request)
+        form = await request.form()
+        if form.get("code") == "invalid":
+            return Response(status_code=400, content=json.dumps({"error": "invalid_grant"}), media_type="application/json")
+        return {"access_token": f"token-{form.get('code')}", "expires_in": 5184000}
+
+    @mock.get("/v2/me")
+    async def me(request: Request):
+        await record(request)
+        member = request.headers["authorization"].removeprefix("Bearer token-")
+        return {"id": member, "localizedFirstName": "Mock", "localizedLastName": f"Member {member}"}
+
+    @mock.get("/v2/emailAddress")
+    async def email_address(request: Request):
+        await record(request)
+        member = request.headers["authorization"].removeprefix("Bearer token-")
+        return {"elements": [{"handle": "urn:li:emailAddress:1", "handle~": {"emailAddress": f"{member}@example.com"}}]}
+
+    return mock
+
+
+# Syntactically valid anon key accepted by supabase.create_client
+FAKE_SUPABASE_KEY = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.mock"
+
+
+class MockServer:
+    """Run an ASGI app with uvicorn in a background thread."""
+
+    def __init__(self, app: FastAPI, port: Optional[int] = None):
+        self.port = port or free_port()
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "MockServer":
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.should_exit = True
+        self.thread.join()
@@ -0,0 +1,76 @@
+"""Wall-clock time of one-prompt vs section-parallel resume extraction against a mock LLM.
+
+The mock answers each extraction prompt with the requested sections of a
+real extracted resume and streams them at a fixed delay per output token,
+so latency grows with the size of the answer, as it does with the real
+model. Parallel extraction splits the schema into extraction.SECTION_GROUPS
+and streams every group's completion concurrently.
+
+Usage: python benchmarks/parallel_extraction.py [--resumes 5] [--token-delay 0.005]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+from mocks import MockServer, create_mock_openai, requested_schema
+from pdf_corpus import resume_pdf
+
+RESUME = json.load(open(os.path.join(BACKEND, "resume_analysis.json"), encoding="utf-8"))["data"]
+
+
+def resume_reply(body: dict) -> str:
+    schema = requested_schema(body)
+    if schema is None:
+        return json.dumps({"mock": True})
+    return json.dumps({name: RESUME.get(name, value) for name, value in schema.items()}, indent=2)
+
+
+async def run(mock, resumes: int) -> None:
+    import main
+
+    for parallel in (False, True):
+        main.EXTRACTION_PARALLEL = parallel
+        mock.state.calls.clear()
+        timings, first_sections = [], []
+        for seed in range(resumes):
+            # A new document each time, so the extraction cache never answers
+            content = resume_pdf(seed=seed + (resumes if parallel else 0))
+            await main.resume_processor.text_extractor.extract(content)
+            start = time.perf_counter()
+            first = None
+            async for event, data in main.resume_processor.stream_resume_extraction(content):
+                if event == "section" and first is None:
+                    first = time.perf_counter() - start
+            timings.append(time.perf_counter() - start)
+            first_sections.append(first)
+        label = "parallel" if parallel else "one prompt"
+        calls = ", ".join(f"{model} x{count // resumes}" for model, count in sorted(mock.state.calls.items()))
+        print(f"{label:10} p50 {statistics.median(timings):6.2f}s  max {max(timings):6.2f}s  "
+              f"first section {statistics.median(first_sections):5.2f}s  sections complete: {len(data)}  "
+              f"calls per resume: {calls}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.5, help="time to first token in seconds")
+    parser.add_argument("--token-delay", type=float, default=0.005, help="seconds per generated token")
+    args = parser.parse_args()
+
+    mock = create_mock_openai(args.latency, resume_reply, args.token_delay)
+    with MockServer(mock) as server:
+        os.environ["OPENAI_BASE_URL"] = f"{server.url}/v1"
+        os.environ.setdefault("OPENAI_API_KEY", "mock")
+        os.environ["SEARCH_INDEX_PATH"] = ""
+        asyncio.run(run(mock, args.resumes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Generate text PDFs for benchmarks without any PDF-writing dependency."""
+import random
+from typing import List
+
+WORDS = (
+    "kubernetes docker terraform ansible python golang aws azure gcp jenkins gitlab ci cd "
+    "monitoring prometheus grafana linux networking security automation pipelines scaling "
+    "led team delivered reduced costs improved reliability migrated designed implemented"
+).split()
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: List[List[str]]) -> bytes:
+    """Build a PDF with one page per entry in ``pages``, each a list of text lines."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for lines in pages:
+        stream = "BT /F1 10 Tf 50 780 Td 12 TL " + " ".join(f"({_escape(line)}) '" for line in lines) + " ET"
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream.encode("latin-1")))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def resume_pdf(pages: int = 2, lines_per_page: int = 55, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    return make_pdf([
+        [" ".join(rng.choice(WORDS) for _ in range(12)) for _ in range(lines_per_page)]
+        for _ in range(pages)
+    ])
+
+
+def corpus(documents: int, pages: int) -> List[bytes]:
+    return [resume_pdf(pages, seed=i) for i in range(documents)]
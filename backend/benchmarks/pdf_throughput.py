@@ -0,0 +1,78 @@
+"""PDF text extraction throughput as the process pool grows.
+
+Parses a corpus of generated multi-page PDFs with TextExtractor at each
+worker count up to the number of cores, and compares it with the original
+inline loop on the event loop thread. Also reports how long a concurrent
+health-check style coroutine is delayed while parsing runs.
+
+Usage: python benchmarks/pdf_throughput.py [--documents 40] [--pages 4]
+"""
+import argparse
+import asyncio
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import PyPDF2
+
+from documents import TextExtractor
+from pdf_corpus import corpus
+
+
+async def inline(content: bytes) -> str:
+    # The original implementation: parse on the event loop with repeated +=
+    text = ""
+    for page in PyPDF2.PdfReader(io.BytesIO(content)).pages:
+        text += page.extract_text()
+    return text
+
+
+async def probe_delay(stop: asyncio.Event) -> float:
+    """Largest scheduling delay seen by a coroutine that wakes every 10ms."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        worst = max(worst, time.perf_counter() - start - 0.01)
+    return worst
+
+
+async def run(label: str, parse, documents) -> None:
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_delay(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(parse(document) for document in documents))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    delay = await probe
+    print(f"{label:12} {len(documents) / elapsed:7.1f} docs/s  worst loop stall {delay * 1000:7.1f}ms")
+
+
+async def main_async(documents, max_workers: int, pages: int) -> None:
+    await run("inline", inline, documents)
+    workers = 1
+    while workers <= max_workers:
+        extractor = TextExtractor(workers=workers, max_pages=pages)
+        await extractor.extract(documents[0])  # start the pool outside the measurement
+        await run(f"{workers} worker(s)", extractor.extract, documents)
+        extractor.shutdown()
+        workers *= 2
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=40)
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    documents = corpus(args.documents, args.pages)
+    print(f"{args.documents} documents x {args.pages} pages, {os.cpu_count()} cores")
+    asyncio.run(main_async(documents, args.max_workers, args.pages))
+
+
+if __name__ == "__main__":
+    main()
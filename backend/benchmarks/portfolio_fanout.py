@@ -0,0 +1,75 @@
+"""Compare combined vs per-style parallel portfolio generation against a mock LLM.
+
+The mock streams every output token with a fixed delay, so latency grows
+with the amount of HTML generated, as it does with the real model.
+
+Usage: python benchmarks/portfolio_fanout.py [--page-tokens 300] [--token-delay 0.003] [--fail-style creative]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mocks import MockServer, create_mock_openai
+
+STYLES = ["minimal", "creative", "professional", "dynamic"]
+
+
+def portfolio_reply(page_tokens: int, fail_style: str):
+    def page(style: str) -> dict:
+        body = " ".join(f"<p>{style}-{i}</p>" for i in range(page_tokens))
+        return {"html": f"<html>{body}</html>", "style": f"{style} design"}
+
+    def reply(body: dict) -> str:
+        prompt = body["messages"][-1]["content"]
+        if "four unique portfolio" in prompt:
+            return json.dumps({style: page(style) for style in STYLES})
+        style = next(style for style in STYLES if f"for {style} design" in prompt)
+        if style == fail_style:
+            return "not json"
+        return json.dumps(page(style))
+
+    return reply
+
+
+async def run(rounds: int) -> None:
+    import main
+
+    resume = json.load(open(os.path.join(os.path.dirname(main.__file__), "resume_analysis.json")))["data"]
+    main.deps.persistence.start()
+    for parallel in (False, True):
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            result = await main.resume_processor.generate_portfolio(resume, parallel=parallel)
+            timings.append(time.perf_counter() - start)
+        label = "parallel" if parallel else "combined"
+        print(f"{label:9} {min(timings):6.2f}s best of {rounds}  styles={sorted(result['portfolios'])} "
+              f"errors={result['errors']}")
+    subset_start = time.perf_counter()
+    await main.resume_processor.generate_portfolio(resume, styles=["minimal"], parallel=True)
+    print(f"subset    {time.perf_counter() - subset_start:6.2f}s  styles=['minimal']")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-tokens", type=int, default=300, help="tokens of HTML per portfolio page")
+    parser.add_argument("--token-delay", type=float, default=0.003, help="seconds per generated token")
+    parser.add_argument("--latency", type=float, default=0.3, help="time to first token in seconds")
+    parser.add_argument("--fail-style", default="", help="style for which the mock returns invalid JSON")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    mock = create_mock_openai(args.latency, portfolio_reply(args.page_tokens, args.fail_style), args.token_delay)
+    with MockServer(mock) as server:
+        os.environ["OPENAI_BASE_URL"] = f"{server.url}/v1"
+        os.environ.setdefault("OPENAI_API_KEY", "mock")
+        asyncio.run(run(args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Resume prompt tokens before and after compact serialization.
+
+Runs every generator's serializer over the sample extractions in
+backend/resume_analysis*.json (or the given files) and prints the token
+count of the old pretty-printed full dump next to the compact, projected
+and budgeted version.
+
+Usage: python benchmarks/prompt_tokens.py [files...]
+"""
+import glob
+import json
+import os
+import sys
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+import prompting
+from prompting import PROJECTIONS, serialize_resume
+
+
+def main() -> None:
+    files = sys.argv[1:] or sorted(glob.glob(os.path.join(BACKEND, "resume_analysis*.json")))
+    tokenizer = "tiktoken cl100k_base" if prompting._encoding() is not None else "~4 chars/token estimate"
+    print(f"tokenizer: {tokenizer}")
+    print(f"{'file':40} {'generator':13} {'before':>7} {'after':>7} {'saved':>6} {'ms':>6}")
+    for path in files:
+        with open(path, encoding="utf-8") as f:
+            resume = json.load(f)
+        resume = resume.get("data", resume)
+        for purpose in PROJECTIONS:
+            start = time.perf_counter()
+            _, stats = serialize_resume(resume, purpose)
+            elapsed = (time.perf_counter() - start) * 1000
+            saved = 1 - stats["tokens_after"] / stats["tokens_before"]
+            print(f"{os.path.basename(path):40} {purpose:13} {stats['tokens_before']:7} "
+                  f"{stats['tokens_after']:7} {saved:6.0%} {elapsed:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
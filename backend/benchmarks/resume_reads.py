@@ -0,0 +1,101 @@
+"""Bytes and latency of the resume read endpoints against a fake PostgREST server.
+
+Seeds the resumes table with rows that still carry a base64 file_content
+column (as rows written before object storage do), then compares the old
+``select("*")`` latest-resume query with the projected endpoint, a polling
+client revalidating with If-None-Match, and keyset paging through history.
+
+Usage: python benchmarks/resume_reads.py [--rows 500] [--file-kb 300] [--polls 50]
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+
+from mocks import FAKE_SUPABASE_KEY, MockServer, create_fake_postgrest
+
+
+def seed(rows: int, file_kb: int) -> list:
+    resume = json.load(open(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resume_analysis.json")))["data"]
+    content = base64.b64encode(os.urandom(file_kb * 1024)).decode("ascii")
+    return [
+        {"id": str(uuid.UUID(int=i)), "file_name": f"resume-{i}.pdf", "file_type": "application/pdf",
+         "file_size": file_kb * 1024, "file_content": content, "extracted_data": resume,
+         "created_at": f"2025-05-{1 + i // 1000:02d}T00:{i // 60 % 60:02d}:{i % 60:02d}", "updated_at": f"2025-05-17T{i}"}
+        for i in range(rows)
+    ]
+
+
+async def run(fake, polls: int) -> None:
+    import main
+
+    def measure(label: str, requests: int, elapsed: float) -> None:
+        print(f"{label:28} {elapsed / requests * 1000:7.1f}ms/request  "
+              f"{fake.state.bytes_sent / requests / 1024:9.1f}KB/request from the database")
+
+    fake.state.bytes_sent = 0
+    start = time.perf_counter()
+    for _ in range(polls):
+        await asyncio.to_thread(
+            lambda: main.deps.supabase.table("resumes").select("*").order("created_at", desc=True).limit(1).execute()
+        )
+    measure('old select("*") latest', polls, time.perf_counter() - start)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        fake.state.bytes_sent = 0
+        start = time.perf_counter()
+        for _ in range(polls):
+            response = await client.get("/api/resume/latest")
+        measure("projected latest", polls, time.perf_counter() - start)
+
+        etag = response.headers["etag"]
+        fake.state.bytes_sent = 0
+        start = time.perf_counter()
+        for _ in range(polls):
+            response = await client.get("/api/resume/latest", headers={"If-None-Match": etag})
+            assert response.status_code == 304
+        measure("latest with If-None-Match", polls, time.perf_counter() - start)
+
+        fake.state.bytes_sent = 0
+        start = time.perf_counter()
+        pages, seen, cursor = 0, 0, None
+        while True:
+            params = {"limit": 50, **({"cursor": cursor} if cursor else {})}
+            page = (await client.get("/api/resume/history", params=params)).json()["data"]
+            pages += 1
+            seen += len(page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        measure(f"history ({seen} rows, {pages} pages)", pages, time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--file-kb", type=int, default=300, help="size of each stored file before base64")
+    parser.add_argument("--polls", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.01, help="fake PostgREST latency in seconds")
+    args = parser.parse_args()
+
+    fake = create_fake_postgrest(latency=args.latency)
+    fake.state.tables["resumes"] = seed(args.rows, args.file_kb)
+    with MockServer(fake) as server:
+        os.environ["VITE_SUPABASE_URL"] = server.url
+        os.environ["VITE_SUPABASE_ANON_KEY"] = FAKE_SUPABASE_KEY
+        os.environ["SEARCH_INDEX_PATH"] = ""
+        asyncio.run(run(fake, args.polls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Build, reload and query the resume search index at 10k and 100k resumes.
+
+Generates synthetic extractions, indexes them into a temporary log file,
+then times queries against the index and against a linear scan of the
+extracted data (what filtering the resumes JSONB would cost in-process).
+
+Usage: python benchmarks/search_index.py [--sizes 10000 100000] [--queries 200]
+"""
+import argparse
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ats import KNOWN_SKILLS, resume_terms
+from search import ResumeIndex
+
+TITLES = ["DevOps Engineer", "Site Reliability Engineer", "Backend Developer", "Data Engineer",
+          "Cloud Architect", "Frontend Developer", "Platform Engineer", "ML Engineer", "QA Engineer"]
+SENIORITY = ["", "Senior ", "Lead ", "Principal ", "Junior "]
+COMPANIES = [f"{prefix} {suffix}" for prefix in ("Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark",
+                                                 "Wayne", "Tata", "Infosys", "Ashnik")
+             for suffix in ("Technologies", "Solutions", "Labs", "Consulting")]
+CITIES = ["Mumbai", "Pune", "Bengaluru", "London", "Berlin", "New York", "Singapore", "Remote"]
+
+
+def synthetic_resume(rng: random.Random, skills: list) -> dict:
+    return {
+        "personalInfo": {"name": f"Candidate {rng.randrange(10**6)}", "location": rng.choice(CITIES)},
+        "workExperience": [
+            {"position": rng.choice(SENIORITY) + rng.choice(TITLES), "company": rng.choice(COMPANIES),
+             "technologies_used": rng.sample(skills, 4)}
+            for _ in range(rng.randint(1, 4))
+        ],
+        "skills": {"technical": rng.sample(skills, rng.randint(5, 15)), "soft": ["communication"]},
+        "ats_optimization": {"keywords": rng.sample(skills, 5)},
+    }
+
+
+def percentiles(timings: list) -> str:
+    timings = sorted(timings)
+    return f"p50 {statistics.median(timings):7.2f}ms  p99 {timings[int(len(timings) * 0.99) - 1]:7.2f}ms"
+
+
+def run(size: int, queries: int, embedding_dim: int) -> None:
+    rng = random.Random(size)
+    skills = sorted(KNOWN_SKILLS)
+    resumes = [synthetic_resume(rng, skills) for _ in range(size)]
+    path = os.path.join(tempfile.mkdtemp(), "index.jsonl")
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    index = ResumeIndex(path, embedding_dim)
+    start = time.perf_counter()
+    for i, resume in enumerate(resumes):
+        index.add(f"resume-{i}", resume, f"2025-01-01T00:00:{i:08d}")
+    build = time.perf_counter() - start
+    index.close()
+    grown = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss) / 1024
+    start = time.perf_counter()
+    index = ResumeIndex(path, embedding_dim)
+    reload = time.perf_counter() - start
+    print(f"\n{size} resumes: build {build:.1f}s ({size / build:,.0f}/s), reload {reload:.1f}s, "
+          f"log {os.path.getsize(path) / 1e6:.1f}MB, peak RSS +{grown:.0f}MB")
+
+    cases = {
+        "one skill": lambda: index.search(rng.choice(skills)),
+        "3-term query": lambda: index.search(" ".join(rng.sample(skills, 3))),
+        "query+filters": lambda: index.search(rng.choice(skills), skills=[rng.choice(skills)],
+                                              title=rng.choice(TITLES), location=rng.choice(CITIES)),
+        "newest, filter": lambda: index.search(skills=[rng.choice(skills)], limit=20, offset=40),
+    }
+    for label, case in cases.items():
+        timings = []
+        for _ in range(queries):
+            start = time.perf_counter()
+            case()
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"  index {label:15} {percentiles(timings)}")
+
+    timings = []
+    for _ in range(max(queries // 20, 3)):
+        wanted = rng.choice(skills)
+        start = time.perf_counter()
+        [resume for resume in resumes if wanted in resume_terms(resume)][:20]
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"  scan  {'one skill':15} {percentiles(timings)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--embedding-dim", type=int, default=256, help="0 disables embeddings")
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.queries, args.embedding_dim)
+
+
+if __name__ == "__main__":
+    main()
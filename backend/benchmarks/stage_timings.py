@@ -0,0 +1,88 @@
+"""Per-stage breakdown of /api/resume/process from its Server-Timing header.
+
+Uploads generated resume PDFs against a mock OpenAI server and a fake
+PostgREST server, averages each stage reported in Server-Timing, then
+prints the request, LLM token and database write series from /metrics
+(inserts are written behind the response, so they only show up there).
+
+Usage: python benchmarks/stage_timings.py [--uploads 20] [--latency 0.5]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+
+from mocks import FAKE_SUPABASE_KEY, MockServer, create_fake_postgrest, create_mock_openai
+from pdf_corpus import resume_pdf
+
+METRIC_PREFIXES = ("http_request_duration_seconds_count", "llm_tokens_total", "db_write_duration_seconds_count",
+                   "db_rows_written_total", "cache_hit_ratio")
+
+
+def parse_server_timing(header: str) -> dict:
+    timings = {}
+    for entry in header.split(","):
+        name, _, duration = entry.strip().partition(";dur=")
+        timings[name] = timings.get(name, 0.0) + float(duration)
+    return timings
+
+
+async def run(uploads: int) -> None:
+    import main
+
+    stages = defaultdict(list)
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.lifespan(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60) as client:
+            for i in range(uploads):
+                files = {"file": (f"resume-{i}.pdf", resume_pdf(seed=i), "application/pdf")}
+                response = await client.post("/api/resume/process", files=files)
+                response.raise_for_status()
+                for stage, duration in parse_server_timing(response.headers["server-timing"]).items():
+                    stages[stage].append(duration)
+    # Leaving the lifespan flushed the write-behind queue, so the inserts are in /metrics
+
+    print(f"{'stage':24} {'mean ms':>9} {'share':>7}")
+    total = sum(stages["app"]) / uploads
+    for stage, durations in sorted(stages.items(), key=lambda item: -sum(item[1])):
+        mean = sum(durations) / uploads
+        print(f"{stage:24} {mean:9.1f} {mean / total:7.1%}")
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        metrics = (await client.get("/metrics")).text
+    print()
+    for line in metrics.splitlines():
+        if line.startswith(METRIC_PREFIXES) and 'route="/metrics"' not in line:
+            print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5, help="mock OpenAI time to first token in seconds")
+    parser.add_argument("--db-latency", type=float, default=0.02, help="fake PostgREST latency in seconds")
+    args = parser.parse_args()
+
+    with MockServer(create_mock_openai(latency=args.latency)) as openai_server, \
+            MockServer(create_fake_postgrest(latency=args.db_latency)) as postgrest, \
+            tempfile.TemporaryDirectory() as storage:
+        os.environ["OPENAI_BASE_URL"] = f"{openai_server.url}/v1"
+        os.environ.setdefault("OPENAI_API_KEY", "mock")
+        os.environ["VITE_SUPABASE_URL"] = postgrest.url
+        os.environ["VITE_SUPABASE_ANON_KEY"] = FAKE_SUPABASE_KEY
+        os.environ["RESUME_STORAGE"] = "local"
+        os.environ["RESUME_STORAGE_DIR"] = storage
+        os.environ["SEARCH_INDEX_PATH"] = ""
+        os.environ["EXTRACTION_CACHE_PATH"] = ""
+        asyncio.run(run(args.uploads))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Startup cost of the backend: cold import and time to first request.
+
+"import" is a cold ``import main`` in a fresh interpreter with no Supabase
+credentials, as a test or tooling import sees it. "import + clients" also
+creates every shared client (OpenAI SDK, Supabase, HTTP pools, search
+index, PyPDF2), which is what importing the app used to do; the
+difference is the work now deferred to first use.
+
+Time to first request starts uvicorn against mock OpenAI and PostgREST
+servers and measures from spawning the process until ``/`` answers, then
+the first and second /api/career-advice requests, the first of which
+creates the OpenAI and Supabase clients.
+
+Usage: python benchmarks/startup.py [--runs 5]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+import httpx
+
+from mocks import FAKE_SUPABASE_KEY, MockServer, create_fake_postgrest, create_mock_openai, free_port
+
+IMPORT = "import time; start = time.perf_counter(); import main; {extra}print(time.perf_counter() - start)"
+CREATE_CLIENTS = (
+    "main.deps.llm.client; main.deps.supabase; main.deps.http_clients.get('openai'); "
+    "main.deps.search_index; import PyPDF2; "
+)
+
+
+def timed_import(extra: str, env: dict) -> float:
+    output = subprocess.run([sys.executable, "-c", IMPORT.format(extra=extra)], cwd=BACKEND, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def advice_reply(body: dict) -> str:
+    return "Learn the fundamentals first.\n\nThen build something real with them."
+
+
+async def first_requests(base_url: str, process: subprocess.Popen, spawned: float) -> tuple:
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}")
+            try:
+                if (await client.get("/")).status_code == 200:
+                    break
+            except httpx.TransportError:
+                await asyncio.sleep(0.01)
+        ready = time.perf_counter() - spawned
+        timings = []
+        for i in range(2):
+            start = time.perf_counter()
+            response = await client.post("/api/career-advice", json={"query": f"How do I move into DevOps? ({i})"})
+            response.raise_for_status()
+            timings.append(time.perf_counter() - start)
+        return ready, timings[0], timings[1]
+
+
+def serve(openai_url: str, postgrest_url: str) -> tuple:
+    env = {
+        **os.environ,
+        "OPENAI_BASE_URL": f"{openai_url}/v1",
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "mock"),
+        "VITE_SUPABASE_URL": postgrest_url,
+        "VITE_SUPABASE_ANON_KEY": FAKE_SUPABASE_KEY,
+        "SEARCH_INDEX_PATH": "",
+        "EXTRACTION_CACHE_PATH": "",
+    }
+    port = free_port()
+    with tempfile.TemporaryFile("w+") as log:
+        spawned = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+            cwd=BACKEND, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+        try:
+            return asyncio.run(first_requests(f"http://127.0.0.1:{port}", process, spawned))
+        except Exception:
+            log.seek(0)
+            print(log.read(), file=sys.stderr)
+            raise
+        finally:
+            process.terminate()
+            process.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05, help="mock OpenAI time to first token in seconds")
+    args = parser.parse_args()
+
+    # Empty values are not overridden by .env, so the import really has no credentials
+    bare = {**os.environ, "VITE_SUPABASE_URL": "", "VITE_SUPABASE_ANON_KEY": "", "SEARCH_INDEX_PATH": ""}
+    configured = {**bare, "VITE_SUPABASE_URL": "http://127.0.0.1:9", "VITE_SUPABASE_ANON_KEY": FAKE_SUPABASE_KEY,
+                  "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "mock")}
+    imports = [timed_import("", bare) for _ in range(args.runs)]
+    eager = [timed_import(CREATE_CLIENTS, configured) for _ in range(args.runs)]
+    print(f"{'import':24} p50 {statistics.median(imports) * 1000:7.1f}ms  min {min(imports) * 1000:7.1f}ms")
+    print(f"{'import + clients':24} p50 {statistics.median(eager) * 1000:7.1f}ms  min {min(eager) * 1000:7.1f}ms")
+
+    with MockServer(create_mock_openai(args.latency, advice_reply)) as openai_server, \
+            MockServer(create_fake_postgrest(latency=0.01)) as postgrest:
+        runs = [serve(openai_server.url, postgrest.url) for _ in range(args.runs)]
+    for label, index in (("spawn to first response", 0), ("first career advice", 1), ("second career advice", 2)):
+        values = [run[index] for run in runs]
+        print(f"{label:24} p50 {statistics.median(values) * 1000:7.1f}ms  max {max(values) * 1000:7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
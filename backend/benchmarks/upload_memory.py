@@ -0,0 +1,83 @@
+"""Peak memory of resume upload handling under concurrent uploads, before and after.
+
+"before" reproduces the original handler: read the whole upload, then
+base64-encode it for the resumes.file_content column. "after" reads the
+upload in bounded chunks and writes the raw bytes to an object store,
+which is the default (RESUME_INLINE_FILE_CONTENT=false).
+Oversized uploads are included to show that the limit is enforced
+while reading.
+
+Usage: python benchmarks/upload_memory.py [--concurrency 20] [--size-mb 4]
+"""
+import argparse
+import asyncio
+import base64
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException, UploadFile
+
+from storage import LocalObjectStore
+from uploads import read_upload
+
+MAX_FILE_SIZE = 5 * 1024 * 1024
+
+
+def make_upload(size: int) -> UploadFile:
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    spooled.write(os.urandom(size))
+    spooled.seek(0)
+    return UploadFile(spooled, size=size, filename="resume.pdf")
+
+
+async def before(file: UploadFile, store: LocalObjectStore) -> None:
+    content = await file.read()
+    if len(content) > MAX_FILE_SIZE:
+        return
+    record = {"file_content": base64.b64encode(content).decode("utf-8")}
+    await asyncio.sleep(0)
+    del record
+
+
+async def after(file: UploadFile, store: LocalObjectStore) -> None:
+    try:
+        content = await read_upload(file, MAX_FILE_SIZE)
+    except HTTPException:
+        return
+    await store.put(f"{id(file)}.pdf", content)
+
+
+async def measure(handler, concurrency: int, size: int, oversized: int, store: LocalObjectStore) -> int:
+    uploads = [make_upload(size) for _ in range(concurrency)]
+    uploads += [make_upload(MAX_FILE_SIZE * 4) for _ in range(oversized)]
+    tracemalloc.start()
+    await asyncio.gather(*(handler(upload, store) for upload in uploads))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    for upload in uploads:
+        await upload.close()
+    return peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--size-mb", type=float, default=4)
+    parser.add_argument("--oversized", type=int, default=5, help="concurrent 20MB uploads mixed in")
+    args = parser.parse_args()
+
+    size = int(args.size_mb * 1024 * 1024)
+    with tempfile.TemporaryDirectory() as root:
+        store = LocalObjectStore(root)
+        for name, handler in (("before", before), ("after", after)):
+            peak = asyncio.run(measure(handler, args.concurrency, size, args.oversized, store))
+            print(f"{name:6} peak {peak / 1024 / 1024:8.1f}MB for {args.concurrency} x {args.size_mb}MB "
+                  f"+ {args.oversized} x 20MB uploads ({peak / (args.concurrency * size):.2f}x upload bytes)")
+
+
+if __name__ == "__main__":
+    main()
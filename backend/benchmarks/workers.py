@@ -0,0 +1,139 @@
+"""Throughput of ``run.py --production`` by worker count, and a graceful-shutdown check.
+
+For each worker count the server is started through run.py against the
+load suite's mock OpenAI and fake PostgREST servers, and a few routes are
+driven at ``--concurrency``: ATS scoring is CPU bound and scales with
+cores, career advice mostly waits on the LLM, search reads the shared
+index. The speed-up of a CPU-bound route is capped by the number of cores
+(``os.cpu_count()`` is printed).
+
+The drain check then sends ``--concurrency`` career advice requests to the
+largest configuration, sends SIGTERM while they are in flight and counts
+how many still got an answer and how many of their database rows reached
+the fake PostgREST before the server exited.
+
+Usage: python benchmarks/workers.py [--workers 1,2,4] [--requests 200] [--concurrency 32]
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+
+import httpx
+
+from load_suite import BACKEND, SCENARIOS, completion_reply, run_scenario, server_env, wait_until_ready
+from mocks import MockServer, create_fake_postgrest, create_mock_openai, free_port
+
+DEFAULT_SCENARIOS = "ats-score,career-advice,search"
+
+
+def start_server(workers: int, port: int, env: Dict[str, str], log) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "run.py", "--production", "--workers", str(workers), "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+
+
+async def measure(base_url: str, process: subprocess.Popen, scenarios: List, requests: int, concurrency: int) -> Dict:
+    limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency * 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+        await wait_until_ready(client, process)
+        results = {}
+        for scenario in scenarios:
+            # Warm every worker up before measuring
+            await run_scenario(client, scenario, concurrency, concurrency, {}, process.pid)
+            results[scenario.name] = await run_scenario(client, scenario, requests, concurrency, {}, process.pid)
+        return results
+
+
+async def in_flight(client: httpx.AsyncClient) -> float:
+    """Requests being handled by all workers, from the multi-process metrics."""
+    for line in (await client.get("/metrics")).text.splitlines():
+        if line.startswith("http_requests_in_flight "):
+            return float(line.split()[1])
+    return 0.0
+
+
+async def drain(base_url: str, process: subprocess.Popen, concurrency: int) -> Tuple[Dict[str, int], int]:
+    async with httpx.AsyncClient(base_url=base_url, timeout=300) as client:
+        await wait_until_ready(client, process)
+
+        async def ask(i: int) -> str:
+            try:
+                response = await client.post("/api/career-advice", json={
+                    "query": f"How do I become an SRE? ({i})", "user_id": f"drain-{i}"
+                })
+                return str(response.status_code)
+            except httpx.HTTPError as e:
+                return type(e).__name__
+
+        requests = [asyncio.create_task(ask(i)) for i in range(concurrency)]
+        # Signal once every request is being handled; the /metrics request counts itself
+        while await in_flight(client) < concurrency + 1:
+            await asyncio.sleep(0.01)
+        process.send_signal(signal.SIGTERM)
+        statuses: Dict[str, int] = {}
+        for status in await asyncio.gather(*requests):
+            statuses[status] = statuses.get(status, 0) + 1
+        return statuses, await asyncio.to_thread(process.wait, 60)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--scenarios", default=DEFAULT_SCENARIOS)
+    parser.add_argument("--latency", type=float, default=0.2, help="mock OpenAI time to first token in seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=500, help="mock OpenAI generation rate")
+    parser.add_argument("--db-latency", type=float, default=0.01, help="fake PostgREST latency in seconds")
+    args = parser.parse_args()
+
+    worker_counts = [int(count) for count in args.workers.split(",")]
+    names = args.scenarios.split(",")
+    scenarios = [scenario for scenario in SCENARIOS if scenario.name in names]
+    print(f"{os.cpu_count()} CPUs, {args.requests} requests per scenario at concurrency {args.concurrency}\n")
+    print(f"{'scenario':16} {'workers':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}  errors")
+
+    postgrest = create_fake_postgrest(latency=args.db_latency)
+    mock_openai = create_mock_openai(args.latency, completion_reply(100), 1 / args.tokens_per_second)
+    with MockServer(mock_openai) as openai_server, MockServer(postgrest) as postgrest_server, \
+            tempfile.TemporaryDirectory() as storage, tempfile.TemporaryFile("w+") as log:
+
+        def serve(workers: int, run):
+            port = free_port()
+            env = server_env(openai_server.url, postgrest_server.url, storage, args.concurrency)
+            env["SERVER_STATE_DIR"] = tempfile.mkdtemp(dir=storage)
+            process = start_server(workers, port, env, log)
+            try:
+                return asyncio.run(run(f"http://127.0.0.1:{port}", process))
+            except Exception:
+                log.seek(0)
+                print(log.read()[-4000:], file=sys.stderr)
+                raise
+            finally:
+                if process.poll() is None:
+                    process.terminate()
+                    process.wait(timeout=60)
+
+        for workers in worker_counts:
+            results = serve(workers, lambda url, process: measure(url, process, scenarios, args.requests,
+                                                                  args.concurrency))
+            for name, result in results.items():
+                errors = ", ".join(f"{status} x{count}" for status, count in result["errors"].items()) or "-"
+                print(f"{name:16} {workers:7} {result['throughput_rps']:8.1f} {result['p50_ms']:8.1f} "
+                      f"{result['p95_ms']:8.1f}  {errors}")
+
+        rows_before = len(postgrest.state.tables.get("career_interactions", []))
+        statuses, exit_code = serve(max(worker_counts), lambda url, process: drain(url, process, args.concurrency))
+        rows = len(postgrest.state.tables.get("career_interactions", [])) - rows_before
+        print(f"\nSIGTERM with {args.concurrency} career advice requests in flight ({max(worker_counts)} workers): "
+              f"responses {statuses}, rows stored {rows}, exit code {exit_code}")
+
+
+if __name__ == "__main__":
+    main()
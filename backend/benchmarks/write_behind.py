@@ -0,0 +1,84 @@
+"""Compare inline Supabase inserts with the write-behind queue against a fake PostgREST server.
+
+Reports the time a request handler spends persisting rows in each mode,
+how many HTTP round trips reached the database, and checks that every row
+queued before shutdown was flushed. ``--bad-rows`` rows violate a NOT NULL
+constraint; only those may be missing from the table afterwards.
+
+Usage: python benchmarks/write_behind.py [--rows 200] [--latency 0.05] [--fail-rate 0.1] [--bad-rows 3]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from supabase import create_client
+
+from mocks import FAKE_SUPABASE_KEY, TABLE_SCHEMAS, MockServer, create_fake_postgrest
+from persistence import WriteBehindQueue
+
+
+SCHEMAS = {
+    **TABLE_SCHEMAS,
+    "career_interactions": {"user_id": True, "query": True, "response": True, "suggestions": False},
+}
+
+
+def row(i: int, bad: bool = False) -> dict:
+    return {"user_id": None if bad else f"user-{i}", "query": "q", "response": "r", "suggestions": []}
+
+
+async def inline(client, rows: int) -> float:
+    start = time.perf_counter()
+    for i in range(rows):
+        client.table("career_interactions").insert(row(i)).execute()
+    return time.perf_counter() - start
+
+
+async def write_behind(client, rows: int, bad_rows: int) -> tuple:
+    queue = WriteBehindQueue(client, backoff=0.05)
+    queue.start()
+    bad = set(range(0, rows, max(1, rows // bad_rows))[:bad_rows]) if bad_rows else set()
+    start = time.perf_counter()
+    for i in range(rows):
+        await queue.put("career_interactions", row(i, i in bad))
+    enqueue = time.perf_counter() - start
+    await queue.stop()
+    return enqueue, time.perf_counter() - start, queue.stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="fake PostgREST latency in seconds")
+    parser.add_argument("--fail-rate", type=float, default=0.1, help="probability of an injected 503")
+    parser.add_argument("--bad-rows", type=int, default=3, help="rows the database rejects")
+    args = parser.parse_args()
+
+    fake = create_fake_postgrest(latency=args.latency, fail_rate=args.fail_rate, schemas=SCHEMAS)
+    with MockServer(fake) as server:
+        client = create_client(server.url, FAKE_SUPABASE_KEY)
+
+        fake.state.fail_rate = 0
+        elapsed = asyncio.run(inline(client, args.rows))
+        inline_requests = fake.state.requests
+        print(f"inline:       {elapsed * 1000:.0f}ms in request path, {inline_requests} round trips")
+
+        fake.state.tables.clear()
+        fake.state.requests = 0
+        fake.state.fail_rate = args.fail_rate
+        enqueue, total, stats = asyncio.run(write_behind(client, args.rows, args.bad_rows))
+        stored = len(fake.state.tables.get("career_interactions", []))
+        print(f"write-behind: {enqueue * 1000:.0f}ms in request path, {fake.state.requests} round trips, "
+              f"flushed in {total * 1000:.0f}ms")
+        print(f"stats: {stats}")
+        print(f"rows stored after shutdown: {stored}/{args.rows - args.bad_rows} valid "
+              f"({stats['rejected']}/{args.bad_rows} bad rows rejected)")
+
+
+if __name__ == "__main__":
+    main()
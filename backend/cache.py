@@ -0,0 +1,221 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class LRUCache:
+    """In-memory LRU cache with a per-entry TTL and entry-count and size limits."""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, size, expires_at = entry
+        if expires_at < time.monotonic():
+            self.delete(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, size: int = 1) -> None:
+        if size > self.max_bytes:
+            return
+        self.delete(key)
+        self._entries[key] = (value, size, time.monotonic() + self.ttl)
+        self.size += size
+        while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+            _, (_, evicted, _) = self._entries.popitem(last=False)
+            self.size -= evicted
+
+    def delete(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+
+class SQLiteCache:
+    """Persistent cache tier stored in a local SQLite file."""
+
+    def __init__(self, path: str, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT, expires_at REAL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] < time.time():
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+            return json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + self.ttl),
+            )
+
+
+class ExtractionCache:
+    """Content-addressed cache for resume extraction results.
+
+    Entries are keyed by the SHA-256 of the uploaded file together with the
+    extraction prompt version and model, so changing either invalidates old
+    results. Lookups hit the in-memory LRU first and then the optional
+    SQLite tier, which is accessed off the event loop.
+    """
+
+    def __init__(self, memory: LRUCache, persistent: Optional[SQLiteCache] = None):
+        self.memory = memory
+        self.persistent = persistent
+        self.stats = {"hits": 0, "misses": 0, "memory_hits": 0, "persistent_hits": 0, "tokens_saved": 0}
+
+    @classmethod
+    def from_env(cls) -> "ExtractionCache":
+        ttl = float(os.getenv("EXTRACTION_CACHE_TTL", str(7 * 24 * 3600)))
+        memory = LRUCache(
+            max_entries=int(os.getenv("EXTRACTION_CACHE_MAX_ENTRIES", "256")),
+            max_bytes=int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+            ttl=ttl,
+        )
+        path = os.getenv("EXTRACTION_CACHE_PATH")
+        return cls(memory, SQLiteCache(path, ttl) if path else None)
+
+    @staticmethod
+    def key(content: bytes, prompt_version: str, model: str) -> str:
+        digest = hashlib.sha256(content).hexdigest()
+        return f"{digest}:{prompt_version}:{model}"
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    async def get(self, key: str) -> Optional[Dict]:
+        entry = self.memory.get(key)
+        if entry is not None:
+            self.stats["memory_hits"] += 1
+        elif self.persistent is not None:
+            try:
+                entry = await asyncio.to_thread(self.persistent.get, key)
+            except Exception as e:
+                print(f"Warning: Extraction cache lookup failed: {str(e)}")
+            if entry is not None:
+                self.stats["persistent_hits"] += 1
+                self.memory.set(key, entry, len(json.dumps(entry)))
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        self.stats["tokens_saved"] += entry.get("tokens", 0)
+        return entry["data"]
+
+    async def set(self, key: str, data: Dict, tokens: int = 0) -> None:
+        entry = {"data": data, "tokens": tokens}
+        self.memory.set(key, entry, len(json.dumps(entry)))
+        if self.persistent is not None:
+            try:
+                await asyncio.to_thread(self.persistent.set, key, entry)
+            except Exception as e:
+                print(f"Warning: Failed to store extraction cache entry: {str(e)}")
+
+
+class GenerationMemo:
+    """Memoizes generated documents per (resume data, job description) pair.
+
+    Concurrent requests for the same key share one in-flight generation
+    instead of each calling the LLM. ``lookup`` can fetch a previously stored
+    result (e.g. from Supabase) before falling back to generating a new one.
+    """
+
+    def __init__(self, memory: LRUCache):
+        self.memory = memory
+        self.stats = {"hits": 0, "misses": 0, "shared": 0, "lookup_hits": 0}
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def from_env(cls) -> "GenerationMemo":
+        return cls(LRUCache(
+            max_entries=int(os.getenv("GENERATION_MEMO_MAX_ENTRIES", "1024")),
+            max_bytes=int(os.getenv("GENERATION_MEMO_MAX_BYTES", str(32 * 1024 * 1024))),
+            ttl=float(os.getenv("GENERATION_MEMO_TTL", str(24 * 3600))),
+        ))
+
+    @staticmethod
+    def normalize_job_description(text: str) -> str:
+        return " ".join(text.split()).casefold()
+
+    @classmethod
+    def key(cls, kind: str, resume_data: Dict, job_description: str) -> str:
+        canonical = json.dumps(resume_data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        digest = hashlib.sha256()
+        for part in (kind, canonical, cls.normalize_job_description(job_description)):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    async def get_or_create(self, key: str, factory, lookup=None, force_refresh: bool = False) -> Dict:
+        """Return the memoized value for ``key``, calling ``factory`` at most once concurrently."""
+        if not force_refresh:
+            value = self.memory.get(key)
+            if value is not None:
+                self.stats["hits"] += 1
+                return value
+            if key in self._inflight:
+                self.stats["hits"] += 1
+                self.stats["shared"] += 1
+                return await asyncio.shield(self._inflight[key])
+        self.stats["misses"] += 1
+
+        async def produce():
+            if lookup is not None and not force_refresh:
+                try:
+                    stored = await lookup()
+                except Exception as e:
+                    stored = None
+                    print(f"Warning: Stored generation lookup failed: {str(e)}")
+                if stored is not None:
+                    self.stats["lookup_hits"] += 1
+                    return stored
+            return await factory()
+
+        task = asyncio.create_task(produce())
+        self._inflight[key] = task
+        try:
+            value = await asyncio.shield(task)
+        finally:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+        self.memory.set(key, value, len(json.dumps(value)))
+        return value
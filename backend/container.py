@@ -0,0 +1,71 @@
+import os
+from functools import cached_property
+from typing import TYPE_CHECKING, Any
+
+from http_clients import HTTPClients
+from llm import LLMClient
+from persistence import WriteBehindQueue
+from storage import object_store_from_env
+
+if TYPE_CHECKING:
+    from search import ResumeIndex
+
+
+class Container:
+    """Clients and stores shared by the whole app, each created on first use.
+
+    Importing the app builds none of them, so it needs no credentials, no
+    network and no SDK imports; missing configuration is reported by the
+    first request that needs it. The lifespan handler closes whatever was
+    created with :meth:`aclose`.
+    """
+
+    def created(self, name: str) -> bool:
+        """Whether ``name`` has been created, without creating it."""
+        return name in self.__dict__
+
+    @cached_property
+    def http_clients(self) -> HTTPClients:
+        # Connection pools for outbound HTTP, kept open between requests
+        return HTTPClients.from_env()
+
+    @cached_property
+    def llm(self) -> LLMClient:
+        # OpenAI calls go through the shared pool
+        return LLMClient(http_client=lambda: self.http_clients.get("openai"))
+
+    @cached_property
+    def supabase(self) -> Any:
+        url = os.getenv("VITE_SUPABASE_URL")
+        key = os.getenv("VITE_SUPABASE_ANON_KEY")
+        if not url or not key:
+            raise ValueError("Missing Supabase credentials. Please check your .env file.")
+        from supabase import create_client
+
+        return create_client(url, key)
+
+    @cached_property
+    def resume_store(self) -> Any:
+        # Raw resume files are kept in object storage; rows only hold a reference
+        return object_store_from_env(lambda: self.supabase)
+
+    @cached_property
+    def persistence(self) -> WriteBehindQueue:
+        # Batched, off-loop writes to Supabase
+        return WriteBehindQueue(self.supabase)
+
+    @cached_property
+    def search_index(self) -> "ResumeIndex":
+        # Imported here so numpy is only loaded once the index is used
+        from search import ResumeIndex
+
+        return ResumeIndex.from_env()
+
+    async def aclose(self, timeout: float = 10.0) -> None:
+        # Flush pending database writes before the pools are closed
+        if self.created("persistence"):
+            await self.persistence.stop(timeout)
+        if self.created("http_clients"):
+            await self.http_clients.aclose()
+        if self.created("search_index"):
+            self.search_index.close()
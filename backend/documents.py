@@ -0,0 +1,249 @@
+import asyncio
+import faulthandler
+import io
+import os
+import signal
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# Number of leading bytes needed to identify a document type
+SNIFF_BYTES = 8
+# Refuse DOCX files whose document.xml inflates beyond this (zip bombs)
+MAX_DOCX_XML_SIZE = 50 * 1024 * 1024
+
+WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+# A worker whose parse ignores its deadline (stuck in C code) exits this much later
+PARSE_KILL_GRACE_SECONDS = 5.0
+
+
+class DocumentError(ValueError):
+    """The uploaded document cannot be read: unsupported, corrupt, empty or too large."""
+
+
+class ParseTimeout(BaseException):
+    """Raised inside a pool worker when a parse outlives its deadline.
+
+    A BaseException, so ``except Exception`` blocks in the PDF library
+    cannot swallow it.
+    """
+
+
+def extract_pdf_text(content: bytes, max_pages: int) -> str:
+    """Extract the text of a PDF. Runs in a worker process, so it must stay picklable."""
+    # Imported here so only processes that parse PDFs pay for it
+    import PyPDF2
+
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
+    if len(pdf_reader.pages) == 0:
+        raise DocumentError("PDF file is empty")
+    if len(pdf_reader.pages) > max_pages:
+        raise DocumentError(f"PDF has {len(pdf_reader.pages)} pages; at most {max_pages} are supported")
+
+    pages = []
+    for page in pdf_reader.pages:
+        page_text = page.extract_text()
+        if not page_text.strip():
+            raise DocumentError("PDF appears to be empty or contains no text")
+        pages.append(page_text)
+    return "".join(pages)
+
+
+def extract_docx_text(content: bytes, max_pages: int) -> str:
+    """Extract the text of a DOCX by streaming word/document.xml instead of building a full DOM."""
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(content))
+        info = archive.getinfo("word/document.xml")
+    except (zipfile.BadZipFile, KeyError):
+        raise DocumentError("File is not a valid DOCX document")
+    if info.file_size > MAX_DOCX_XML_SIZE:
+        raise DocumentError("DOCX document is too large")
+
+    parts = []
+    with archive.open(info) as xml:
+        for event, element in ET.iterparse(xml, events=("end",)):
+            tag = element.tag
+            if tag == WORD_NAMESPACE + "t" and element.text:
+                parts.append(element.text)
+            elif tag == WORD_NAMESPACE + "tab":
+                parts.append("\t")
+            elif tag in (WORD_NAMESPACE + "br", WORD_NAMESPACE + "p"):
+                parts.append("\n")
+            if tag == WORD_NAMESPACE + "p":
+                # Paragraph text has been collected; free the subtree
+                element.clear()
+    text = "".join(parts)
+    if not text.strip():
+        raise DocumentError("DOCX appears to be empty or contains no text")
+    return text
+
+
+def check_docx_archive(content: bytes) -> None:
+    """Check from the zip central directory that ``content`` is a Word document, not any zip."""
+    try:
+        names = set(zipfile.ZipFile(io.BytesIO(content)).namelist())
+    except zipfile.BadZipFile:
+        raise DocumentError("File is not a valid DOCX document")
+    if "[Content_Types].xml" not in names or "word/document.xml" not in names:
+        raise DocumentError("File is not a valid DOCX document")
+
+
+class DocumentExtractor(NamedTuple):
+    kind: str
+    magic: bytes
+    extract: Callable[[bytes, int], str]
+    # Cheap structural check of the whole file, run before it is sent to the pool
+    check: Optional[Callable[[bytes], None]] = None
+
+
+_EXTRACTORS: List[DocumentExtractor] = []
+
+
+def register_extractor(kind: str, magic: bytes, extract: Callable[[bytes, int], str],
+                       check: Optional[Callable[[bytes], None]] = None) -> None:
+    """Register a text extractor for documents starting with ``magic``.
+
+    Register at import time so the extractor also exists in pool worker
+    processes. ``extract`` must be a module-level (picklable) function;
+    ``check`` raises DocumentError for files that only look like this kind.
+    """
+    _EXTRACTORS.append(DocumentExtractor(kind, magic, extract, check))
+
+
+def sniff_document(header: bytes) -> Optional[str]:
+    """Identify a document from its first SNIFF_BYTES bytes, or None if unsupported."""
+    for extractor in _EXTRACTORS:
+        if header.startswith(extractor.magic):
+            return extractor.kind
+    return None
+
+
+def identify_document(content: bytes) -> str:
+    """The kind of a complete document, after its extractor's structural check."""
+    kind = sniff_document(content[:SNIFF_BYTES])
+    extractor = next((e for e in _EXTRACTORS if e.kind == kind), None)
+    if extractor is None:
+        raise DocumentError("Unsupported document type; only PDF and DOCX files are supported")
+    if extractor.check is not None:
+        extractor.check(content)
+    return kind
+
+
+def extract_document(content: bytes, max_pages: int) -> Tuple[str, str, float]:
+    """Dispatch to the registered extractor; returns (kind, text, parse seconds)."""
+    kind = sniff_document(content[:SNIFF_BYTES])
+    extractor = next((e for e in _EXTRACTORS if e.kind == kind), None)
+    if extractor is None:
+        raise DocumentError("Unsupported document type; only PDF and DOCX files are supported")
+    start = time.perf_counter()
+    text = extractor.extract(content, max_pages)
+    return kind, text, time.perf_counter() - start
+
+
+def _parse_timed_out(signum, frame) -> None:
+    raise ParseTimeout()
+
+
+def extract_document_within(content: bytes, max_pages: int, timeout: float) -> Tuple[str, str, float]:
+    """extract_document in a pool worker, interrupted after ``timeout`` seconds.
+
+    The deadline is enforced by the worker itself, so it starts when the
+    parse starts (not while the task waits in the queue) and a timeout
+    leaves the worker and every other task alone. Without SIGALRM
+    (Windows) the parse runs without a deadline.
+    """
+    if not hasattr(signal, "SIGALRM"):
+        return extract_document(content, max_pages)
+    previous = signal.signal(signal.SIGALRM, _parse_timed_out)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    # Last resort for a parse that never returns to the interpreter to see the alarm
+    faulthandler.dump_traceback_later(timeout + PARSE_KILL_GRACE_SECONDS, exit=True)
+    try:
+        return extract_document(content, max_pages)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        faulthandler.cancel_dump_traceback_later()
+        signal.signal(signal.SIGALRM, previous)
+
+
+register_extractor("pdf", b"%PDF-", extract_pdf_text)
+# DOCX files are zip archives; xlsx, jar and other zips are told apart by their entries
+register_extractor("docx", b"PK\x03\x04", extract_docx_text, check_docx_archive)
+
+
+class TextExtractor:
+    """Runs document parsing in a process pool so it never blocks the event loop.
+
+    Each document gets ``timeout`` seconds of parsing, counted by the worker
+    from the moment it picks the document up; a parse that overruns is
+    interrupted in its worker, which then takes the next document. Only if
+    a worker dies (a crash, or a parse stuck past the deadline in C code)
+    is the pool replaced. With ``workers=0`` parsing runs in a thread
+    instead, which is useful where subprocesses are unavailable; a timed
+    out thread cannot be stopped and finishes in the background. Parse
+    time and character counts are accumulated per document kind in
+    ``stats``.
+    """
+
+    def __init__(
+        self,
+        workers: int = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1))),
+        timeout: float = float(os.getenv("PDF_TIMEOUT_SECONDS", "20")),
+        max_pages: int = int(os.getenv("PDF_MAX_PAGES", "20")),
+    ):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def _pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers > 0 and self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def extract(self, content: bytes) -> str:
+        kind = identify_document(content)
+        loop = asyncio.get_running_loop()
+        executor = self._pool()
+        try:
+            if executor is None:
+                future = loop.run_in_executor(None, extract_document, content, self.max_pages)
+                kind, text, seconds = await asyncio.wait_for(future, self.timeout)
+            else:
+                kind, text, seconds = await loop.run_in_executor(
+                    executor, extract_document_within, content, self.max_pages, self.timeout
+                )
+        except (ParseTimeout, asyncio.TimeoutError):
+            self._record(kind, failed=True)
+            raise DocumentError(f"Timed out after {self.timeout:.0f}s while reading the document")
+        except BrokenProcessPool:
+            self._replace(executor)
+            self._record(kind, failed=True)
+            raise RuntimeError("The document parser stopped unexpectedly while reading the document")
+        except Exception as e:
+            # Anything the parser raises is about the document itself
+            self._record(kind, failed=True)
+            raise DocumentError(str(e)) from e
+        self._record(kind, seconds=seconds, characters=len(text))
+        return text
+
+    def _record(self, kind: str, seconds: float = 0.0, characters: int = 0, failed: bool = False) -> None:
+        stats = self.stats.setdefault(kind, {"documents": 0, "failures": 0, "parse_seconds": 0.0, "characters": 0})
+        stats["failures" if failed else "documents"] += 1
+        stats["parse_seconds"] += seconds
+        stats["characters"] += characters
+
+    def _replace(self, broken: Optional[ProcessPoolExecutor]) -> None:
+        # Every task of a broken pool fails; the first one to notice starts a new pool
+        if broken is not None and self._executor is broken:
+            self._executor = None
+            broken.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,479 @@
+import copy
+import json
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+
+from metrics import EXTRACTION_REPAIRS, EXTRACTION_RESPONSES, EXTRACTION_TOKENS_SAVED
+
+# Shape of the structured data extracted from a resume
+EXTRACTION_SCHEMA: Dict[str, Any] = {
+    "personalInfo": {
+        "name": "",
+        "email": "",
+        "phone": "",
+        "location": "",
+        "linkedin": "",
+        "portfolio": "",
+        "github": "",
+        "other_profiles": []
+    },
+    "summary": {
+        "professional_summary": "",
+        "key_achievements": [],
+        "core_competencies": [],
+        "career_objectives": [],
+        "value_proposition": ""
+    },
+    "education": [
+        {
+            "degree": "",
+            "institution": "",
+            "year": "",
+            "gpa": "",
+            "relevant_coursework": [],
+            "achievements": [],
+            "extracurricular": [],
+            "honors": [],
+            "thesis": "",
+            "specialization": ""
+        }
+    ],
+    "workExperience": [
+        {
+            "company": "",
+            "position": "",
+            "duration": "",
+            "location": "",
+            "achievements": [],
+            "responsibilities": [],
+            "technologies_used": [],
+            "quantifiable_results": [],
+            "key_projects": [],
+            "team_size": "",
+            "reporting_to": "",
+            "industry": "",
+            "company_size": "",
+            "impact_metrics": []
+        }
+    ],
+    "skills": {
+        "technical": [],
+        "soft": [],
+        "certifications": [],
+        "languages": [],
+        "tools": [],
+        "methodologies": [],
+        "domain_knowledge": [],
+        "emerging_technologies": []
+    },
+    "projects": [
+        {
+            "name": "",
+            "description": "",
+            "technologies": [],
+            "achievements": [],
+            "duration": "",
+            "url": "",
+            "role": "",
+            "team_size": "",
+            "challenges": [],
+            "solutions": [],
+            "impact": "",
+            "key_learnings": []
+        }
+    ],
+    "career_analysis": {
+        "career_progression": "",
+        "industry_expertise": [],
+        "leadership_qualities": [],
+        "innovation_contributions": [],
+        "problem_solving_abilities": [],
+        "adaptability_indicators": []
+    },
+    "ats_optimization": {
+        "keywords": [],
+        "skills_alignment": [],
+        "formatting_score": 0,
+        "content_score": 0,
+        "suggestions": [],
+        "keyword_density": {},
+        "missing_keywords": [],
+        "formatting_issues": [],
+        "content_gaps": []
+    },
+    "improvement_suggestions": {
+        "content_enhancements": [],
+        "formatting_improvements": [],
+        "skill_gaps": [],
+        "achievement_quantification": [],
+        "keyword_optimization": [],
+        "career_development": []
+    }
+}
+
+# Fields the hybrid mode fills from the local pre-parser instead of the LLM. The
+# pre-parser has no reliable way to find a location, so the LLM still extracts it.
+HYBRID_LOCAL_FIELDS = [
+    "personalInfo.name", "personalInfo.email", "personalInfo.phone", "personalInfo.linkedin",
+    "personalInfo.portfolio", "personalInfo.github", "personalInfo.other_profiles",
+    "ats_optimization.keyword_density",
+]
+
+# Sections extracted together when extraction runs in parallel; each group is its own
+# completion, so the longest group rather than the whole schema bounds the latency
+SECTION_GROUPS: Dict[str, List[str]] = {
+    "profile": ["personalInfo", "summary", "skills"],
+    "experience": ["workExperience"],
+    "education": ["education", "projects"],
+    "analysis": ["career_analysis", "improvement_suggestions"],
+    "ats": ["ats_optimization"],
+}
+# Groups that only restate facts from the resume and do well on a cheaper model
+DEFAULT_GROUP_MODELS = "profile=gpt-4o-mini,experience=gpt-4o-mini,education=gpt-4o-mini"
+
+
+def parse_group_models(value: Optional[str]) -> Dict[str, str]:
+    """Parse per-group models such as "profile=gpt-4o-mini,experience=gpt-4o-mini"."""
+    models = {}
+    for item in (value or "").split(","):
+        group, _, model = item.partition("=")
+        if not group.strip() or not model.strip():
+            continue
+        if group.strip() not in SECTION_GROUPS:
+            print(f"Warning: Ignoring model for unknown section group: {item}")
+            continue
+        models[group.strip()] = model.strip()
+    return models
+
+
+def schema_subset(sections: Optional[Iterable[str]] = None, omit: Iterable[str] = ()) -> Dict[str, Any]:
+    """Copy of the schema limited to ``sections``, without the dotted ``omit`` paths."""
+    schema = {key: copy.deepcopy(EXTRACTION_SCHEMA[key]) for key in (sections or EXTRACTION_SCHEMA)}
+    for path in omit:
+        section, _, field = path.partition(".")
+        if field:
+            schema.get(section, {}).pop(field, None)
+        else:
+            schema.pop(section, None)
+    return schema
+
+
+def extraction_prompt(text: str, schema: Dict[str, Any] = EXTRACTION_SCHEMA) -> str:
+    return f"""As an expert ATS resume analyzer and career coach, perform a comprehensive analysis of the following resume. Extract and structure ALL possible information, including implicit details and potential improvements.
+
+Return the data in this detailed JSON format:
+{json.dumps(schema, indent=2)}
+
+Resume text:
+{text}
+
+Analyze the resume thoroughly and extract ALL possible information. Include implicit details and potential improvements. Return only the JSON object, no additional text."""
+
+
+class _Section(BaseModel):
+    # Models often answer years, GPAs and sizes with numbers; unknown keys are kept
+    model_config = ConfigDict(extra="allow", coerce_numbers_to_str=True)
+
+
+class PersonalInfo(_Section):
+    name: str = ""
+    email: str = ""
+    phone: str = ""
+    location: str = ""
+    linkedin: str = ""
+    portfolio: str = ""
+    github: str = ""
+    other_profiles: List[str] = Field(default_factory=list)
+
+
+class Summary(_Section):
+    professional_summary: str = ""
+    key_achievements: List[str] = Field(default_factory=list)
+    core_competencies: List[str] = Field(default_factory=list)
+    career_objectives: List[str] = Field(default_factory=list)
+    value_proposition: str = ""
+
+
+class Education(_Section):
+    degree: str = ""
+    institution: str = ""
+    year: str = ""
+    gpa: str = ""
+    relevant_coursework: List[str] = Field(default_factory=list)
+    achievements: List[str] = Field(default_factory=list)
+    extracurricular: List[str] = Field(default_factory=list)
+    honors: List[str] = Field(default_factory=list)
+    thesis: str = ""
+    specialization: str = ""
+
+
+class WorkExperience(_Section):
+    company: str = ""
+    position: str = ""
+    duration: str = ""
+    location: str = ""
+    achievements: List[str] = Field(default_factory=list)
+    responsibilities: List[str] = Field(default_factory=list)
+    technologies_used: List[str] = Field(default_factory=list)
+    quantifiable_results: List[str] = Field(default_factory=list)
+    key_projects: List[str] = Field(default_factory=list)
+    team_size: str = ""
+    reporting_to: str = ""
+    industry: str = ""
+    company_size: str = ""
+    impact_metrics: List[str] = Field(default_factory=list)
+
+
+class Skills(_Section):
+    technical: List[str] = Field(default_factory=list)
+    soft: List[str] = Field(default_factory=list)
+    certifications: List[str] = Field(default_factory=list)
+    languages: List[str] = Field(default_factory=list)
+    tools: List[str] = Field(default_factory=list)
+    methodologies: List[str] = Field(default_factory=list)
+    domain_knowledge: List[str] = Field(default_factory=list)
+    emerging_technologies: List[str] = Field(default_factory=list)
+
+
+class Project(_Section):
+    name: str = ""
+    description: str = ""
+    technologies: List[str] = Field(default_factory=list)
+    achievements: List[str] = Field(default_factory=list)
+    duration: str = ""
+    url: str = ""
+    role: str = ""
+    team_size: str = ""
+    challenges: List[str] = Field(default_factory=list)
+    solutions: List[str] = Field(default_factory=list)
+    impact: str = ""
+    key_learnings: List[str] = Field(default_factory=list)
+
+
+class CareerAnalysis(_Section):
+    career_progression: str = ""
+    industry_expertise: List[str] = Field(default_factory=list)
+    leadership_qualities: List[str] = Field(default_factory=list)
+    innovation_contributions: List[str] = Field(default_factory=list)
+    problem_solving_abilities: List[str] = Field(default_factory=list)
+    adaptability_indicators: List[str] = Field(default_factory=list)
+
+
+class ATSOptimization(_Section):
+    keywords: List[str] = Field(default_factory=list)
+    skills_alignment: List[str] = Field(default_factory=list)
+    formatting_score: float = 0
+    content_score: float = 0
+    suggestions: List[str] = Field(default_factory=list)
+    keyword_density: Dict[str, Any] = Field(default_factory=dict)
+    missing_keywords: List[str] = Field(default_factory=list)
+    formatting_issues: List[str] = Field(default_factory=list)
+    content_gaps: List[str] = Field(default_factory=list)
+
+
+class ImprovementSuggestions(_Section):
+    content_enhancements: List[str] = Field(default_factory=list)
+    formatting_improvements: List[str] = Field(default_factory=list)
+    skill_gaps: List[str] = Field(default_factory=list)
+    achievement_quantification: List[str] = Field(default_factory=list)
+    keyword_optimization: List[str] = Field(default_factory=list)
+    career_development: List[str] = Field(default_factory=list)
+
+
+class ResumeExtraction(_Section):
+    """Validated form of :data:`EXTRACTION_SCHEMA`; each section is also validated on its own."""
+    personalInfo: PersonalInfo = Field(default_factory=PersonalInfo)
+    summary: Summary = Field(default_factory=Summary)
+    education: List[Education] = Field(default_factory=list)
+    workExperience: List[WorkExperience] = Field(default_factory=list)
+    skills: Skills = Field(default_factory=Skills)
+    projects: List[Project] = Field(default_factory=list)
+    career_analysis: CareerAnalysis = Field(default_factory=CareerAnalysis)
+    ats_optimization: ATSOptimization = Field(default_factory=ATSOptimization)
+    improvement_suggestions: ImprovementSuggestions = Field(default_factory=ImprovementSuggestions)
+
+
+SECTION_ADAPTERS: Dict[str, TypeAdapter] = {
+    name: TypeAdapter(field.annotation) for name, field in ResumeExtraction.model_fields.items()
+}
+
+
+def validate_section(name: str, value: Any) -> Any:
+    """``value`` validated against the section's model, as plain JSON data; raises ValidationError."""
+    adapter = SECTION_ADAPTERS[name]
+    return adapter.dump_python(adapter.validate_python(value), mode="json")
+
+
+def empty_section(name: str) -> Any:
+    return validate_section(name, [] if name in ("education", "workExperience", "projects") else {})
+
+
+class SectionStreamParser:
+    """Incrementally parse the top-level members of a JSON object as it streams in.
+
+    :meth:`feed` returns each ``(key, value)`` pair as soon as the member
+    is complete. Members whose text is not valid JSON are kept in
+    ``malformed`` as ``(key, text)`` for :func:`repair_json`; after the
+    stream ends, :meth:`truncated` returns the member that was cut off.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.malformed: List[Tuple[Optional[str], str]] = []
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start: Optional[int] = None
+        self._closed = False
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        self.buffer += text
+        members = []
+        buffer = self.buffer
+        for i in range(self._pos, len(buffer)):
+            char = buffer[i]
+            if self._closed:
+                break
+            if self._depth == 0:
+                # Skip anything before the object, such as a code fence
+                if char == "{":
+                    self._depth = 1
+                    self._member_start = i + 1
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    members.extend(self._member(buffer[self._member_start:i]))
+                    self._closed = True
+            elif char == "," and self._depth == 1:
+                members.extend(self._member(buffer[self._member_start:i]))
+                self._member_start = i + 1
+        self._pos = len(buffer)
+        return members
+
+    def _member(self, text: str) -> List[Tuple[str, Any]]:
+        if not text.strip():
+            return []
+        try:
+            return list(json.loads("{" + text + "}").items())
+        except json.JSONDecodeError:
+            self.malformed.append(_split_member(text))
+            return []
+
+    def truncated(self) -> Optional[Tuple[Optional[str], str]]:
+        """The member that was still open when the stream ended, as ``(key, partial value text)``."""
+        if self._closed or self._member_start is None or not self.buffer[self._member_start:].strip():
+            return None
+        return _split_member(self.buffer[self._member_start:])
+
+
+_MEMBER_KEY = re.compile(r'\s*"((?:[^"\\]|\\.)*)"\s*:\s*', re.S)
+
+
+def _split_member(text: str) -> Tuple[Optional[str], str]:
+    match = _MEMBER_KEY.match(text)
+    if match is None:
+        return None, text
+    return json.loads(f'"{match.group(1)}"'), text[match.end():]
+
+
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+_PYTHON_LITERALS = re.compile(r"\b(True|False|None)\b")
+
+
+def _lenient_loads(text: str) -> Any:
+    """``json.loads`` that tolerates trailing commas and Python literals outside strings."""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    parts = re.split(r'("(?:[^"\\]|\\.)*")', text)
+    for i in range(0, len(parts), 2):
+        parts[i] = _PYTHON_LITERALS.sub(lambda m: {"True": "true", "False": "false", "None": "null"}[m.group(1)], parts[i])
+    return json.loads(_TRAILING_COMMA.sub(r"\1", "".join(parts)))
+
+
+def repair_json(text: str) -> Any:
+    """Parse a JSON value that may be malformed or cut off; raises ValueError if it cannot be saved.
+
+    Common syntax slips are fixed first. A truncated value is closed at the
+    last complete element, so a cut-off list keeps its finished items.
+    """
+    try:
+        return _lenient_loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    # Positions where the value can be cut and closed, with the brackets open at that point
+    stack: List[str] = []
+    cuts: List[Tuple[int, str]] = []
+    in_string = escape = False
+    for i, char in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+            cuts.append((i + 1, "".join(reversed(stack))))
+        elif char in "}]":
+            if stack:
+                stack.pop()
+            cuts.append((i + 1, "".join(reversed(stack))))
+        elif char == ",":
+            cuts.append((i, "".join(reversed(stack))))
+    for end, closers in reversed(cuts):
+        try:
+            return _lenient_loads(text[:end] + closers)
+        except json.JSONDecodeError:
+            continue
+    raise ValueError("Could not repair JSON")
+
+
+class RepairStats:
+    """Running totals of extraction responses that needed repair, and the tokens that saved."""
+
+    def __init__(self):
+        self.totals = {
+            "responses": 0, "repaired": 0, "local_repairs": 0, "reasks": 0,
+            "reasked_sections": 0, "failed_sections": 0, "tokens_saved": 0,
+        }
+
+    def record(self, local: int, reasked: int, failed: int, tokens_saved: int) -> None:
+        totals = self.totals
+        totals["responses"] += 1
+        repaired = bool(local or reasked or failed)
+        totals["repaired"] += repaired
+        totals["local_repairs"] += local
+        totals["reasks"] += bool(reasked)
+        totals["reasked_sections"] += reasked
+        totals["failed_sections"] += failed
+        totals["tokens_saved"] += tokens_saved
+        EXTRACTION_RESPONSES.labels("repaired" if repaired else "valid").inc()
+        EXTRACTION_REPAIRS.labels("local").inc(local)
+        EXTRACTION_REPAIRS.labels("reask").inc(reasked)
+        EXTRACTION_REPAIRS.labels("failed").inc(failed)
+        EXTRACTION_TOKENS_SAVED.inc(tokens_saved)
+
+    def summary(self) -> Dict[str, Any]:
+        responses = self.totals["responses"]
+        return {**self.totals, "repair_ratio": self.totals["repaired"] / responses if responses else 0.0}
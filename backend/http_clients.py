@@ -0,0 +1,55 @@
+import os
+from typing import TYPE_CHECKING, Dict
+
+if TYPE_CHECKING:
+    import httpx
+
+
+class HTTPClients:
+    """Named ``httpx.AsyncClient`` connection pools shared for the lifetime of the app.
+
+    Each upstream gets its own pool so a slow service cannot hold every
+    connection. Pools are opened by :meth:`start` in the lifespan handler (or
+    on first use, e.g. in scripts) and keep connections alive between
+    requests, so repeated calls skip the TCP and TLS handshakes.
+    """
+
+    def __init__(self, max_connections: int = 100, max_keepalive: int = 20,
+                 keepalive_expiry: float = 30.0, timeout: float = 30.0):
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self._clients: Dict[str, "httpx.AsyncClient"] = {}
+
+    @classmethod
+    def from_env(cls) -> "HTTPClients":
+        return cls(
+            max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+            max_keepalive=int(os.getenv("HTTP_MAX_KEEPALIVE", "20")),
+            keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+            timeout=float(os.getenv("HTTP_TIMEOUT", "30")),
+        )
+
+    def get(self, name: str) -> "httpx.AsyncClient":
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            # Imported here so importing the app does not pay for httpx until a pool is needed
+            import httpx
+
+            limits = httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive,
+                keepalive_expiry=self.keepalive_expiry,
+            )
+            client = self._clients[name] = httpx.AsyncClient(limits=limits, timeout=self.timeout)
+        return client
+
+    def start(self, *names: str) -> None:
+        for name in names:
+            self.get(name)
+
+    async def aclose(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
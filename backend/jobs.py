@@ -0,0 +1,259 @@
+import asyncio
+import json
+import os
+import sqlite3
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobLimitExceeded(Exception):
+    """Raised when a user already has the maximum number of active jobs."""
+
+
+class JobNotCancellable(Exception):
+    """Raised when a job is running in another worker process, which this one cannot interrupt."""
+
+
+@dataclass
+class Job:
+    kind: str
+    user_id: Optional[str] = None
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    status: str = QUEUED
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class InMemoryJobStore:
+    """Process-local job store.
+
+    Other backends (e.g. Redis) only need to implement the same async
+    ``get``/``save``/``delete``/``expired`` methods.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    async def save(self, job: Job) -> None:
+        self._jobs[job.id] = job
+
+    async def delete(self, job_id: str) -> None:
+        self._jobs.pop(job_id, None)
+
+    async def expired(self, before: float) -> List[str]:
+        return [job.id for job in self._jobs.values() if job.finished_at and job.finished_at < before]
+
+
+class SQLiteJobStore:
+    """Job store in a SQLite file, shared by the worker processes of one host.
+
+    A job runs in the worker that accepted it, but its status can be polled
+    (and a queued job cancelled) through any of them. Queries run off the
+    event loop.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, data TEXT, finished_at REAL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5)
+
+    def _get(self, job_id: str) -> Optional[Job]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job(**json.loads(row[0])) if row else None
+
+    def _save(self, job: Job) -> None:
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO jobs (id, data, finished_at) VALUES (?, ?, ?)",
+                         (job.id, json.dumps(job.to_dict()), job.finished_at))
+
+    def _delete(self, job_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def _expired(self, before: float) -> List[str]:
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("SELECT id FROM jobs WHERE finished_at < ?", (before,))]
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await asyncio.to_thread(self._get, job_id)
+
+    async def save(self, job: Job) -> None:
+        await asyncio.to_thread(self._save, job)
+
+    async def delete(self, job_id: str) -> None:
+        await asyncio.to_thread(self._delete, job_id)
+
+    async def expired(self, before: float) -> List[str]:
+        return await asyncio.to_thread(self._expired, before)
+
+
+JobStore = Union[InMemoryJobStore, SQLiteJobStore]
+
+
+class JobQueue:
+    """Runs long LLM generations in a background worker pool.
+
+    Callers get a job ID immediately and poll the store for the result.
+    Each user may have at most ``per_user_limit`` queued or running jobs,
+    and finished jobs are dropped from the store after ``retention`` seconds.
+
+    The worker pool and the per-user limit are per process. With several
+    server workers, set ``JOB_STORE_PATH`` so every worker can answer
+    status polls for jobs accepted by the others. Any worker can cancel a
+    queued job, but only the one running a job can interrupt it.
+    """
+
+    def __init__(
+        self,
+        store: Optional[JobStore] = None,
+        workers: int = int(os.getenv("JOB_WORKERS", "4")),
+        per_user_limit: int = int(os.getenv("JOB_PER_USER_LIMIT", "2")),
+        retention: float = float(os.getenv("JOB_RETENTION_SECONDS", "3600")),
+    ):
+        if store is None:
+            path = os.getenv("JOB_STORE_PATH")
+            store = SQLiteJobStore(path) if path else InMemoryJobStore()
+        self.store = store
+        self.workers = workers
+        self.per_user_limit = per_user_limit
+        self.retention = retention
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._work: Dict[str, Callable[[], Awaitable[Any]]] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self._active: Dict[Optional[str], int] = {}
+        self._stopping = False
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._stopping = False
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = 0.0) -> None:
+        """Stop the workers, first giving queued and running jobs up to ``timeout`` seconds to finish."""
+        if self._queue is not None and timeout > 0:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                print(f"Warning: Cancelling {len(self._running)} running and {self._queue.qsize()} queued jobs on shutdown")
+        self._stopping = True
+        for task in list(self._running.values()) + self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    async def submit(self, kind: str, work: Callable[[], Awaitable[Any]], user_id: Optional[str] = None) -> Job:
+        """Queue ``work`` and return its job; raises JobLimitExceeded if the user is at the cap."""
+        if self._queue is None:
+            self.start()
+        if self._active.get(user_id, 0) >= self.per_user_limit:
+            raise JobLimitExceeded(f"At most {self.per_user_limit} jobs may be active at once")
+        job = Job(kind=kind, user_id=user_id)
+        self._active[user_id] = self._active.get(user_id, 0) + 1
+        self._work[job.id] = work
+        await self.store.save(job)
+        await self._queue.put(job.id)
+        await self._expire()
+        return job
+
+    def counts(self) -> Dict[str, int]:
+        return {"queued": self._queue.qsize() if self._queue else 0, "running": len(self._running)}
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await self.store.get(job_id)
+
+    async def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued job, or one running in this process; raises JobNotCancellable otherwise."""
+        job = await self.store.get(job_id)
+        if job is None or job.status in FINISHED:
+            return job
+        if job_id in self._running:
+            self._running[job_id].cancel()
+        elif job_id in self._work:
+            # Still queued; the worker skips it when dequeued
+            self._work.pop(job_id)
+            await self._finish(job, CANCELLED)
+        elif job.status == QUEUED:
+            # Queued in another worker process, which skips it when dequeued
+            job.status = CANCELLED
+            job.finished_at = time.time()
+            await self.store.save(job)
+        else:
+            raise JobNotCancellable("Job is running in another worker and cannot be cancelled")
+        return job
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        work = self._work.pop(job_id, None)
+        job = await self.store.get(job_id)
+        if work is None or job is None:
+            return
+        if job.status == CANCELLED:
+            # Cancelled through another worker process
+            self._release(job.user_id)
+            return
+        job.status = RUNNING
+        job.started_at = time.time()
+        await self.store.save(job)
+        task = asyncio.create_task(work())
+        self._running[job_id] = task
+        try:
+            job.result = await task
+            await self._finish(job, SUCCEEDED)
+        except asyncio.CancelledError:
+            await self._finish(job, CANCELLED)
+            if self._stopping:
+                raise
+        except Exception as e:
+            job.error = str(e)
+            await self._finish(job, FAILED)
+        finally:
+            self._running.pop(job_id, None)
+
+    def _release(self, user_id: Optional[str]) -> None:
+        self._active[user_id] = max(0, self._active.get(user_id, 0) - 1)
+        if not self._active[user_id]:
+            del self._active[user_id]
+
+    async def _finish(self, job: Job, status: str) -> None:
+        job.status = status
+        job.finished_at = time.time()
+        self._release(job.user_id)
+        await self.store.save(job)
+
+    async def _expire(self) -> None:
+        for job_id in await self.store.expired(time.time() - self.retention):
+            await self.store.delete(job_id)
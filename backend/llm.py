@@ -0,0 +1,332 @@
+import asyncio
+import os
+import random
+import time
+from functools import lru_cache
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from metrics import LLM_DURATION, LLM_IN_FLIGHT, LLM_TOKENS, stage_timer
+
+# Default number of concurrent completions allowed per endpoint
+DEFAULT_CONCURRENCY = int(os.getenv("LLM_DEFAULT_CONCURRENCY", "8"))
+# Seconds each model in the fallback chain gets, including retries
+DEFAULT_TIMEOUT = int(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+BACKOFF_SECONDS = float(os.getenv("LLM_BACKOFF_SECONDS", "0.5"))
+# Consecutive failures that open a model's circuit, and how long it stays open
+BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+
+
+@lru_cache(maxsize=None)
+def retryable_errors() -> Tuple[type, ...]:
+    """Errors worth retrying, or falling back to another model for."""
+    import openai
+
+    return (
+        openai.APIConnectionError,  # includes APITimeoutError
+        openai.RateLimitError,
+        openai.InternalServerError,
+        asyncio.TimeoutError,
+    )
+
+
+def parse_limits(value: Optional[str]) -> Dict[str, int]:
+    """Parse a limits string such as "extract_resume=4,portfolio=2"."""
+    limits = {}
+    if not value:
+        return limits
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, _, limit = item.partition("=")
+        try:
+            limits[name.strip()] = max(1, int(limit))
+        except ValueError:
+            print(f"Warning: Ignoring invalid limit: {item}")
+    return limits
+
+
+def parse_fallbacks(value: Optional[str]) -> Dict[str, str]:
+    """Parse a fallback string such as "gpt-4-turbo-preview=gpt-4o-mini,gpt-4o-mini=gpt-3.5-turbo"."""
+    fallbacks = {}
+    for item in (value or "").split(","):
+        model, _, fallback = item.partition("=")
+        if model.strip() and fallback.strip():
+            fallbacks[model.strip()] = fallback.strip()
+    return fallbacks
+
+
+class CircuitOpen(Exception):
+    """Every model in the fallback chain is failing; calls are refused until one recovers."""
+
+
+class CircuitBreaker:
+    """Stops calling a model after ``threshold`` consecutive failures.
+
+    After ``reset_timeout`` seconds one probe call is let through again; its
+    success closes the circuit, its failure keeps it open for another period.
+    """
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, reset_timeout: float = BREAKER_RESET_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if self.clock() - self.opened_at >= self.reset_timeout else "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "half_open":
+            # Let this call probe the model; others wait for its outcome
+            self.opened_at = self.clock()
+        return state != "open"
+
+    def success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+
+    def failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.opened_at = self.clock()
+
+
+class LLMClient:
+    """Async OpenAI client shared by every endpoint that talks to the LLM.
+
+    Completions are awaited instead of blocking the event loop, and each
+    endpoint gets its own semaphore so a burst of slow requests on one route
+    cannot starve the others.
+
+    Each model in a call's fallback chain gets a deadline (``timeouts`` per
+    endpoint, else ``default_timeout``) within which transient failures are
+    retried with jittered exponential backoff. When it runs out, or the
+    model's circuit breaker is open, the next model in ``fallbacks`` is
+    tried. Endpoints listed in ``hedge_after`` send a second identical
+    request if the first has not answered after that many seconds and use
+    whichever finishes first.
+
+    The OpenAI SDK is imported and its client created on first use, through
+    the connection pool returned by ``http_client`` if given, so importing
+    the app needs neither the SDK nor an API key.
+    """
+
+    def __init__(
+        self,
+        client: Optional[Any] = None,
+        http_client: Optional[Callable[[], Any]] = None,
+        limits: Optional[Dict[str, int]] = None,
+        default_limit: int = DEFAULT_CONCURRENCY,
+        timeouts: Optional[Dict[str, int]] = None,
+        default_timeout: float = DEFAULT_TIMEOUT,
+        max_retries: int = MAX_RETRIES,
+        backoff: float = BACKOFF_SECONDS,
+        hedge_after: Optional[Dict[str, int]] = None,
+        fallbacks: Optional[Dict[str, str]] = None,
+        breaker_threshold: int = BREAKER_THRESHOLD,
+        breaker_reset: float = BREAKER_RESET_SECONDS,
+    ):
+        self._client = client
+        self._http_client = None
+        self.http_client = http_client
+        self.limits = limits if limits is not None else parse_limits(os.getenv("LLM_CONCURRENCY_LIMITS"))
+        self.default_limit = default_limit
+        self.timeouts = timeouts if timeouts is not None else parse_limits(os.getenv("LLM_TIMEOUTS"))
+        self.default_timeout = default_timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.hedge_after = hedge_after if hedge_after is not None else parse_limits(os.getenv("LLM_HEDGE_AFTER"))
+        self.fallbacks = fallbacks if fallbacks is not None else parse_fallbacks(
+            os.getenv("LLM_FALLBACKS", "gpt-4-turbo-preview=gpt-4o-mini")
+        )
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    @property
+    def client(self) -> Any:
+        http_client = self.http_client() if self.http_client else None
+        if self._client is None or http_client is not self._http_client:
+            from openai import AsyncOpenAI
+
+            # AsyncOpenAI also honours OPENAI_BASE_URL, which is how the mock server is wired in.
+            # Retries are done here, across models, so the SDK's own are turned off.
+            # A closed pool is replaced by HTTPClients, so the client is rebuilt around the new one.
+            self._client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0, http_client=http_client)
+            self._http_client = http_client
+        return self._client
+
+    def semaphore(self, endpoint: str) -> asyncio.Semaphore:
+        if endpoint not in self._semaphores:
+            self._semaphores[endpoint] = asyncio.Semaphore(self.limits.get(endpoint, self.default_limit))
+        return self._semaphores[endpoint]
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        if model not in self.breakers:
+            self.breakers[model] = CircuitBreaker(self.breaker_threshold, self.breaker_reset)
+        return self.breakers[model]
+
+    def fallback_chain(self, model: str) -> List[str]:
+        chain = [model]
+        while self.fallbacks.get(chain[-1]) and self.fallbacks[chain[-1]] not in chain:
+            chain.append(self.fallbacks[chain[-1]])
+        return chain
+
+    def _count(self, model: str, event: str) -> None:
+        counters = self.stats.setdefault(model, {})
+        counters[event] = counters.get(event, 0) + 1
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            model: {**counters, "circuit": self.breaker(model).state}
+            for model, counters in self.stats.items()
+        }
+
+    def _backoff_delay(self, attempt: int, error: Exception) -> float:
+        delay = random.uniform(0, self.backoff * 2 ** attempt)
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        try:
+            return max(delay, float(retry_after)) if retry_after else delay
+        except ValueError:
+            return delay
+
+    async def _with_retries(self, endpoint: str, model: str, timeout: float, attempt: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``attempt`` until it succeeds, fails permanently or ``timeout`` runs out."""
+        breaker = self.breaker(model)
+        deadline = time.monotonic() + timeout
+        for retry in range(self.max_retries + 1):
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                result = await asyncio.wait_for(attempt(), max(0.0, deadline - time.monotonic()))
+                outcome = "ok"
+                breaker.success()
+                return result
+            except retryable_errors() as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    outcome = "timeout"
+                breaker.failure()
+                self._count(model, "timeouts" if isinstance(e, asyncio.TimeoutError) else "errors")
+                delay = self._backoff_delay(retry, e)
+                if retry == self.max_retries or breaker.state == "open" or time.monotonic() + delay >= deadline:
+                    raise
+                self._count(model, "retries")
+                await asyncio.sleep(delay)
+            finally:
+                LLM_DURATION.labels(endpoint, model, outcome).observe(time.perf_counter() - start)
+
+    async def _hedged(self, model: str, delay: Optional[int], request: Callable[[], Awaitable[Any]]) -> Any:
+        """Await ``request``, starting a second copy if the first takes longer than ``delay``."""
+        first = asyncio.ensure_future(request())
+        if not delay:
+            return await first
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self._count(model, "hedges")
+                tasks.add(asyncio.ensure_future(request()))
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _call(self, endpoint: str, kwargs: Dict[str, Any], attempt: Callable[[Dict[str, Any]], Awaitable[Any]]) -> Any:
+        """Try each model of the fallback chain for ``kwargs["model"]`` in turn."""
+        timeout = self.timeouts.get(endpoint, self.default_timeout)
+        error: Exception = CircuitOpen(f"All models for {endpoint} are unavailable")
+        for index, model in enumerate(self.fallback_chain(kwargs["model"])):
+            if not self.breaker(model).allow():
+                self._count(model, "short_circuits")
+                continue
+            if index:
+                self._count(model, "fallbacks")
+            self._count(model, "calls")
+            try:
+                return await self._with_retries(endpoint, model, timeout, lambda: attempt({**kwargs, "model": model}))
+            except retryable_errors() as e:
+                error = e
+        raise error
+
+    async def chat(self, endpoint: str, **kwargs: Any):
+        """Run a chat completion under the concurrency limit, deadline and fallbacks of ``endpoint``."""
+        hedge_after = self.hedge_after.get(endpoint)
+
+        def attempt(request: Dict[str, Any]):
+            return self._hedged(request["model"], hedge_after, lambda: self.client.chat.completions.create(**request))
+
+        with stage_timer(f"llm.{endpoint}"), LLM_IN_FLIGHT.labels(endpoint).track_inprogress():
+            async with self.semaphore(endpoint):
+                response = await self._call(endpoint, kwargs, attempt)
+        self._record_usage(endpoint, response.model, response.usage)
+        return response
+
+    @staticmethod
+    def _record_usage(endpoint: str, model: str, usage: Any) -> None:
+        if usage is not None:
+            LLM_TOKENS.labels(endpoint, model, "prompt").inc(usage.prompt_tokens or 0)
+            LLM_TOKENS.labels(endpoint, model, "completion").inc(usage.completion_tokens or 0)
+
+    async def stream(self, endpoint: str, **kwargs: Any) -> AsyncIterator[str]:
+        """Stream a chat completion, yielding content deltas as they arrive.
+
+        Retries and fallbacks apply until the first chunk arrives; after that
+        each further chunk must arrive within the endpoint's timeout, and a
+        failure counts against the model's circuit breaker. The upstream
+        response is closed however the stream ends, including when the
+        caller stops reading early.
+        """
+        async def attempt(request: Dict[str, Any]):
+            response = await self.client.chat.completions.create(stream=True, **request)
+            try:
+                chunks = response.__aiter__()
+                try:
+                    first = await chunks.__anext__()
+                except StopAsyncIteration:
+                    first = None
+            except BaseException:
+                # Failed or timed out before the first chunk; release the connection
+                await response.close()
+                raise
+            return request["model"], response, chunks, first
+
+        timeout = self.timeouts.get(endpoint, self.default_timeout)
+        # Ask for a final usage chunk so streamed calls are counted too
+        kwargs.setdefault("stream_options", {"include_usage": True})
+        with stage_timer(f"llm.{endpoint}"), LLM_IN_FLIGHT.labels(endpoint).track_inprogress():
+            async with self.semaphore(endpoint):
+                model, response, chunks, chunk = await self._call(endpoint, kwargs, attempt)
+                try:
+                    while chunk is not None:
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            yield chunk.choices[0].delta.content
+                        if getattr(chunk, "usage", None) is not None:
+                            self._record_usage(endpoint, chunk.model, chunk.usage)
+                        try:
+                            chunk = await asyncio.wait_for(chunks.__anext__(), timeout)
+                        except StopAsyncIteration:
+                            chunk = None
+                        except retryable_errors() as e:
+                            self.breaker(model).failure()
+                            self._count(model, "timeouts" if isinstance(e, asyncio.TimeoutError) else "errors")
+                            raise
+                finally:
+                    await response.close()
@@ -1,25 +1,93 @@
-from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, status
+from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Query, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 import os
 from dotenv import load_dotenv
-from openai import OpenAI
-from supabase import create_client, Client
-import httpx
 import secrets
-import openai
 import json
-import PyPDF2
-import io
+import hashlib
+import asyncio
+import uuid
 import base64
+from contextlib import asynccontextmanager
 from datetime import datetime
 
 # Load environment variables
 load_dotenv()
 
+# Local modules read their settings from the environment at import time
+from admission import AdmissionController, AdmissionMiddleware
+from ats import ATSScorer
+from cache import ExtractionCache, GenerationMemo, LRUCache
+from container import Container
+from documents import SNIFF_BYTES, DocumentError, TextExtractor, identify_document, sniff_document
+from extraction import (
+    DEFAULT_GROUP_MODELS, EXTRACTION_SCHEMA, HYBRID_LOCAL_FIELDS, SECTION_ADAPTERS, SECTION_GROUPS, RepairStats,
+    SectionStreamParser, empty_section, extraction_prompt, parse_group_models, repair_json, schema_subset,
+    validate_section
+)
+from jobs import JobLimitExceeded, JobNotCancellable, JobQueue
+from llm import LLMClient
+from metrics import STATS, MetricsMiddleware, render_metrics, stage_timer, worker_stopped
+from pagination import decode_cursor, encode_cursor, etag_matches, keyset_filter, make_etag, parse_fields
+from preparse import preparse_resume
+from prompting import PromptStats, count_tokens, serialize_resume
+from streaming import ParagraphSplitter, sse_event, sse_response
+from uploads import MULTIPART_OVERHEAD, RequestSizeLimitMiddleware, read_upload
+
 # Constants
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+EXTRACTION_MODEL = "gpt-4-turbo-preview"
+# "full" sends the whole resume to the LLM; "hybrid" parses trivially extractable fields locally first
+EXTRACTION_MODE = os.getenv("EXTRACTION_MODE", "full")
+# Bump when the extraction prompt changes so cached results are not reused
+EXTRACTION_PROMPT_VERSION = f"4-{EXTRACTION_MODE}"
+# Extract each group of extraction.SECTION_GROUPS with its own concurrent completion
+EXTRACTION_PARALLEL = os.getenv("EXTRACTION_PARALLEL", "false").lower() == "true"
+# Model per section group when extracting in parallel; groups not listed use EXTRACTION_MODEL
+EXTRACTION_GROUP_MODELS = parse_group_models(os.getenv("EXTRACTION_GROUP_MODELS", DEFAULT_GROUP_MODELS))
+# Look up previously stored ATS resumes / cover letters before generating new ones
+GENERATION_MEMO_DB_LOOKUP = os.getenv("GENERATION_MEMO_DB_LOOKUP", "false").lower() == "true"
+# Batch ATS matching: postings per request, how many get an LLM-optimized resume, and how many at once
+ATS_BATCH_MAX_JOBS = int(os.getenv("ATS_BATCH_MAX_JOBS", "100"))
+ATS_BATCH_TOP_K = int(os.getenv("ATS_BATCH_TOP_K", "5"))
+ATS_BATCH_TOP_K_MAX = int(os.getenv("ATS_BATCH_TOP_K_MAX", "10"))
+ATS_BATCH_CONCURRENCY = int(os.getenv("ATS_BATCH_CONCURRENCY", "3"))
+# Columns of the resumes table the read endpoints may return; file bytes only via include_file
+RESUME_FIELDS = ["id", "file_name", "file_type", "file_size", "storage_path", "extracted_data", "created_at", "updated_at"]
+RESUME_LIST_FIELDS = ["id", "file_name", "file_type", "file_size", "created_at"]
+RESUME_LATEST_FIELDS = ["id", "file_name", "extracted_data", "created_at"]
+# Also keep the base64 file in the resumes row, as before object storage. Only for databases
+# that do not have the storage_path migration (file_content nullable) applied yet.
+RESUME_INLINE_FILE_CONTENT = os.getenv("RESUME_INLINE_FILE_CONTENT", "false").lower() == "true"
+# Generate each portfolio style with its own concurrent request instead of one combined prompt.
+# Faster, but every request repeats the resume, so it costs about four times the prompt tokens.
+PORTFOLIO_PARALLEL = os.getenv("PORTFOLIO_PARALLEL", "false").lower() == "true"
+# On shutdown, how long background jobs and pending database writes get to finish
+SHUTDOWN_DRAIN_SECONDS = float(os.getenv("SHUTDOWN_DRAIN_SECONDS", "20"))
+PORTFOLIO_STYLES = {
+    "minimal": ("A modern, minimalist design", "Clean, whitespace-focused, typography-driven"),
+    "creative": ("A creative, artistic design", "Bold colors, unique layouts, artistic elements"),
+    "professional": ("A professional, corporate design", "Corporate colors, structured layout, formal presentation"),
+    "dynamic": ("A dynamic, interactive design", "Interactive elements, smooth animations, modern features"),
+}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Everything else in deps but the search index is created by the first request that needs it
+    deps.http_clients.start("openai", "linkedin")
+    jobs.start()
+    # Replaying (and maybe compacting) the search index log is file I/O, so it is done here, off the loop
+    await asyncio.to_thread(lambda: deps.search_index)
+    yield
+    # In-flight requests have been drained by the server by now; let running jobs finish too
+    await jobs.stop(timeout=SHUTDOWN_DRAIN_SECONDS)
+    # Flush pending database writes before the worker exits
+    await deps.aclose(timeout=SHUTDOWN_DRAIN_SECONDS)
+    resume_processor.text_extractor.shutdown()
+    worker_stopped()
 
 # Initialize FastAPI app with metadata
 app = FastAPI(
@@ -27,9 +95,23 @@ app = FastAPI(
     description="AI-powered career advice and guidance platform",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
+)
+
+# Refuse oversized uploads before the multipart body is parsed
+app.add_middleware(
+    RequestSizeLimitMiddleware,
+    limits={
+        "/api/resume/process": MAX_FILE_SIZE + MULTIPART_OVERHEAD,
+        "/api/resume/process/stream": MAX_FILE_SIZE + MULTIPART_OVERHEAD,
+    }
 )
 
+# Per-user, per-IP and global token budgets for the LLM-backed routes; inside CORS so 429s carry CORS headers
+admission = AdmissionController.from_env()
+app.add_middleware(AdmissionMiddleware, controller=admission)
+
 # Configure CORS with more specific settings
 app.add_middleware(
     CORSMiddleware,
@@ -40,22 +122,36 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Outermost, so request latency and Server-Timing cover every other middleware
+app.add_middleware(MetricsMiddleware)
 
-# Initialize Supabase client
-supabase_url = os.getenv("VITE_SUPABASE_URL")
-supabase_key = os.getenv("VITE_SUPABASE_ANON_KEY")
+# Shared clients (OpenAI, Supabase, HTTP pools, storage), created on first use
+deps = Container()
 
-if not supabase_url or not supabase_key:
-    raise ValueError("Missing Supabase credentials. Please check your .env file.")
+async def persist(table: str, row: Dict[str, Any]) -> None:
+    """Queue ``row`` for insertion into ``table``; without Supabase credentials it is skipped with a warning."""
+    try:
+        queue = deps.persistence
+    except ValueError as e:
+        print(f"Warning: Failed to store {table} row: {str(e)}")
+        return
+    await queue.put(table, row)
 
-supabase: Client = create_client(supabase_url, supabase_key)
+# Background worker pool for long-running generations
+jobs = JobQueue()
 
 # LinkedIn OAuth configuration
 LINKEDIN_CLIENT_ID = os.getenv("LINKEDIN_CLIENT_ID")
 LINKEDIN_CLIENT_SECRET = os.getenv("LINKEDIN_CLIENT_SECRET")
 LINKEDIN_REDIRECT_URI = os.getenv("LINKEDIN_REDIRECT_URI", "http://localhost:8080/auth/linkedin/callback")
+LINKEDIN_OAUTH_URL = os.getenv("LINKEDIN_OAUTH_URL", "https://www.linkedin.com/oauth/v2")
+LINKEDIN_API_URL = os.getenv("LINKEDIN_API_URL", "https://api.linkedin.com/v2")
+
+# Profiles fetched per authorization code, so a repeated callback does not hit LinkedIn again
+linkedin_profiles = GenerationMemo(LRUCache(
+    max_entries=1024,
+    ttl=float(os.getenv("LINKEDIN_PROFILE_TTL_SECONDS", "300"))
+))
 
 # Models with better type hints and validation
 class CareerQuery(BaseModel):
@@ -78,178 +174,314 @@ class JobDescription(BaseModel):
     description: str
 
 class ResumeProcessor:
-    def __init__(self):
-        self.client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    def __init__(self, llm: LLMClient, text_extractor: TextExtractor, extraction_cache: ExtractionCache, generation_memo: GenerationMemo, ats_scorer: ATSScorer):
+        self.llm = llm
+        self.text_extractor = text_extractor
+        self.extraction_cache = extraction_cache
+        self.generation_memo = generation_memo
+        self.ats_scorer = ats_scorer
+        self.prompt_stats = PromptStats()
+        self.repair_stats = RepairStats()
+    
+    def _resume_json(self, resume_data: Dict, purpose: str) -> str:
+        """Compact, token-budgeted JSON of the resume fields ``purpose`` needs."""
+        text, stats = serialize_resume(resume_data, purpose)
+        self.prompt_stats.record(purpose, stats)
+        return text
     
     async def extract_resume_data(self, file_content: bytes) -> Dict:
+        extracted_data = None
+        async for event, data in self.stream_resume_extraction(file_content):
+            if event == "done":
+                extracted_data = data
+        return extracted_data
+    
+    async def stream_resume_extraction(self, file_content: bytes):
+        """Yield ("section", ...) as each section is validated, ("repair", ...) for re-asks, then ("done", extracted_data).
+
+        The completion is streamed and parsed section by section; with
+        EXTRACTION_PARALLEL each section group streams its own completion
+        concurrently. Sections that arrive malformed are repaired locally;
+        those still missing or invalid at the end are requested again in one
+        prompt for just them, instead of re-running the whole extraction.
+        """
         try:
-            # Convert PDF to text
-            pdf_file = io.BytesIO(file_content)
+            # Identical uploads skip both PDF parsing and the LLM
+            cache_key = ExtractionCache.key(file_content, EXTRACTION_PROMPT_VERSION, self._extraction_models())
+            with stage_timer("extraction_cache"):
+                cached = await self.extraction_cache.get(cache_key)
+            if cached is not None:
+                yield "done", cached
+                return
+            
+            # Convert the document to text in the parser process pool
             try:
-                pdf_reader = PyPDF2.PdfReader(pdf_file)
-                if len(pdf_reader.pages) == 0:
-                    raise ValueError("PDF file is empty")
-                
-                text = ""
-                for page in pdf_reader.pages:
-                    page_text = page.extract_text()
-                    if not page_text.strip():
-                        raise ValueError("PDF appears to be empty or contains no text")
-                    text += page_text
+                with stage_timer("document_parse"):
+                    text = await self.text_extractor.extract(file_content)
+            except DocumentError as e:
+                raise DocumentError(f"Error reading document: {str(e)}")
             except Exception as e:
-                raise ValueError(f"Error reading PDF file: {str(e)}")
+                raise ValueError(f"Error reading document: {str(e)}")
             
-            # Use GPT-4 to extract structured information with detailed analysis
-            prompt = f"""As an expert ATS resume analyzer and career coach, perform a comprehensive analysis of the following resume. Extract and structure ALL possible information, including implicit details and potential improvements.
-
-            Return the data in this detailed JSON format:
-            {{
-                "personalInfo": {{
-                    "name": "",
-                    "email": "",
-                    "phone": "",
-                    "location": "",
-                    "linkedin": "",
-                    "portfolio": "",
-                    "github": "",
-                    "other_profiles": []
-                }},
-                "summary": {{
-                    "professional_summary": "",
-                    "key_achievements": [],
-                    "core_competencies": [],
-                    "career_objectives": [],
-                    "value_proposition": ""
-                }},
-                "education": [
-                    {{
-                        "degree": "",
-                        "institution": "",
-                        "year": "",
-                        "gpa": "",
-                        "relevant_coursework": [],
-                        "achievements": [],
-                        "extracurricular": [],
-                        "honors": [],
-                        "thesis": "",
-                        "specialization": ""
-                    }}
-                ],
-                "workExperience": [
-                    {{
-                        "company": "",
-                        "position": "",
-                        "duration": "",
-                        "location": "",
-                        "achievements": [],
-                        "responsibilities": [],
-                        "technologies_used": [],
-                        "quantifiable_results": [],
-                        "key_projects": [],
-                        "team_size": "",
-                        "reporting_to": "",
-                        "industry": "",
-                        "company_size": "",
-                        "impact_metrics": []
-                    }}
-                ],
-                "skills": {{
-                    "technical": [],
-                    "soft": [],
-                    "certifications": [],
-                    "languages": [],
-                    "tools": [],
-                    "methodologies": [],
-                    "domain_knowledge": [],
-                    "emerging_technologies": []
-                }},
-                "projects": [
-                    {{
-                        "name": "",
-                        "description": "",
-                        "technologies": [],
-                        "achievements": [],
-                        "duration": "",
-                        "url": "",
-                        "role": "",
-                        "team_size": "",
-                        "challenges": [],
-                        "solutions": [],
-                        "impact": "",
-                        "key_learnings": []
-                    }}
-                ],
-                "career_analysis": {{
-                    "career_progression": "",
-                    "industry_expertise": [],
-                    "leadership_qualities": [],
-                    "innovation_contributions": [],
-                    "problem_solving_abilities": [],
-                    "adaptability_indicators": []
-                }},
-                "ats_optimization": {{
-                    "keywords": [],
-                    "skills_alignment": [],
-                    "formatting_score": 0,
-                    "content_score": 0,
-                    "suggestions": [],
-                    "keyword_density": {{}},
-                    "missing_keywords": [],
-                    "formatting_issues": [],
-                    "content_gaps": []
-                }},
-                "improvement_suggestions": {{
-                    "content_enhancements": [],
-                    "formatting_improvements": [],
-                    "skill_gaps": [],
-                    "achievement_quantification": [],
-                    "keyword_optimization": [],
-                    "career_development": []
-                }}
-            }}
-
-            Resume text:
-            {text}
+            sections: Dict[str, Any] = {}
+            extras: Dict[str, Any] = {}
+            # Sections the LLM answered validly; pre-filled ones do not count
+            answered: set = set()
+            if EXTRACTION_MODE == "hybrid":
+                # Contact details and keyword density are parsed locally; the LLM gets the rest and the location
+                local = preparse_resume(text)
+                body, omit = local["body"], HYBRID_LOCAL_FIELDS
+                sections["personalInfo"] = local["personalInfo"]
+                yield "section", {"name": "personalInfo", "data": local["personalInfo"]}
+            else:
+                body, omit = text, []
+            schema = schema_subset(omit=omit)
             
-            Analyze the resume thoroughly and extract ALL possible information. Include implicit details and potential improvements. Return only the JSON object, no additional text."""
+            def accept(name: str, value: Any) -> Optional[Dict]:
+                """Validate a section from the LLM; returns its "section" event, or None if it is invalid."""
+                if name not in SECTION_ADAPTERS:
+                    extras[name] = value
+                    return None
+                if name not in schema:
+                    # Filled locally in hybrid mode
+                    return None
+                try:
+                    sections[name] = validate_section(name, value)
+                except ValueError:
+                    return None
+                answered.add(name)
+                if EXTRACTION_MODE == "hybrid" and name == "personalInfo":
+                    sections[name].update({
+                        field: value for field, value in local["personalInfo"].items()
+                        if f"personalInfo.{field}" in HYBRID_LOCAL_FIELDS
+                    })
+                if EXTRACTION_MODE == "hybrid" and name == "ats_optimization":
+                    sections[name]["keyword_density"] = local["keyword_density"]
+                return {"name": name, "data": sections[name]}
             
+            # Use GPT-4 to extract structured information with detailed analysis
+            completions = []
+            for endpoint, model, group in self._extraction_groups(schema):
+                prompt = extraction_prompt(body, schema_subset(sections=group, omit=omit))
+                completions.append((endpoint, model, prompt))
+            queue: asyncio.Queue = asyncio.Queue()
+            streams = [asyncio.create_task(self._stream_sections(*completion, queue)) for completion in completions]
+            parsers: List[SectionStreamParser] = []
+            errors: List[Exception] = []
             try:
-                response = self.client.chat.completions.create(
-                    model="gpt-4-turbo-preview",
-                    messages=[{"role": "user", "content": prompt}],
-                    response_format={"type": "json_object"},
-                    temperature=0.3  # Lower temperature for more consistent output
-                )
-                
-                extracted_data = json.loads(response.choices[0].message.content)
-                
-                # Store the extracted data in Supabase
+                while len(parsers) < len(streams):
+                    kind, item = await queue.get()
+                    if kind == "member":
+                        section = accept(*item)
+                        if section is not None:
+                            yield "section", section
+                    else:
+                        parser, error = item
+                        parsers.append(parser)
+                        if error is not None:
+                            errors.append(error)
+            finally:
+                for stream in streams:
+                    stream.cancel()
+            
+            # Sections that arrived but did not parse: fix them locally if possible
+            local_repairs = 0
+            for name, member in (member for parser in parsers for member in parser.malformed):
+                if name in schema and name not in sections:
+                    try:
+                        section = accept(name, repair_json(member))
+                    except ValueError:
+                        continue
+                    if section is not None:
+                        local_repairs += 1
+                        yield "section", section
+            
+            # A section cut off mid-stream is sent as partial, but re-asked for completeness
+            partial: Dict[str, Any] = {}
+            for truncated in filter(None, (parser.truncated() for parser in parsers)):
+                name, member = truncated
+                if name not in schema or name in sections:
+                    continue
                 try:
-                    result = supabase.table("resume_analysis").insert({
-                        "extracted_data": extracted_data,
-                        "created_at": datetime.utcnow().isoformat()
-                    }).execute()
-                    
-                    if result.error:
-                        print(f"Warning: Failed to store resume analysis: {result.error}")
+                    partial[name] = validate_section(name, repair_json(member))
+                    yield "section", {"name": name, "data": partial[name], "partial": True}
+                except ValueError:
+                    pass
+            
+            missing = [name for name in schema if name not in sections]
+            reask_tokens = 0
+            failed = 0
+            if missing:
+                yield "repair", {"sections": missing}
+                reask_prompt = extraction_prompt(body, schema_subset(sections=missing, omit=omit))
+                try:
+                    response = await self.llm.chat(
+                        "extract_resume",
+                        model=EXTRACTION_MODEL,
+                        messages=[{"role": "user", "content": reask_prompt}],
+                        response_format={"type": "json_object"},
+                        temperature=0.3
+                    )
+                    content = response.choices[0].message.content
+                    reask_tokens = count_tokens(reask_prompt) + count_tokens(content)
+                    reasked = repair_json(content)
                 except Exception as e:
-                    print(f"Warning: Failed to store resume analysis: {str(e)}")
-                
-                return extracted_data
-                
-            except json.JSONDecodeError:
+                    print(f"Warning: Re-asking for resume sections {missing} failed: {str(e)}")
+                    reasked = {}
+                for name in missing:
+                    section = accept(name, reasked[name]) if isinstance(reasked, dict) and name in reasked else None
+                    if section is not None:
+                        yield "section", section
+                        continue
+                    failed += 1
+                    sections[name] = partial.get(name, empty_section(name))
+            
+            if not answered:
+                if errors and len(errors) == len(streams):
+                    raise ValueError(f"Error processing resume with AI: {str(errors[0])}")
                 raise ValueError("Failed to parse AI response as JSON")
-            except Exception as e:
-                raise ValueError(f"Error processing resume with AI: {str(e)}")
+            
+            full_tokens = sum(count_tokens(prompt) for _, _, prompt in completions) + sum(count_tokens(parser.buffer) for parser in parsers)
+            tokens_saved = max(0, full_tokens - reask_tokens) if local_repairs or missing else 0
+            self.repair_stats.record(local_repairs, len(missing), failed, tokens_saved)
+            
+            extracted_data = {name: sections[name] for name in EXTRACTION_SCHEMA if name in sections}
+            extracted_data.update(extras)
+            if not failed:
+                # Sections left empty are not cached, so the next upload tries again
+                await self.extraction_cache.set(cache_key, extracted_data, full_tokens + reask_tokens)
+            
+            # Persisted once by process_resume, together with the resume record
+            yield "done", extracted_data
                 
+        except DocumentError:
+            raise
         except Exception as e:
             raise ValueError(f"Error processing resume: {str(e)}")
     
-    async def generate_portfolio(self, resume_data: Dict) -> Dict:
+    @staticmethod
+    def _extraction_groups(schema: Dict[str, Any]) -> List[tuple]:
+        """``(endpoint, model, sections)`` of each extraction completion for the sections in ``schema``."""
+        if not EXTRACTION_PARALLEL:
+            return [("extract_resume", EXTRACTION_MODEL, list(schema))]
+        groups = []
+        for group, group_sections in SECTION_GROUPS.items():
+            requested = [name for name in group_sections if name in schema]
+            if requested:
+                # Separate endpoints, so LLM_CONCURRENCY_LIMITS and LLM_TIMEOUTS can be set per group
+                groups.append((f"extract_resume.{group}", EXTRACTION_GROUP_MODELS.get(group, EXTRACTION_MODEL), requested))
+        return groups
+    
+    @staticmethod
+    def _extraction_models() -> str:
+        """Models used for extraction, as part of the cache key."""
+        if not EXTRACTION_PARALLEL:
+            return EXTRACTION_MODEL
+        return ",".join(f"{group}={EXTRACTION_GROUP_MODELS.get(group, EXTRACTION_MODEL)}" for group in SECTION_GROUPS)
+    
+    async def _stream_sections(self, endpoint: str, model: str, prompt: str, queue: asyncio.Queue) -> None:
+        """Stream one extraction completion, putting each parsed section on ``queue``, then its parser."""
+        parser = SectionStreamParser()
+        error = None
+        try:
+            async for chunk in self.llm.stream(
+                endpoint,
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                response_format={"type": "json_object"},
+                temperature=0.3  # Lower temperature for more consistent output
+            ):
+                for member in parser.feed(chunk):
+                    await queue.put(("member", member))
+        except Exception as e:
+            if parser.buffer:
+                # Keep what arrived before the stream broke; the rest is re-asked
+                print(f"Warning: Resume extraction stream ended early: {str(e)}")
+            else:
+                error = e
+        await queue.put(("end", (parser, error)))
+    
+    async def generate_portfolio(self, resume_data: Dict, styles: Optional[List[str]] = None, parallel: bool = PORTFOLIO_PARALLEL) -> Dict:
+        """Pages per style under "portfolios", and the error of each style that failed under "errors"."""
+        styles = styles or list(PORTFOLIO_STYLES)
+        errors: Dict[str, str] = {}
+        if parallel:
+            portfolio_data, errors = await self._generate_portfolio_parallel(resume_data, styles)
+        else:
+            portfolio_data = await self._generate_portfolio_combined(resume_data)
+            portfolio_data = {style: portfolio_data[style] for style in styles if style in portfolio_data}
+        
+        # Store the portfolio data in Supabase
+        await persist("portfolios", {
+            "template": "all" if len(styles) == len(PORTFOLIO_STYLES) else ",".join(styles),
+            "title": resume_data.get("personalInfo", {}).get("name", "Portfolio"),
+            "subtitle": resume_data.get("personalInfo", {}).get("target_role", "Professional Portfolio"),
+            "content": portfolio_data,
+            "created_at": datetime.utcnow().isoformat()
+        })
+        
+        return {"portfolios": portfolio_data, "errors": errors}
+    
+    async def _generate_portfolio_style(self, resume_json: str, style: str) -> Dict:
+        description, guidelines = PORTFOLIO_STYLES[style]
+        prompt = f"""As an expert web developer and designer, create a portfolio landing page based on this resume data: {description.lower()}.
+
+        Resume data:
+        {resume_json}
+
+        Generate:
+        1. Complete HTML structure with inline CSS
+        2. Responsive design that works on all devices
+        3. Sections for: Hero, About, Skills, Projects, Experience, Contact
+        4. A unique color scheme and typography
+        5. Modern UI elements and animations
+
+        Style guidelines: {guidelines}
+
+        Return the portfolio content in this JSON format:
+        {{
+            "html": "Complete HTML with inline CSS for {style} design",
+            "style": "Description of the {style} design approach"
+        }}
+
+        Use the resume data to populate all sections with real content.
+        Return only the JSON object, no additional text."""
+        
+        response = await self.llm.chat(
+            "portfolio",
+            model="gpt-4-turbo-preview",
+            messages=[{"role": "user", "content": prompt}],
+            response_format={"type": "json_object"},
+            temperature=0.7
+        )
+        
+        page = json.loads(response.choices[0].message.content)
+        page["preview_url"] = f"/portfolio/{style}"
+        return page
+    
+    async def _generate_portfolio_parallel(self, resume_data: Dict, styles: List[str]) -> Tuple[Dict, Dict[str, str]]:
+        """Generate each style concurrently; returns the pages and the errors of styles that failed."""
+        resume_json = self._resume_json(resume_data, "portfolio")
+        results = await asyncio.gather(
+            *(self._generate_portfolio_style(resume_json, style) for style in styles),
+            return_exceptions=True
+        )
+        portfolio_data = {}
+        errors = {}
+        for style, result in zip(styles, results):
+            if isinstance(result, Exception):
+                errors[style] = str(result)
+            else:
+                portfolio_data[style] = result
+        if not portfolio_data:
+            raise ValueError(f"Failed to generate portfolio: {errors}")
+        return portfolio_data, errors
+    
+    async def _generate_portfolio_combined(self, resume_data: Dict) -> Dict:
         prompt = f"""As an expert web developer and designer, create four unique portfolio landing pages based on this resume data. Each page should have its own distinct style and layout while maintaining professionalism.
 
         Resume data:
-        {json.dumps(resume_data, indent=2)}
+        {self._resume_json(resume_data, "portfolio")}
         
         Create four different portfolio styles:
         1. A modern, minimalist design
@@ -297,33 +529,45 @@ class ResumeProcessor:
         Use the resume data to populate all sections with real content.
         Return only the JSON object, no additional text."""
         
-        response = self.client.chat.completions.create(
+        response = await self.llm.chat(
+            "portfolio",
             model="gpt-4-turbo-preview",
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"},
             temperature=0.7
         )
         
-        portfolio_data = json.loads(response.choices[0].message.content)
-        
-        # Store the portfolio data in Supabase
-        try:
-            result = supabase.table("portfolios").insert({
-                "template": "all",
-                "title": resume_data.get("personalInfo", {}).get("name", "Portfolio"),
-                "subtitle": resume_data.get("personalInfo", {}).get("target_role", "Professional Portfolio"),
-                "content": portfolio_data,
-                "created_at": datetime.utcnow().isoformat()
-            }).execute()
-            
-            if result.error:
-                print(f"Warning: Failed to store portfolio: {result.error}")
-        except Exception as e:
-            print(f"Warning: Failed to store portfolio: {str(e)}")
-        
-        return portfolio_data
+        return json.loads(response.choices[0].message.content)
     
-    async def generate_ats_resume(self, resume_data: Dict, job_description: str) -> Dict:
+    async def _lookup_stored(self, table: str, column: str, id_column: str, resume_data: Dict, job_description: str) -> Optional[Dict]:
+        """Fetch the latest stored generation for this resume and job description, if enabled."""
+        if not GENERATION_MEMO_DB_LOOKUP or not resume_data.get("id"):
+            return None
+        with stage_timer(f"db.{table}"):
+            result = await asyncio.to_thread(
+                lambda: deps.supabase.table(table).select(column)
+                .eq(id_column, resume_data["id"])
+                .eq("job_description", job_description)
+                .order("created_at", desc=True)
+                .limit(1)
+                .execute()
+            )
+        return result.data[0][column] if result.data else None
+    
+    async def generate_ats_resume(self, resume_data: Dict, job_description: str, force_refresh: bool = False,
+                                  local_score: Optional[Dict] = None, resume_json: Optional[str] = None) -> Dict:
+        key = GenerationMemo.key("ats_resume", resume_data, job_description)
+        return await self.generation_memo.get_or_create(
+            key,
+            lambda: self._generate_ats_resume(resume_data, job_description, local_score, resume_json),
+            lookup=lambda: self._lookup_stored("ats_optimized_resumes", "optimized_data", "original_resume_id", resume_data, job_description),
+            force_refresh=force_refresh
+        )
+    
+    async def _generate_ats_resume(self, resume_data: Dict, job_description: str,
+                                   local_score: Optional[Dict] = None, resume_json: Optional[str] = None) -> Dict:
+        local_score = local_score or self.ats_scorer.score(resume_data, job_description)
+        resume_json = resume_json or self._resume_json(resume_data, "ats_resume")
         prompt = f"""As an expert ATS resume optimizer, create an optimized resume based on this resume data and job description.
         Focus on:
         1. Keyword optimization and matching
@@ -333,11 +577,16 @@ class ResumeProcessor:
         5. Professional summary optimization
         
         Resume data:
-        {json.dumps(resume_data, indent=2)}
+        {resume_json}
         
         Job Description:
         {job_description}
         
+        Keyword analysis of the original resume against this job description (use it as the starting point for ats_score and keyword_matches, and work the missing keywords in where the resume supports them):
+        Score: {local_score["ats_score"]}/100
+        Matched keywords: {", ".join(local_score["keyword_matches"]) or "none"}
+        Missing keywords: {", ".join(local_score["missing_keywords"]) or "none"}
+        
         Return the optimized resume content in this JSON format:
         {{
             "optimized_summary": "",
@@ -350,31 +599,67 @@ class ResumeProcessor:
             "improvement_suggestions": []
         }}"""
         
-        response = self.client.chat.completions.create(
+        response = await self.llm.chat(
+            "ats_resume",
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"}
         )
         
         optimized_data = json.loads(response.choices[0].message.content)
+        optimized_data["local_ats_score"] = {key: local_score[key] for key in ("ats_score", "keyword_matches", "missing_keywords")}
         
         # Store the optimized version
-        try:
-            result = supabase.table("ats_optimized_resumes").insert({
-                "original_resume_id": resume_data.get("id"),
-                "job_description": job_description,
-                "optimized_data": optimized_data,
-                "created_at": datetime.utcnow().isoformat()
-            }).execute()
-            
-            if result.error:
-                print(f"Warning: Failed to store ATS optimized resume: {result.error}")
-        except Exception as e:
-            print(f"Warning: Failed to store ATS optimized resume: {str(e)}")
+        await persist("ats_optimized_resumes", {
+            "original_resume_id": resume_data.get("id"),
+            "job_description": job_description,
+            "optimized_data": optimized_data,
+            "created_at": datetime.utcnow().isoformat()
+        })
         
         return optimized_data
     
-    async def generate_cover_letter(self, resume_data: Dict, job_description: str) -> Dict:
+    async def match_jobs(self, resume_data: Dict, job_descriptions: List[str], top_k: int = ATS_BATCH_TOP_K, force_refresh: bool = False):
+        """Rank job descriptions against one resume, then optimize the resume for the top ``top_k``.
+
+        Yields ``("ranking", ranking)`` first, then ``("result", (index, data))``
+        or ``("error", (index, message))`` for each optimization as it finishes.
+        """
+        ranking = self.ats_scorer.rank(resume_data, job_descriptions)
+        yield "ranking", ranking
+        
+        resume_json = self._resume_json(resume_data, "ats_resume")
+        semaphore = asyncio.Semaphore(ATS_BATCH_CONCURRENCY)
+        
+        async def optimize(match: Dict):
+            async with semaphore:
+                try:
+                    data = await self.generate_ats_resume(
+                        resume_data, job_descriptions[match["index"]], force_refresh, match, resume_json
+                    )
+                    return "result", (match["index"], data)
+                except Exception as e:
+                    return "error", (match["index"], str(e))
+        
+        tasks = [asyncio.create_task(optimize(match)) for match in ranking[:top_k]]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # The client went away or the stream failed; stop the remaining optimizations
+            for task in tasks:
+                task.cancel()
+    
+    async def generate_cover_letter(self, resume_data: Dict, job_description: str, force_refresh: bool = False) -> Dict:
+        key = GenerationMemo.key("cover_letter", resume_data, job_description)
+        return await self.generation_memo.get_or_create(
+            key,
+            lambda: self._generate_cover_letter(resume_data, job_description),
+            lookup=lambda: self._lookup_stored("cover_letters", "cover_letter_data", "resume_id", resume_data, job_description),
+            force_refresh=force_refresh
+        )
+    
+    def _cover_letter_request(self, resume_data: Dict, job_description: str) -> Dict:
         prompt = f"""As an expert cover letter writer, create a compelling and personalized cover letter based on this resume data and job description.
         Focus on:
         1. Strong opening that captures attention
@@ -384,7 +669,7 @@ class ResumeProcessor:
         5. Professional closing with call to action
         
         Resume data:
-        {json.dumps(resume_data, indent=2)}
+        {self._resume_json(resume_data, "cover_letter")}
         
         Job Description:
         {job_description}
@@ -403,32 +688,83 @@ class ResumeProcessor:
             }}
         }}"""
         
-        response = self.client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"}
-        )
+        return {
+            "model": "gpt-4o-mini",
+            "messages": [{"role": "user", "content": prompt}],
+            "response_format": {"type": "json_object"}
+        }
+    
+    async def _store_cover_letter(self, resume_data: Dict, job_description: str, cover_letter_data: Dict) -> None:
+        await persist("cover_letters", {
+            "resume_id": resume_data.get("id"),
+            "job_description": job_description,
+            "cover_letter_data": cover_letter_data,
+            "created_at": datetime.utcnow().isoformat()
+        })
+    
+    async def _generate_cover_letter(self, resume_data: Dict, job_description: str) -> Dict:
+        response = await self.llm.chat("cover_letter", **self._cover_letter_request(resume_data, job_description))
         
         cover_letter_data = json.loads(response.choices[0].message.content)
         
         # Store the cover letter
-        try:
-            result = supabase.table("cover_letters").insert({
-                "resume_id": resume_data.get("id"),
-                "job_description": job_description,
-                "cover_letter_data": cover_letter_data,
-                "created_at": datetime.utcnow().isoformat()
-            }).execute()
-            
-            if result.error:
-                print(f"Warning: Failed to store cover letter: {result.error}")
-        except Exception as e:
-            print(f"Warning: Failed to store cover letter: {str(e)}")
+        await self._store_cover_letter(resume_data, job_description, cover_letter_data)
         
         return cover_letter_data
+    
+    async def stream_cover_letter(self, resume_data: Dict, job_description: str, force_refresh: bool = False):
+        """Yield ("token", text) events as the letter is generated, then ("done", cover_letter_data)."""
+        key = GenerationMemo.key("cover_letter", resume_data, job_description)
+        cached = None if force_refresh else self.generation_memo.memory.get(key)
+        if cached is not None:
+            yield "done", cached
+            return
+        
+        chunks = []
+        async for text in self.llm.stream("cover_letter", **self._cover_letter_request(resume_data, job_description)):
+            chunks.append(text)
+            yield "token", text
+        
+        cover_letter_data = json.loads("".join(chunks))
+        
+        # Store only once the full letter has been received
+        await self._store_cover_letter(resume_data, job_description, cover_letter_data)
+        self.generation_memo.memory.set(key, cover_letter_data, len(json.dumps(cover_letter_data)))
+        
+        yield "done", cover_letter_data
 
 # Initialize the processor
-resume_processor = ResumeProcessor()
+resume_processor = ResumeProcessor(deps.llm, TextExtractor(), ExtractionCache.from_env(), GenerationMemo.from_env(), ATSScorer.from_env())
+
+# Gauges computed when /metrics is scraped
+STATS.register("cache_hit_ratio", "Hit ratio of each cache", ["cache"], lambda: {
+    ("extraction",): resume_processor.extraction_cache.hit_ratio,
+    ("generation",): resume_processor.generation_memo.hit_ratio,
+})
+STATS.register("cache_entries", "In-memory entries of each cache", ["cache"], lambda: {
+    ("extraction",): len(resume_processor.extraction_cache.memory),
+    ("generation",): len(resume_processor.generation_memo.memory),
+})
+STATS.register("db_writes_pending", "Rows waiting in the write-behind queue", [], lambda: {
+    (): deps.persistence.pending if deps.created("persistence") else 0
+})
+STATS.register("jobs", "Background jobs by state", ["state"], lambda: {
+    (state,): count for state, count in jobs.counts().items()
+})
+STATS.register("admission_waiting", "Requests waiting for admission", [], lambda: {(): admission.waiting})
+STATS.register("llm_circuit_open", "Whether the circuit breaker of each model is open", ["model"], lambda: {
+    (model,): float(breaker.state == "open") for model, breaker in deps.llm.breakers.items()
+})
+STATS.register("search_index_documents", "Resumes in the search index", [], lambda: {
+    (): len(deps.search_index) if deps.created("search_index") else 0
+})
+STATS.register("document_parse_seconds", "Total document parsing time by kind", ["kind"], lambda: {
+    (kind,): stats["parse_seconds"] for kind, stats in resume_processor.text_extractor.stats.items()
+})
+
+def client_identity(request: Request) -> str:
+    """Identify the caller by the X-User-Id header, falling back to the client IP."""
+    return request.headers.get("x-user-id") or (request.client.host if request.client else "anonymous")
 
 # Routes with better documentation
 @app.get("/", response_model=APIResponse, tags=["Health Check"])
@@ -440,56 +776,86 @@ async def root():
         data={"version": "1.0.0"}
     )
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics."""
+    content, content_type = render_metrics()
+    return Response(content, media_type=content_type)
+
+@app.get("/api/cache/stats", response_model=APIResponse, tags=["Health Check"])
+async def cache_stats():
+    """Hit/miss counters of the caches and document parsing metrics."""
+    cache = resume_processor.extraction_cache
+    memo = resume_processor.generation_memo
+    documents = resume_processor.text_extractor
+    return APIResponse(
+        status="success",
+        message="Cache statistics",
+        data={
+            "extraction": {**cache.stats, "hit_ratio": cache.hit_ratio, "entries": len(cache.memory)},
+            "generation": {**memo.stats, "hit_ratio": memo.hit_ratio, "entries": len(memo.memory)},
+            "linkedin_profiles": {**linkedin_profiles.stats, "entries": len(linkedin_profiles.memory)},
+            "documents": documents.stats,
+            "prompts": resume_processor.prompt_stats.summary(),
+            "extraction_repairs": resume_processor.repair_stats.summary(),
+            "admission": {**admission.stats, "waiting": admission.waiting},
+            "llm": deps.llm.summary()
+        }
+    )
+
+async def fetch_linkedin_profile(code: str) -> Dict:
+    """Exchange the authorization code for a token and fetch the member's profile and email."""
+    client = deps.http_clients.get("linkedin")
+    token_response = await client.post(
+        f"{LINKEDIN_OAUTH_URL}/accessToken",
+        data={
+            "grant_type": "authorization_code",
+            "code": code,
+            "client_id": LINKEDIN_CLIENT_ID,
+            "client_secret": LINKEDIN_CLIENT_SECRET,
+            "redirect_uri": LINKEDIN_REDIRECT_URI,
+        }
+    )
+    
+    if token_response.status_code != 200:
+        raise HTTPException(status_code=400, detail="Failed to get LinkedIn access token")
+    
+    access_token = token_response.json()["access_token"]
+    headers = {"Authorization": f"Bearer {access_token}"}
+    
+    # Both only need the access token, so fetch them concurrently
+    profile_response, email_response = await asyncio.gather(
+        client.get(f"{LINKEDIN_API_URL}/me", headers=headers),
+        client.get(f"{LINKEDIN_API_URL}/emailAddress?q=members&projection=(elements*(handle~))", headers=headers)
+    )
+    
+    if profile_response.status_code != 200:
+        raise HTTPException(status_code=400, detail="Failed to get LinkedIn profile")
+    if email_response.status_code != 200:
+        raise HTTPException(status_code=400, detail="Failed to get LinkedIn email")
+    
+    return {
+        "profile": profile_response.json(),
+        "email": email_response.json()["elements"][0]["handle~"]["emailAddress"]
+    }
+
 @app.post("/api/linkedin/callback", response_model=APIResponse, tags=["Authentication"])
 async def linkedin_callback(callback: LinkedInCallback):
     """Handle LinkedIn OAuth callback and create/update user account."""
     try:
-        # Exchange code for access token
-        async with httpx.AsyncClient() as client:
-            token_response = await client.post(
-                "https://www.linkedin.com/oauth/v2/accessToken",
-                data={
-                    "grant_type": "authorization_code",
-                    "code": callback.code,
-                    "client_id": LINKEDIN_CLIENT_ID,
-                    "client_secret": LINKEDIN_CLIENT_SECRET,
-                    "redirect_uri": LINKEDIN_REDIRECT_URI,
-                }
-            )
-            
-            if token_response.status_code != 200:
-                raise HTTPException(status_code=400, detail="Failed to get LinkedIn access token")
-            
-            access_token = token_response.json()["access_token"]
-            
-            # Get user profile from LinkedIn
-            profile_response = await client.get(
-                "https://api.linkedin.com/v2/me",
-                headers={"Authorization": f"Bearer {access_token}"}
-            )
-            
-            if profile_response.status_code != 200:
-                raise HTTPException(status_code=400, detail="Failed to get LinkedIn profile")
-            
-            profile_data = profile_response.json()
-            
-            # Get email address
-            email_response = await client.get(
-                "https://api.linkedin.com/v2/emailAddress?q=members&projection=(elements*(handle~))",
-                headers={"Authorization": f"Bearer {access_token}"}
-            )
-            
-            if email_response.status_code != 200:
-                raise HTTPException(status_code=400, detail="Failed to get LinkedIn email")
-            
-            email_data = email_response.json()
-            email = email_data["elements"][0]["handle~"]["emailAddress"]
-            
-            # Generate a random password for the user
-            password = secrets.token_urlsafe(16)
-            
-            # Create or update user in Supabase
-            user_response = await supabase.auth.sign_up({
+        key = hashlib.sha256(callback.code.encode("utf-8")).hexdigest()
+        linkedin = await linkedin_profiles.get_or_create(key, lambda: fetch_linkedin_profile(callback.code))
+        profile_data = linkedin["profile"]
+        email = linkedin["email"]
+        
+        # Generate a random password for the user
+        password = secrets.token_urlsafe(16)
+        
+        # Create or update user in Supabase
+        from supabase import AuthApiError
+
+        try:
+            await asyncio.to_thread(lambda: deps.supabase.auth.sign_up({
                 "email": email,
                 "password": password,
                 "options": {
@@ -499,21 +865,22 @@ async def linkedin_callback(callback: LinkedInCallback):
                         "linkedin_url": f"https://www.linkedin.com/in/{profile_data.get('id')}"
                     }
                 }
-            })
-            
-            if user_response.error:
-                raise HTTPException(status_code=400, detail=str(user_response.error))
-            
-            return APIResponse(
-                status="success",
-                message="LinkedIn authentication successful",
-                data={
-                    "email": email,
-                    "password": password,  # In production, use a more secure method
-                    "linkedinUrl": f"https://www.linkedin.com/in/{profile_data.get('id')}"
-                }
-            )
-            
+            }))
+        except AuthApiError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        return APIResponse(
+            status="success",
+            message="LinkedIn authentication successful",
+            data={
+                "email": email,
+                "password": password,  # In production, use a more secure method
+                "linkedinUrl": f"https://www.linkedin.com/in/{profile_data.get('id')}"
+            }
+        )
+        
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -521,7 +888,9 @@ async def linkedin_callback(callback: LinkedInCallback):
 async def test_career_interactions():
     """Test endpoint to verify Supabase career interactions table accessibility."""
     try:
-        result = supabase.table("career_interactions").select("*").limit(1).execute()
+        result = await asyncio.to_thread(
+            lambda: deps.supabase.table("career_interactions").select("*").limit(1).execute()
+        )
         return APIResponse(
             status="success",
             message="Career interactions table exists and is accessible",
@@ -533,30 +902,43 @@ async def test_career_interactions():
             detail=f"Error accessing career_interactions table: {str(e)}"
         )
 
+def career_advice_request(query: CareerQuery) -> Dict:
+    # Create a prompt for OpenAI
+    prompt = f"""
+    As a career advisor, please provide advice for the following query:
+    {query.query}
+    
+    Please provide:
+    1. A detailed response
+    2. 3-5 specific action items or suggestions
+    """
+    return {
+        "model": "gpt-4-turbo-preview",
+        "messages": [
+            {"role": "system", "content": "You are a professional career advisor with expertise in career development, job searching, and professional growth."},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.7,
+        "max_tokens": 1000
+    }
+
+async def store_career_interaction(query: CareerQuery, advice: str, suggestions: List[str]) -> None:
+    # Store the interaction in Supabase if user_id is provided
+    if query.user_id:
+        await persist("career_interactions", {
+            "user_id": query.user_id,
+            "query": query.query,
+            "response": advice,
+            "suggestions": suggestions,
+            "created_at": "now()"
+        })
+
 @app.post("/api/career-advice", response_model=CareerResponse, tags=["Career Advice"])
 async def get_career_advice(query: CareerQuery):
     """Get AI-powered career advice based on user query."""
     try:
-        # Create a prompt for OpenAI
-        prompt = f"""
-        As a career advisor, please provide advice for the following query:
-        {query.query}
-        
-        Please provide:
-        1. A detailed response
-        2. 3-5 specific action items or suggestions
-        """
-
         # Get response from OpenAI
-        response = client.chat.completions.create(
-            model="gpt-4-turbo-preview",
-            messages=[
-                {"role": "system", "content": "You are a professional career advisor with expertise in career development, job searching, and professional growth."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=1000
-        )
+        response = await deps.llm.chat("career_advice", **career_advice_request(query))
 
         # Process the response
         advice = response.choices[0].message.content
@@ -566,20 +948,7 @@ async def get_career_advice(query: CareerQuery):
         main_response = parts[0]
         suggestions = [s.strip() for s in parts[1:] if s.strip()]
 
-        # Store the interaction in Supabase if user_id is provided
-        if query.user_id:
-            try:
-                result = supabase.table("career_interactions").insert({
-                    "user_id": query.user_id,
-                    "query": query.query,
-                    "response": advice,
-                    "suggestions": suggestions,
-                    "created_at": "now()"
-                }).execute()
-                print("Stored in Supabase:", result)
-            except Exception as e:
-                print("Error storing in Supabase:", str(e))
-                # Continue even if storage fails
+        await store_career_interaction(query, advice, suggestions)
 
         return CareerResponse(
             response=main_response,
@@ -592,75 +961,149 @@ async def get_career_advice(query: CareerQuery):
             detail=f"Error processing career advice request: {str(e)}"
         )
 
+@app.post("/api/career-advice/stream", tags=["Career Advice"])
+async def stream_career_advice(query: CareerQuery):
+    """Stream career advice as Server-Sent Events.
+
+    Emits ``token`` events as text arrives, a ``response`` event for the main
+    answer, a ``suggestion`` event per suggestion, and a final ``done`` event
+    with the same payload as /api/career-advice.
+    """
+    async def events():
+        try:
+            chunks = []
+            splitter = ParagraphSplitter()
+            main_response = None
+            suggestions = []
+            
+            def parts(paragraphs):
+                nonlocal main_response
+                for paragraph in paragraphs:
+                    if main_response is None:
+                        main_response = paragraph
+                        yield sse_event("response", {"text": paragraph})
+                    elif paragraph.strip():
+                        suggestions.append(paragraph.strip())
+                        yield sse_event("suggestion", {"text": paragraph.strip()})
+            
+            async for text in deps.llm.stream("career_advice", **career_advice_request(query)):
+                chunks.append(text)
+                yield sse_event("token", {"text": text})
+                for event in parts(splitter.feed(text)):
+                    yield event
+            for event in parts(splitter.close()):
+                yield event
+            
+            await store_career_interaction(query, "".join(chunks), suggestions)
+            yield sse_event("done", {"response": main_response or "", "suggestions": suggestions})
+        except Exception as e:
+            yield sse_event("error", {"detail": f"Error processing career advice request: {str(e)}"})
+    
+    return sse_response(events())
+
+async def store_resume_file(path: str, content: bytes, content_type: Optional[str]) -> str:
+    with stage_timer("object_store_put"):
+        return await deps.resume_store.put(path, content, content_type)
+
+async def read_resume_upload(file: UploadFile) -> bytes:
+    # Check file type from its leading bytes, before reading the rest of the upload
+    header = await file.read(SNIFF_BYTES)
+    await file.seek(0)
+    if sniff_document(header) is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Only PDF and DOCX files are supported"
+        )
+
+    # Read in chunks, stopping as soon as the size limit is exceeded
+    with stage_timer("upload_read"):
+        content = await read_upload(file, MAX_FILE_SIZE)
+    # Zip files that are not Word documents (xlsx, jar, corrupt archives) are caught here
+    try:
+        identify_document(content)
+    except DocumentError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    return content
+
+async def save_resume(resume_id: str, file_name: Optional[str], content_type: Optional[str], content: bytes,
+                      storage_path: str, upload: asyncio.Task, resume_data: Dict) -> Dict:
+    """Index and persist an extracted resume once its file upload has finished.
+
+    A failed upload fails the request: the row would reference a file that
+    does not exist.
+    """
+    try:
+        await upload
+    except Exception as e:
+        raise Exception(f"Failed to store resume file: {str(e)}")
+    
+    try:
+        resume_record = {
+            "id": resume_id,
+            "file_name": file_name,
+            "storage_path": storage_path,
+            "file_type": content_type,
+            "file_size": len(content),
+            "extracted_data": resume_data,
+            "created_at": datetime.utcnow().isoformat(),
+            "updated_at": datetime.utcnow().isoformat()
+        }
+        if RESUME_INLINE_FILE_CONTENT:
+            resume_record["file_content"] = base64.b64encode(content).decode("ascii")
+        
+        # Written before answering, unlike the other tables, so the returned resume_id exists
+        with stage_timer("db.resumes"):
+            await asyncio.to_thread(lambda: deps.supabase.table("resumes").insert(resume_record).execute())
+        with stage_timer("search_index"):
+            await asyncio.to_thread(deps.search_index.add, resume_id, resume_data, resume_record["created_at"])
+        await persist("resume_analysis", {
+            "extracted_data": resume_data,
+            "created_at": datetime.utcnow().isoformat()
+        })
+        
+        return {
+            "status": "success",
+            "data": resume_data,
+            "resume_id": resume_id
+        }
+        
+    except Exception as e:
+        print(f"Error in database operations: {str(e)}")
+        # If storage fails, still return the processed data
+        return {
+            "status": "partial_success",
+            "message": "Resume processed but storage failed",
+            "data": resume_data
+        }
+
 @app.post("/api/resume/process", tags=["Resume Processing"])
 async def process_resume(file: UploadFile = File(...)):
     try:
-        # Check file size
-        content = await file.read()
-        if len(content) > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail="File size exceeds the 5MB limit"
-            )
-
-        # Check file type
-        if not file.filename.lower().endswith(('.pdf', '.docx')):
-            raise HTTPException(
-                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
-                detail="Only PDF and DOCX files are supported"
-            )
+        content = await read_resume_upload(file)
 
         try:
+            # The ID is generated here so it can be returned before the row is written
+            resume_id = str(uuid.uuid4())
+            
+            # Upload the raw file while the resume is being analyzed
+            storage_path = f"{resume_id}.{sniff_document(content)}"
+            upload = asyncio.create_task(store_resume_file(storage_path, content, file.content_type))
+            
             # Process the resume
-            resume_data = await resume_processor.extract_resume_data(content)
+            try:
+                resume_data = await resume_processor.extract_resume_data(content)
+            except Exception:
+                upload.cancel()
+                raise
             
             # Store in Supabase
-            try:
-                # Convert file content to base64 for storage
-                file_base64 = base64.b64encode(content).decode('utf-8')
-                
-                # Create resume record
-                resume_record = {
-                    "file_name": file.filename,
-                    "file_content": file_base64,
-                    "file_type": file.content_type,
-                    "file_size": len(content),
-                    "extracted_data": resume_data,
-                    "created_at": datetime.utcnow().isoformat(),
-                    "updated_at": datetime.utcnow().isoformat()
-                }
-                
-                # Insert into resumes table
-                result = supabase.table("resumes").insert(resume_record).execute()
-                
-                if result.error:
-                    print(f"Error storing resume: {result.error}")
-                    raise Exception(f"Error storing resume: {result.error}")
-                
-                # Also store in resume_analysis table
-                analysis_result = supabase.table("resume_analysis").insert({
-                    "extracted_data": resume_data,
-                    "created_at": datetime.utcnow().isoformat()
-                }).execute()
-                
-                if analysis_result.error:
-                    print(f"Warning: Failed to store resume analysis: {analysis_result.error}")
-                
-                return {
-                    "status": "success",
-                    "data": resume_data,
-                    "resume_id": result.data[0]["id"]
-                }
-                
-            except Exception as e:
-                print(f"Error in database operations: {str(e)}")
-                # If storage fails, still return the processed data
-                return {
-                    "status": "partial_success",
-                    "message": "Resume processed but storage failed",
-                    "data": resume_data
-                }
+            return await save_resume(resume_id, file.filename, file.content_type, content, storage_path, upload, resume_data)
                 
+        except DocumentError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Error processing resume: {str(e)}"
+            )
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -674,53 +1117,296 @@ async def process_resume(file: UploadFile = File(...)):
             detail=f"Unexpected error: {str(e)}"
         )
 
-@app.post("/api/resume/generate-portfolio", tags=["Resume Processing"])
-async def generate_portfolio(resume_data: Dict):
+@app.post("/api/resume/process/stream", tags=["Resume Processing"])
+async def process_resume_stream(file: UploadFile = File(...)):
+    """Process a resume, streaming the extracted sections as Server-Sent Events.
+
+    ``section`` events carry each section as soon as it is validated
+    (``partial`` when it was cut off and is being re-requested), ``repair``
+    lists sections asked for again, and ``done`` carries the same payload
+    as /api/resume/process.
+    """
+    content = await read_resume_upload(file)
+    file_name, content_type = file.filename, file.content_type
+    
+    async def events():
+        resume_id = str(uuid.uuid4())
+        storage_path = f"{resume_id}.{sniff_document(content)}"
+        upload = asyncio.create_task(store_resume_file(storage_path, content, content_type))
+        try:
+            resume_data = None
+            async for event, data in resume_processor.stream_resume_extraction(content):
+                if event == "done":
+                    resume_data = data
+                else:
+                    yield sse_event(event, data)
+            yield sse_event("done", await save_resume(resume_id, file_name, content_type, content, storage_path, upload, resume_data))
+        except Exception as e:
+            upload.cancel()
+            yield sse_event("error", {"detail": f"Error processing resume: {str(e)}"})
+    
+    return sse_response(events())
+
+@app.post("/api/resume/generate-portfolio", status_code=status.HTTP_202_ACCEPTED, tags=["Resume Processing"])
+async def generate_portfolio(
+    resume_data: Dict,
+    request: Request,
+    styles: Optional[List[str]] = Query(None, description="Subset of portfolio styles to generate"),
+    parallel: bool = Query(PORTFOLIO_PARALLEL, description="Generate each style with its own concurrent request")
+):
+    """Queue portfolio generation; poll GET /api/jobs/{job_id} for the result."""
+    unknown = [style for style in styles or [] if style not in PORTFOLIO_STYLES]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown portfolio styles: {', '.join(unknown)}"
+        )
+    try:
+        job = await jobs.submit(
+            "portfolio",
+            lambda: resume_processor.generate_portfolio(resume_data, styles, parallel),
+            user_id=client_identity(request)
+        )
+    except JobLimitExceeded as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+    return {"status": "accepted", "job_id": job.id, "status_url": f"/api/jobs/{job.id}"}
+
+@app.get("/api/jobs/{job_id}", tags=["Jobs"])
+async def get_job(job_id: str):
+    """Status of a background job, including its result once it has succeeded."""
+    job = await jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return {"status": "success", "data": job.to_dict()}
+
+@app.delete("/api/jobs/{job_id}", tags=["Jobs"])
+async def cancel_job(job_id: str):
+    """Cancel a queued or running background job.
+
+    A job running in another server worker cannot be interrupted from this one: 409.
+    """
     try:
-        portfolio = await resume_processor.generate_portfolio(resume_data)
-        return {"status": "success", "data": portfolio}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        job = await jobs.cancel(job_id)
+    except JobNotCancellable as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return {"status": "success", "data": job.to_dict()}
+
+@app.post("/api/resume/ats-score", tags=["Resume Processing"])
+async def ats_score(resume_data: Dict, job_description: JobDescription):
+    """Score a resume against a job description locally, without an LLM call."""
+    return {"status": "success", "data": resume_processor.ats_scorer.score(resume_data, job_description.description)}
 
 @app.post("/api/resume/generate-ats", tags=["Resume Processing"])
-async def generate_ats_resume(resume_data: Dict, job_description: JobDescription):
+async def generate_ats_resume(resume_data: Dict, job_description: JobDescription, force_refresh: bool = False):
     try:
-        ats_resume = await resume_processor.generate_ats_resume(resume_data, job_description.description)
+        ats_resume = await resume_processor.generate_ats_resume(resume_data, job_description.description, force_refresh)
         return {"status": "success", "data": ats_resume}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/resume/generate-ats/batch", tags=["Resume Processing"])
+async def generate_ats_batch(resume_data: Dict, job_descriptions: List[JobDescription], top_k: int = ATS_BATCH_TOP_K, force_refresh: bool = False):
+    """Rank many job descriptions against one resume and optimize it for the best matches.
+
+    Streams Server-Sent Events: ``ranking`` with every posting's local score,
+    then a ``result`` (or ``error``) per optimized posting as it finishes, then ``done``.
+    """
+    if not job_descriptions or len(job_descriptions) > ATS_BATCH_MAX_JOBS:
+        raise HTTPException(status_code=400, detail=f"Provide between 1 and {ATS_BATCH_MAX_JOBS} job descriptions")
+    if not 0 <= top_k <= ATS_BATCH_TOP_K_MAX:
+        raise HTTPException(status_code=400, detail=f"top_k must be between 0 and {ATS_BATCH_TOP_K_MAX}")
+    
+    async def events():
+        try:
+            async for event, data in resume_processor.match_jobs(
+                resume_data, [job.description for job in job_descriptions], top_k, force_refresh
+            ):
+                if event == "ranking":
+                    yield sse_event("ranking", {"status": "success", "data": data})
+                elif event == "result":
+                    yield sse_event("result", {"status": "success", "index": data[0], "data": data[1]})
+                else:
+                    yield sse_event("error", {"index": data[0], "detail": data[1]})
+            yield sse_event("done", {"status": "success"})
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+    
+    return sse_response(events())
+
 @app.post("/api/resume/generate-cover-letter", tags=["Resume Processing"])
-async def generate_cover_letter(resume_data: Dict, job_description: JobDescription):
+async def generate_cover_letter(resume_data: Dict, job_description: JobDescription, force_refresh: bool = False):
     try:
-        cover_letter = await resume_processor.generate_cover_letter(resume_data, job_description.description)
+        cover_letter = await resume_processor.generate_cover_letter(resume_data, job_description.description, force_refresh)
         return {"status": "success", "data": cover_letter}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/resume/latest", tags=["Resume Processing"])
-async def get_latest_resume():
-    try:
-        # Fetch the most recent resume from the database
-        result = supabase.table("resumes").select("*").order('created_at', desc=True).limit(1).execute()
-        
-        if not result.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No resumes found in the database"
+@app.post("/api/resume/generate-cover-letter/stream", tags=["Resume Processing"])
+async def stream_cover_letter(resume_data: Dict, job_description: JobDescription, force_refresh: bool = False):
+    """Stream cover letter generation as Server-Sent Events (``token`` events, then ``done``)."""
+    async def events():
+        try:
+            async for event, data in resume_processor.stream_cover_letter(resume_data, job_description.description, force_refresh):
+                yield sse_event(event, {"text": data} if event == "token" else {"status": "success", "data": data})
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+    
+    return sse_response(events())
+
+@app.get("/api/resume/search", tags=["Resume Processing"])
+async def search_resumes(
+    q: str = Query("", description="Free-text query over skills, job titles and companies"),
+    skills: Optional[List[str]] = Query(None, description="Skills every result must have"),
+    title: str = Query("", description="Job title every result must have held"),
+    company: str = Query("", description="Company every result must have worked at"),
+    location: str = Query("", description="Substring of the candidate's location"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0)
+):
+    """Search processed resumes with the in-process index."""
+    def search():
+        # Pick up resumes indexed by the other server workers; reading their appends is file I/O
+        deps.search_index.refresh()
+        return deps.search_index.search(q, skills or (), title, company, location, limit, offset)
+
+    results = await asyncio.to_thread(search)
+    return {"status": "success", "data": results}
+
+def resume_etag(row: Dict, fields: List[str], include_file: bool) -> str:
+    return make_etag(row["id"], row.get("updated_at"), fields, include_file)
+
+async def resume_response(request: Request, resume_id: Optional[str], fields: List[str], include_file: bool) -> Response:
+    """A single resume (the latest when ``resume_id`` is None), honouring ``If-None-Match``."""
+    def scoped(columns: List[str]):
+        query = deps.supabase.table("resumes").select(",".join(columns))
+        if resume_id:
+            return query.eq("id", resume_id).limit(1)
+        return query.order("created_at", desc=True).order("id", desc=True).limit(1)
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # Check the version first so an unchanged resume costs a tiny query and no payload
+        with stage_timer("db.resumes"):
+            probe = await asyncio.to_thread(lambda: scoped(["id", "updated_at"]).execute())
+        if probe.data:
+            etag = resume_etag(probe.data[0], fields, include_file)
+            if etag_matches(if_none_match, etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    columns = sorted(set(fields) | {"id", "updated_at"} | ({"storage_path"} if include_file else set()))
+    with stage_timer("db.resumes"):
+        result = await asyncio.to_thread(lambda: scoped(columns).execute())
+    if not result.data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Resume not found" if resume_id else "No resumes found in the database"
+        )
+    
+    row = result.data[0]
+    data = {field: row.get(field) for field in fields}
+    if include_file:
+        if row.get("storage_path"):
+            with stage_timer("object_store_get"):
+                content = await deps.resume_store.get(row["storage_path"])
+        else:
+            # Rows written before object storage keep the file base64-encoded in the row
+            legacy = await asyncio.to_thread(
+                lambda: deps.supabase.table("resumes").select("file_content").eq("id", row["id"]).execute()
             )
-            
-        resume = result.data[0]
-        return {
+            content = base64.b64decode(legacy.data[0]["file_content"]) if legacy.data and legacy.data[0].get("file_content") else None
+        data["file_content"] = base64.b64encode(content).decode("ascii") if content else None
+    
+    return JSONResponse({"status": "success", "data": data}, headers={"ETag": resume_etag(row, fields, include_file)})
+
+@app.get("/api/resume/history", tags=["Resume Processing"])
+async def list_resumes(
+    request: Request,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description=f"Comma-separated columns from: {', '.join(RESUME_FIELDS)}")
+):
+    """List resumes newest first with keyset pagination."""
+    try:
+        columns = parse_fields(fields, RESUME_FIELDS, RESUME_LIST_FIELDS)
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    try:
+        query = (
+            deps.supabase.table("resumes")
+            .select(",".join(sorted(set(columns) | {"id", "created_at", "updated_at"})))
+            .order("created_at", desc=True)
+            .order("id", desc=True)
+            .limit(limit + 1)
+        )
+        if after:
+            query = query.or_(keyset_filter(*after))
+        with stage_timer("db.resumes"):
+            result = await asyncio.to_thread(query.execute)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error listing resumes: {str(e)}"
+        )
+    
+    rows = result.data[:limit]
+    next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"]) if len(result.data) > limit else None
+    etag = make_etag(columns, cursor, limit, [(row["id"], row.get("updated_at")) for row in rows])
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return JSONResponse(
+        {
             "status": "success",
             "data": {
-                "file_name": resume["file_name"],
-                "extracted_data": resume["extracted_data"],
-                "created_at": resume["created_at"]
+                "items": [{field: row.get(field) for field in columns} for row in rows],
+                "next_cursor": next_cursor,
+                "limit": limit
             }
-        }
+        },
+        headers={"ETag": etag}
+    )
+
+@app.get("/api/resume/analysis/{resume_id}", tags=["Resume Processing"])
+async def get_resume(
+    resume_id: str,
+    request: Request,
+    fields: Optional[str] = Query(None, description=f"Comma-separated columns from: {', '.join(RESUME_FIELDS)}"),
+    include_file: bool = Query(False, description="Include the uploaded file, base64-encoded")
+):
+    try:
+        columns = parse_fields(fields, RESUME_FIELDS, RESUME_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    try:
+        return await resume_response(request, resume_id, columns, include_file)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching resume: {str(e)}"
+        )
+
+@app.get("/api/resume/latest", tags=["Resume Processing"])
+async def get_latest_resume(
+    request: Request,
+    fields: Optional[str] = Query(None, description=f"Comma-separated columns from: {', '.join(RESUME_FIELDS)}"),
+    include_file: bool = Query(False, description="Include the uploaded file, base64-encoded")
+):
+    try:
+        columns = parse_fields(fields, RESUME_FIELDS, RESUME_LATEST_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    try:
+        # Only the requested columns are selected; clients polling with If-None-Match get a 304
+        return await resume_response(request, None, columns, include_file)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error fetching resume: {str(e)}"
-        ) 
\ No newline at end of file
+        )
@@ -0,0 +1,138 @@
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+from prometheus_client.core import GaugeMetricFamily
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+# Gauges are summed over the live worker processes when there are several
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being handled", multiprocess_mode="livesum")
+STAGE_DURATION = Histogram("stage_duration_seconds", "Time spent in each processing stage", ["stage"], buckets=LATENCY_BUCKETS)
+LLM_DURATION = Histogram(
+    "llm_request_duration_seconds", "LLM call latency per model attempt", ["endpoint", "model", "outcome"],
+    buckets=LATENCY_BUCKETS
+)
+LLM_TOKENS = Counter("llm_tokens_total", "Tokens used by LLM calls", ["endpoint", "model", "kind"])
+LLM_IN_FLIGHT = Gauge("llm_requests_in_flight", "LLM calls in progress", ["endpoint"], multiprocess_mode="livesum")
+DB_WRITE_DURATION = Histogram(
+    "db_write_duration_seconds", "Supabase insert latency per batch", ["table", "outcome"], buckets=LATENCY_BUCKETS
+)
+DB_ROWS_WRITTEN = Counter("db_rows_written_total", "Rows inserted into Supabase", ["table"])
+EXTRACTION_RESPONSES = Counter("extraction_responses_total", "Resume extraction responses by outcome", ["outcome"])
+EXTRACTION_REPAIRS = Counter(
+    "extraction_repaired_sections_total", "Extraction sections repaired locally, re-asked or left empty", ["method"]
+)
+EXTRACTION_TOKENS_SAVED = Counter(
+    "extraction_repair_tokens_saved_total", "Estimated tokens saved by targeted repair compared with a full retry"
+)
+
+# Stages timed during the current request, for its Server-Timing header
+_request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """Time a block into ``stage_duration_seconds`` and the current request's Server-Timing."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_DURATION.labels(stage).observe(elapsed)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((stage, elapsed))
+
+
+class StatsCollector:
+    """Exposes values computed at scrape time, e.g. cache hit ratios, as gauges."""
+
+    def __init__(self):
+        self.sources: List[Tuple[str, str, Sequence[str], Callable[[], Dict[Tuple[str, ...], float]]]] = []
+
+    def register(self, name: str, documentation: str, labels: Sequence[str],
+                 values: Callable[[], Dict[Tuple[str, ...], float]]) -> None:
+        """``values`` returns the gauge's current value for each tuple of label values."""
+        self.sources.append((name, documentation, labels, values))
+
+    def collect(self):
+        for name, documentation, labels, values in self.sources:
+            family = GaugeMetricFamily(name, documentation, labels=list(labels))
+            for label_values, value in values().items():
+                family.add_metric(list(label_values), value)
+            yield family
+
+
+STATS = StatsCollector()
+REGISTRY.register(STATS)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """The metrics of every worker process when PROMETHEUS_MULTIPROC_DIR is set, else of this one.
+
+    The scrape-time gauges in :data:`STATS` are always those of the worker
+    that answers.
+    """
+    if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(STATS)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def worker_stopped() -> None:
+    """Drop this process's live gauges from the multi-process metrics on shutdown."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class MetricsMiddleware:
+    """Record per-route request latency and add a ``Server-Timing`` header.
+
+    The header lists every :func:`stage_timer` block that finished before
+    the response started, plus ``app`` for the time until then. Routes are
+    labelled by their path template, so IDs do not create new series.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: List[Tuple[str, float]] = []
+        token = _request_timings.set(timings)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                entries = [f"{stage};dur={elapsed * 1000:.1f}" for stage, elapsed in timings]
+                entries.append(f"app;dur={(time.perf_counter() - start) * 1000:.1f}")
+                MutableHeaders(scope=message).append("Server-Timing", ", ".join(entries))
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_DURATION.labels(scope["method"], route, str(status_code)).observe(time.perf_counter() - start)
+            _request_timings.reset(token)
@@ -0,0 +1,56 @@
+import base64
+import binascii
+import hashlib
+import json
+import uuid
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+
+def encode_cursor(created_at: str, row_id: str) -> str:
+    """Opaque cursor for the position after the row with this ``created_at``/``id``."""
+    raw = json.dumps([created_at, row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """The ``created_at``/``id`` position in a cursor, as an ISO timestamp and a UUID.
+
+    The values end up inside a PostgREST filter, so anything else is
+    rejected with ``ValueError`` rather than passed through.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at).isoformat(), str(uuid.UUID(row_id))
+    except (binascii.Error, ValueError, TypeError, AttributeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def keyset_filter(created_at: str, row_id: str) -> str:
+    """PostgREST ``or`` filter for rows after the cursor in ``created_at desc, id desc`` order."""
+    return f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt."{row_id}")'
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str], default: Sequence[str]) -> List[str]:
+    """Columns requested as a comma-separated ``fields`` parameter, limited to ``allowed``."""
+    if not fields:
+        return list(default)
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return requested
+
+
+def make_etag(*parts: Any) -> str:
+    digest = hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8"))
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an ``If-None-Match`` header matches ``etag`` (weak comparison)."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in (candidate.removeprefix("W/") for candidate in candidates)
@@ -0,0 +1,142 @@
+import asyncio
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from metrics import DB_ROWS_WRITTEN, DB_WRITE_DURATION
+
+
+def rejected(error: Exception) -> bool:
+    """Whether the database refused the rows themselves, so retrying cannot help.
+
+    PostgREST answers invalid data (SQLSTATE class 22), constraint
+    violations (23), unknown columns or missing privileges (42) and
+    malformed requests (PGRST1xx/PGRST2xx) with a 4xx; without a JSON body
+    the client reports the bare HTTP status instead.
+    """
+    code = str(getattr(error, "code", None) or "")
+    if code.isdigit() and len(code) == 3:
+        return code.startswith("4")
+    return code[:2] in ("22", "23", "42") or code.startswith(("PGRST1", "PGRST2"))
+
+
+class WriteBehindQueue:
+    """Write-behind persistence for Supabase inserts.
+
+    Request handlers enqueue rows and return immediately; background workers
+    drain the queue, batch rows per table and insert them off the event loop.
+    The queue is bounded so a slow or unavailable database applies
+    backpressure instead of growing memory without limit. Failed batches are
+    retried with jittered exponential backoff and pending rows are flushed
+    on shutdown. A batch the database rejects (a 4xx) is not retried but
+    split in halves, so only the offending rows are dropped, not the other
+    requests' rows that happened to share the batch.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        max_pending: int = int(os.getenv("PERSIST_MAX_PENDING", "1000")),
+        batch_size: int = int(os.getenv("PERSIST_BATCH_SIZE", "50")),
+        workers: int = int(os.getenv("PERSIST_WORKERS", "2")),
+        max_retries: int = int(os.getenv("PERSIST_MAX_RETRIES", "5")),
+        backoff: float = float(os.getenv("PERSIST_BACKOFF_SECONDS", "0.5")),
+    ):
+        self.client = client
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.stats = {"enqueued": 0, "written": 0, "failed": 0, "rejected": 0, "retries": 0, "batches": 0}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def put(self, table: str, row: Dict[str, Any]) -> None:
+        """Queue ``row`` for insertion into ``table``; waits only when the queue is full."""
+        if self._queue is None:
+            self.start()
+        await self._queue.put((table, row))
+        self.stats["enqueued"] += 1
+
+    async def flush(self) -> None:
+        """Wait until every queued row has been written or given up on."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Flush pending rows and stop the workers."""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self.flush(), timeout)
+        except asyncio.TimeoutError:
+            print(f"Warning: Dropping {self.pending} pending database writes on shutdown")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    async def _worker(self) -> None:
+        while True:
+            items = [await self._queue.get()]
+            while len(items) < self.batch_size and not self._queue.empty():
+                items.append(self._queue.get_nowait())
+            try:
+                for (table, _), rows in self._group(items).items():
+                    await self._insert(table, rows)
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+
+    @staticmethod
+    def _group(items: List[Tuple[str, Dict[str, Any]]]) -> Dict[Tuple[str, tuple], List[Dict[str, Any]]]:
+        # PostgREST bulk inserts expect every row in a batch to share the same columns
+        batches: Dict[Tuple[str, tuple], List[Dict[str, Any]]] = {}
+        for table, row in items:
+            batches.setdefault((table, tuple(sorted(row))), []).append(row)
+        return batches
+
+    async def _insert(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                await asyncio.to_thread(lambda: self.client.table(table).insert(rows).execute())
+                DB_WRITE_DURATION.labels(table, "ok").observe(time.perf_counter() - start)
+                DB_ROWS_WRITTEN.labels(table).inc(len(rows))
+                self.stats["written"] += len(rows)
+                self.stats["batches"] += 1
+                return
+            except Exception as e:
+                DB_WRITE_DURATION.labels(table, "error").observe(time.perf_counter() - start)
+                if rejected(e):
+                    await self._split(table, rows, e)
+                    return
+                if attempt == self.max_retries:
+                    self.stats["failed"] += len(rows)
+                    print(f"Warning: Failed to store {len(rows)} rows in {table}: {str(e)}")
+                    return
+                self.stats["retries"] += 1
+                await asyncio.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    async def _split(self, table: str, rows: List[Dict[str, Any]], error: Exception) -> None:
+        """Insert the halves of a rejected batch separately until the bad rows are isolated."""
+        if len(rows) == 1:
+            self.stats["rejected"] += 1
+            print(f"Warning: Dropping a row the database rejected in {table}: {str(error)}")
+            return
+        middle = len(rows) // 2
+        await self._insert(table, rows[:middle])
+        await self._insert(table, rows[middle:])
@@ -0,0 +1,161 @@
+import re
+from typing import Dict, List, Optional
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+# Years such as "2019 - 2021" or "2018/2020", which would otherwise pass for a phone number
+_YEAR_SEQUENCE = r"(?:19|20)\d{2}(?:\s*[-./]?\s*(?:19|20)\d{2})+(?![\d])"
+# After an area code in parentheses, as in "(555) 123-4567", the rest of the number is shorter
+PHONE_RE = re.compile(
+    r"(?<![\w/])(?!" + _YEAR_SEQUENCE + r")(?:\(?\+?\d{1,3}\)?[\s.-]?)?"
+    r"(?:\(\d{2,5}\)[\s.-]?\d[\d\s.-]{4,12}\d|\d[\d\s.-]{7,14}\d)(?![\w/])"
+)
+LINKEDIN_RE = re.compile(r"(?:https?://)?(?:[a-z]{2,3}\.)?linkedin\.com/in/[\w%-]+/?", re.IGNORECASE)
+GITHUB_RE = re.compile(r"(?:https?://)?(?:www\.)?github\.com/[\w-]+/?", re.IGNORECASE)
+URL_RE = re.compile(r"(?:https?://|www\.)[\w-]+(?:\.[\w-]+)+(?:/[\w\-./?=&%#~]*)?", re.IGNORECASE)
+
+# Non-empty lines at the top of a resume that may hold the name and contact details
+CONTACT_BLOCK_LINES = 5
+
+# Canonical section name -> header spellings seen in resumes
+SECTION_HEADERS = {
+    "summary": ["summary", "professional summary", "profile", "professional profile", "objective",
+                "career objective", "about me"],
+    "workExperience": ["experience", "work experience", "professional experience", "employment history",
+                       "work history", "employment", "career history"],
+    "education": ["education", "academic background", "academic qualifications", "qualifications"],
+    "skills": ["skills", "technical skills", "key skills", "core competencies", "skills & tools",
+               "technologies", "tech stack"],
+    "projects": ["projects", "personal projects", "key projects", "academic projects"],
+    "certifications": ["certifications", "certificates", "licenses & certifications", "licenses and certifications"],
+    "achievements": ["achievements", "awards", "honors", "honors & awards", "accomplishments"],
+    "languages": ["languages"],
+}
+_HEADER_LOOKUP = {alias: name for name, aliases in SECTION_HEADERS.items() for alias in aliases}
+_SKILL_SPLIT_RE = re.compile(r"[,|•·;\n]|\s{2,}")
+_WORD_RE = re.compile(r"[\w+#./-]+")
+# Runs of separators left behind once contact details are removed from a header line
+_SEPARATORS_RE = re.compile(r"(?:\s*[|•·,;]\s*){2,}|(?:\s*[|•·]\s*)+")
+
+
+def _section_name(line: str) -> Optional[str]:
+    candidate = line.strip().strip(":").strip().lower()
+    if not candidate or len(candidate) > 40:
+        return None
+    return _HEADER_LOOKUP.get(candidate)
+
+
+def split_sections(text: str) -> Dict[str, str]:
+    """Split resume text on recognised section headers; text before the first header is "header"."""
+    sections = {"header": []}
+    current = "header"
+    for line in text.splitlines():
+        name = _section_name(line)
+        if name:
+            current = name
+            sections.setdefault(current, [])
+        else:
+            sections[current].append(line)
+    return {name: "\n".join(lines).strip() for name, lines in sections.items()}
+
+
+def _first(pattern: re.Pattern, text: str) -> str:
+    match = pattern.search(text)
+    return match.group(0).strip() if match else ""
+
+
+def _guess_name(header: str) -> str:
+    for line in header.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        words = line.split()
+        if 2 <= len(words) <= 5 and all(re.fullmatch(r"[A-Za-z][A-Za-z.'-]*", word) for word in words):
+            return line
+        return ""
+    return ""
+
+
+def extract_personal_info(text: str, header: str) -> Dict[str, object]:
+    linkedin = _first(LINKEDIN_RE, text)
+    github = _first(GITHUB_RE, text)
+    emails = set(EMAIL_RE.findall(text))
+    urls = [
+        url for url in URL_RE.findall(text)
+        if "linkedin.com" not in url.lower() and "github.com" not in url.lower()
+        and not any(url in email for email in emails)
+    ]
+    return {
+        "name": _guess_name(header or text),
+        "email": _first(EMAIL_RE, text),
+        "phone": _first(PHONE_RE, header or text),
+        "location": "",
+        "linkedin": linkedin,
+        "portfolio": urls[0] if urls else "",
+        "github": github,
+        "other_profiles": urls[1:],
+    }
+
+
+def split_skills(section: str) -> List[str]:
+    skills = []
+    for item in _SKILL_SPLIT_RE.split(section):
+        # Drop "Languages:"-style labels in front of a skill list
+        item = item.split(":")[-1].strip(" -–*\t")
+        if item and len(item.split()) <= 3 and item.lower() not in (s.lower() for s in skills):
+            skills.append(item)
+    return skills
+
+
+def keyword_density(text: str, keywords: List[str]) -> Dict[str, float]:
+    """Occurrences of each keyword as a percentage of all words in ``text``."""
+    words = len(_WORD_RE.findall(text)) or 1
+    lowered = text.lower()
+    density = {}
+    for keyword in keywords:
+        count = len(re.findall(rf"(?<![\w]){re.escape(keyword.lower())}(?![\w])", lowered))
+        if count:
+            density[keyword] = round(count / words * 100, 2)
+    return density
+
+
+def preparse_resume(text: str) -> Dict[str, object]:
+    """Deterministically extract the trivially parseable parts of a resume.
+
+    Returns personalInfo, the text of each recognised section, keyword
+    density for the listed skills, and ``body``: the resume text without the
+    name and contact details, for the LLM to analyse. Whatever else the
+    header says (a location, an unlabelled summary) stays in it.
+    """
+    sections = split_sections(text)
+    header = sections.get("header", "")
+    personal_info = extract_personal_info(text, header)
+    skills = split_skills(sections.get("skills", ""))
+
+    # Strip contact details from the top lines only; the rest, e.g. "Pune, India", stays.
+    # Without recognised section headers the whole resume is "header", dates and all.
+    contact = (EMAIL_RE, LINKEDIN_RE, GITHUB_RE, URL_RE, PHONE_RE)
+    intro_lines = []
+    top = CONTACT_BLOCK_LINES
+    for line in header.splitlines():
+        if not line.strip():
+            continue
+        if top > 0:
+            top -= 1
+            if line.strip() == personal_info["name"]:
+                continue
+            for pattern in contact:
+                line = pattern.sub("", line)
+            line = _SEPARATORS_RE.sub(" | ", line).strip(" |")
+        if line:
+            intro_lines.append(line)
+    intro = "\n".join(intro_lines)
+    parts = [intro] if intro else []
+    parts += [f"{name.upper()}\n{content}" for name, content in sections.items() if name != "header" and content]
+    body = "\n\n".join(parts)
+    return {
+        "personalInfo": personal_info,
+        "sections": sections,
+        "keyword_density": keyword_density(text, skills),
+        # Without recognisable headers, fall back to the full text
+        "body": body or text,
+    }
@@ -0,0 +1,162 @@
+import json
+import os
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+
+from llm import parse_limits
+
+DEFAULT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "3000"))
+# Per-generator overrides, e.g. "portfolio=4000,cover_letter=2000"
+TOKEN_BUDGETS = parse_limits(os.getenv("PROMPT_TOKEN_BUDGETS"))
+
+# Fields of resume_data each generator uses. True keeps the whole value, a dict
+# projects nested objects (applied to every item of a list).
+PROJECTIONS: Dict[str, Dict[str, Any]] = {
+    "portfolio": {
+        "personalInfo": True,
+        "summary": {"professional_summary": True, "key_achievements": True, "core_competencies": True},
+        "workExperience": {"company": True, "position": True, "duration": True, "location": True,
+                           "achievements": True, "responsibilities": True, "technologies_used": True},
+        "projects": {"name": True, "description": True, "technologies": True, "url": True, "impact": True},
+        "skills": {"technical": True, "soft": True, "tools": True, "certifications": True},
+        "education": {"degree": True, "institution": True, "year": True},
+    },
+    "ats_resume": {
+        "personalInfo": {"name": True, "email": True, "phone": True, "location": True, "linkedin": True},
+        "summary": {"professional_summary": True, "key_achievements": True, "core_competencies": True},
+        "workExperience": {"company": True, "position": True, "duration": True, "achievements": True,
+                           "responsibilities": True, "technologies_used": True, "quantifiable_results": True},
+        "skills": True,
+        "education": {"degree": True, "institution": True, "year": True, "gpa": True, "honors": True},
+        "projects": {"name": True, "description": True, "technologies": True, "achievements": True},
+        "ats_optimization": {"keywords": True},
+    },
+    "cover_letter": {
+        "personalInfo": {"name": True, "email": True, "phone": True, "location": True},
+        "summary": {"professional_summary": True, "key_achievements": True, "value_proposition": True},
+        "workExperience": {"company": True, "position": True, "duration": True, "achievements": True,
+                           "responsibilities": True, "quantifiable_results": True},
+        "skills": {"technical": True, "soft": True},
+        "projects": {"name": True, "description": True, "impact": True},
+        "career_analysis": {"industry_expertise": True, "leadership_qualities": True},
+    },
+}
+
+# Sections in the order they are truncated when over budget (first goes first)
+TRUNCATION_ORDER = [
+    "career_analysis", "ats_optimization", "projects", "education",
+    "skills", "workExperience", "summary", "personalInfo",
+]
+
+
+@lru_cache(maxsize=None)
+def _encoding() -> Any:
+    """tiktoken's cl100k_base encoding, loaded on first use; None when it is unavailable."""
+    try:
+        import tiktoken
+
+        # May download the encoding on first use, so it is not loaded at import time
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:  # tiktoken is optional
+        print(f"Warning: Estimating token counts, tiktoken is unavailable: {str(e)}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken when installed, else estimate ~4 characters per token."""
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def prune(value: Any) -> Any:
+    """Recursively drop empty strings, lists, dicts and None values."""
+    if isinstance(value, dict):
+        pruned = {key: prune(item) for key, item in value.items()}
+        return {key: item for key, item in pruned.items() if item not in (None, "", [], {})}
+    if isinstance(value, list):
+        pruned = [prune(item) for item in value]
+        return [item for item in pruned if item not in (None, "", [], {})]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def project(value: Any, spec: Any) -> Any:
+    if spec is True or value is None:
+        return value
+    if isinstance(value, list):
+        return [project(item, spec) for item in value]
+    if isinstance(value, dict):
+        return {key: project(value[key], sub) for key, sub in spec.items() if key in value}
+    return value
+
+
+def dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def _shrink(value: Any) -> bool:
+    """Drop the last list item found inside ``value``, keeping at least one item per list."""
+    if isinstance(value, list):
+        if len(value) > 1:
+            value.pop()
+            return True
+        return bool(value) and _shrink(value[0])
+    if isinstance(value, dict):
+        return any(_shrink(item) for item in reversed(list(value.values())))
+    return False
+
+
+def _truncate_once(data: Dict[str, Any]) -> bool:
+    """Remove the lowest-priority item; returns False when nothing is left to remove."""
+    sections = [key for key in data if key not in TRUNCATION_ORDER] + TRUNCATION_ORDER
+    for section in sections:
+        if section in data and _shrink(data[section]):
+            return True
+    # Lists are down to one item each; drop whole sections next
+    for section in sections:
+        if section in data and section != "personalInfo":
+            del data[section]
+            return True
+    return False
+
+
+def serialize_resume(resume_data: Dict[str, Any], purpose: str) -> Tuple[str, Dict[str, int]]:
+    """Serialize the fields of ``resume_data`` that ``purpose`` needs within its token budget.
+
+    Returns the compact JSON and token counts for the previous pretty-printed
+    full serialization and for the result.
+    """
+    budget = TOKEN_BUDGETS.get(purpose, DEFAULT_TOKEN_BUDGET)
+    data = prune(project(resume_data, PROJECTIONS.get(purpose, True)))
+    text = dumps(data)
+    tokens = count_tokens(text)
+    while tokens > budget and _truncate_once(data):
+        text = dumps(data)
+        tokens = count_tokens(text)
+    return text, {
+        "tokens_before": count_tokens(json.dumps(resume_data, indent=2)),
+        "tokens_after": tokens,
+        "budget": budget,
+    }
+
+
+class PromptStats:
+    """Running totals of resume prompt tokens before and after compaction."""
+
+    def __init__(self):
+        self.totals: Dict[str, Dict[str, int]] = {}
+
+    def record(self, purpose: str, stats: Dict[str, int]) -> None:
+        totals = self.totals.setdefault(purpose, {"prompts": 0, "tokens_before": 0, "tokens_after": 0})
+        totals["prompts"] += 1
+        totals["tokens_before"] += stats["tokens_before"]
+        totals["tokens_after"] += stats["tokens_after"]
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            purpose: {**totals, "saved_ratio": 1 - totals["tokens_after"] / totals["tokens_before"] if totals["tokens_before"] else 0.0}
+            for purpose, totals in self.totals.items()
+        }
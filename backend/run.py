@@ -1,10 +1,82 @@
+"""Start the backend under uvicorn.
+
+    python run.py                       # development: one process, reloads on code changes
+    python run.py --production          # or SERVER_MODE=production
+
+Production mode runs WEB_CONCURRENCY worker processes (default: one per
+CPU), with uvloop and httptools when they are installed (SERVER_LOOP,
+SERVER_HTTP), keep-alive and listen backlog from SERVER_KEEPALIVE_SECONDS
+and SERVER_BACKLOG. On SIGTERM every worker stops accepting connections,
+waits up to SHUTDOWN_DRAIN_SECONDS for in-flight requests, LLM calls
+included, then gives its background jobs and pending Supabase writes the
+same time to finish. Each worker's PDF parser pool gets an equal share
+of the CPUs unless PDF_WORKERS is set.
+
+State that has to agree across workers is kept in files under
+SERVER_STATE_DIR (a new temporary directory by default): the admission
+token buckets, the job store and the Prometheus metrics. The search index
+log is already a shared file. Caches, generation memoization and the
+LinkedIn profile memo stay per worker by design; a miss only costs a
+repeated call.
+"""
+import argparse
+import glob
+import os
+import tempfile
+
 import uvicorn
+from dotenv import load_dotenv
 
-if __name__ == "__main__":
+
+def share_state(workers: int) -> None:
+    """Point the stores that would otherwise be per process at files every worker uses."""
+    if workers < 2:
+        return
+    state_dir = os.getenv("SERVER_STATE_DIR") or tempfile.mkdtemp(prefix="career-launch-")
+    metrics_dir = os.path.join(state_dir, "metrics")
+    os.makedirs(metrics_dir, exist_ok=True)
+    # Bucket levels and live gauges of a previous run are meaningless now
+    stale = [os.path.join(state_dir, "admission.db")] + glob.glob(os.path.join(metrics_dir, "*.db"))
+    for path in stale:
+        if os.path.exists(path):
+            os.remove(path)
+    os.environ.setdefault("ADMISSION_STORE_PATH", os.path.join(state_dir, "admission.db"))
+    os.environ.setdefault("JOB_STORE_PATH", os.path.join(state_dir, "jobs.db"))
+    # Read by prometheus_client when the workers import it
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", metrics_dir)
+
+
+def main() -> None:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--production", action="store_true", default=os.getenv("SERVER_MODE") == "production")
+    parser.add_argument("--host", default=os.getenv("SERVER_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("SERVER_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))))
+    args = parser.parse_args()
+
+    if not args.production:
+        uvicorn.run("main:app", host=args.host, port=args.port, reload=True, log_level="info")
+        return
+
+    share_state(args.workers)
+    # Every worker starts its own parser pool; one per CPU each would oversubscribe the host
+    os.environ.setdefault("PDF_WORKERS", str(max(1, (os.cpu_count() or 1) // args.workers)))
     uvicorn.run(
         "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    ) 
\ No newline at end of file
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        # "auto" picks uvloop and httptools when installed
+        loop=os.getenv("SERVER_LOOP", "auto"),
+        http=os.getenv("SERVER_HTTP", "auto"),
+        # Longer than a load balancer's idle timeout, so it closes idle connections first
+        timeout_keep_alive=int(os.getenv("SERVER_KEEPALIVE_SECONDS", "75")),
+        backlog=int(os.getenv("SERVER_BACKLOG", "2048")),
+        timeout_graceful_shutdown=float(os.getenv("SHUTDOWN_DRAIN_SECONDS", "20")),
+        log_level="info",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+import functools
+import heapq
+import json
+import math
+import os
+import tempfile
+import threading
+import zlib
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single process owns the log
+    fcntl = None
+
+import numpy as np
+
+from ats import normalize, resume_terms, tokenize
+
+# Relevance of a query term found in each indexed field
+FIELD_WEIGHTS = {"skills": 1.0, "titles": 1.5, "companies": 1.0}
+# Weight of the embedding cosine similarity relative to the term scores
+EMBEDDING_WEIGHT = 2.0
+
+
+def resume_document(resume_id: str, resume_data: Dict[str, Any], created_at: str) -> Dict[str, Any]:
+    """The searchable summary of an extracted resume that the index stores."""
+    info = resume_data.get("personalInfo") or {}
+    jobs = [job for job in resume_data.get("workExperience") or [] if isinstance(job, dict)]
+    return {
+        "resume_id": resume_id,
+        "name": info.get("name") or "",
+        "location": info.get("location") or "",
+        "titles": [job["position"] for job in jobs if job.get("position")],
+        "companies": [job["company"] for job in jobs if job.get("company")],
+        "skills": sorted(term for term in resume_terms(resume_data) if term),
+        "created_at": created_at,
+    }
+
+
+def _synchronized(method):
+    """Run ``method`` holding the index's lock, as log replay runs in worker threads."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._mutex:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _query_terms(text: str) -> List[str]:
+    return tokenize(text) or ([normalize(text)] if text.strip() else [])
+
+
+class ResumeIndex:
+    """In-process search index over extracted resumes.
+
+    Skills, job titles and companies go into an inverted index of canonical
+    terms (the same synonyms as the ATS scorer). With ``embedding_dim`` set,
+    each resume also gets a hashed bag-of-terms vector in a NumPy matrix,
+    used to rank matches by cosine similarity to the query.
+
+    Every added resume is appended to a JSON-lines file at ``path``, which is
+    replayed on startup. Server workers share the file: :meth:`refresh`
+    indexes what the other processes appended since it was last read.
+    Appends take a shared lock on ``<path>.lock`` and compaction an
+    exclusive one, so no process appends to a log that is being replaced.
+
+    Replaying the log reads and parses files, so the server calls the
+    constructor, :meth:`refresh` and :meth:`add` off the event loop; the
+    public methods hold a lock so those threads never see a half-updated index.
+    """
+
+    def __init__(self, path: Optional[str] = None, embedding_dim: int = 256):
+        self.path = path
+        self.embedding_dim = embedding_dim
+        self._log = None
+        self._reader = None
+        self._mutex = threading.RLock()
+        self._reset()
+        if path and os.path.exists(path) and self._load() > 2 * len(self.rows):
+            self.compact()
+
+    def _reset(self) -> None:
+        self.documents: List[Optional[Dict[str, Any]]] = []
+        self.rows: Dict[str, int] = {}
+        self.postings: Dict[str, Dict[str, Set[int]]] = {field: defaultdict(set) for field in FIELD_WEIGHTS}
+        self.embeddings = np.zeros((0, self.embedding_dim), dtype=np.float32) if self.embedding_dim else None
+        # The log file indexed so far and how far it has been read. Kept open, so a
+        # new log written by a compaction cannot get the same inode number.
+        if self._reader is not None:
+            self._reader.close()
+        self._reader = None
+        self._offset = 0
+
+    @classmethod
+    def from_env(cls) -> "ResumeIndex":
+        path = os.getenv("SEARCH_INDEX_PATH", os.path.join(os.path.dirname(__file__), "search_index.jsonl"))
+        return cls(path or None, int(os.getenv("SEARCH_EMBEDDING_DIM", "256")))
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @staticmethod
+    def _fields(document: Dict[str, Any]) -> Dict[str, Set[str]]:
+        return {
+            "skills": set(document["skills"]),
+            "titles": {term for title in document["titles"] for term in _query_terms(title)},
+            "companies": {term for company in document["companies"] for term in _query_terms(company)},
+        }
+
+    def _embed(self, terms: Iterable[str]) -> np.ndarray:
+        vector = np.zeros(self.embedding_dim, dtype=np.float32)
+        for term in terms:
+            digest = zlib.crc32(term.encode("utf-8"))
+            vector[digest % self.embedding_dim] += 1.0 if digest & 0x80000000 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _insert(self, document: Dict[str, Any]) -> None:
+        old = self.rows.get(document["resume_id"])
+        if old is not None:
+            for field, terms in self._fields(self.documents[old]).items():
+                for term in terms:
+                    self.postings[field][term].discard(old)
+            self.documents[old] = None
+
+        row = len(self.documents)
+        self.documents.append(document)
+        self.rows[document["resume_id"]] = row
+        fields = self._fields(document)
+        for field, terms in fields.items():
+            for term in terms:
+                self.postings[field][term].add(row)
+
+        if self.embeddings is not None:
+            if row >= len(self.embeddings):
+                # Grow the matrix geometrically so appends stay amortized O(1)
+                grown = np.zeros((max(1024, 2 * len(self.embeddings)), self.embedding_dim), dtype=np.float32)
+                grown[:len(self.embeddings)] = self.embeddings
+                self.embeddings = grown
+            self.embeddings[row] = self._embed(set().union(*fields.values()))
+
+    def _load(self) -> int:
+        self._reader = open(self.path, "rb")
+        return self._read()
+
+    @contextmanager
+    def _locked(self, exclusive: bool) -> Iterator[None]:
+        """Hold the log's lock file; closing it releases the lock."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(f"{self.path}.lock", "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+
+    def _read(self) -> int:
+        """Index the complete lines of the log after ``_offset``; returns how many there were."""
+        self._reader.seek(self._offset)
+        data = self._reader.read()
+        # A line still being written by another process is left for the next read
+        end = data.rfind(b"\n") + 1
+        self._offset += end
+        lines = 0
+        for line in data[:end].splitlines():
+            try:
+                document = json.loads(line)
+                row = self.rows.get(document["resume_id"])
+                # Lines this process appended itself are already indexed
+                if row is None or self.documents[row] != document:
+                    self._insert(document)
+                lines += 1
+            except (json.JSONDecodeError, KeyError):
+                # A partially written last line from a crash
+                continue
+        return lines
+
+    @_synchronized
+    def refresh(self) -> None:
+        """Index resumes that other processes appended to the log since it was last read."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        stat = os.stat(self.path)
+        if self._reader is None or self._replaced(self._reader) or stat.st_size < self._offset:
+            # Compacted (or replaced) by another process: rebuild from the new file
+            self.close()
+            self._reset()
+            self._load()
+        elif stat.st_size > self._offset:
+            self._read()
+
+    @_synchronized
+    def compact(self) -> None:
+        """Rewrite the log without replaced documents."""
+        if not self.path:
+            return
+        with self._locked(exclusive=True):
+            # Include what other processes appended, or a compaction they finished, before the lock
+            self.refresh()
+            self.close()
+            directory, name = os.path.split(os.path.abspath(self.path))
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix=f"{name}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    for document in self.documents:
+                        if document is not None:
+                            f.write(json.dumps(document, ensure_ascii=False) + "\n")
+                os.replace(tmp, self.path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            self._reader = open(self.path, "rb")
+            self._offset = os.fstat(self._reader.fileno()).st_size
+
+    @_synchronized
+    def add(self, resume_id: str, resume_data: Dict[str, Any], created_at: str) -> None:
+        document = resume_document(resume_id, resume_data, created_at)
+        self._insert(document)
+        if self.path:
+            with self._locked(exclusive=False):
+                if self._log is not None and self._replaced(self._log):
+                    # Another process compacted the log; append to the new file
+                    self._log.close()
+                    self._log = None
+                if self._log is None:
+                    self._log = open(self.path, "a", encoding="utf-8")
+                self._log.write(json.dumps(document, ensure_ascii=False) + "\n")
+                self._log.flush()
+
+    def _replaced(self, f) -> bool:
+        """Whether the open log ``f`` is no longer the file at ``path``."""
+        try:
+            return os.fstat(f.fileno()).st_ino != os.stat(self.path).st_ino
+        except FileNotFoundError:
+            return True
+
+    @_synchronized
+    def close(self) -> None:
+        for f in (self._log, self._reader):
+            if f is not None:
+                f.close()
+        self._log = self._reader = None
+
+    def _require(self, field: str, text: str, candidates: Optional[Set[int]]) -> Set[int]:
+        for term in _query_terms(text):
+            rows = self.postings[field].get(term, set())
+            candidates = set(rows) if candidates is None else candidates & rows
+        return candidates
+
+    @_synchronized
+    def search(self, query: str = "", skills: Iterable[str] = (), title: str = "", company: str = "",
+               location: str = "", limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """Resumes matching ``query``, best first, restricted by the filters.
+
+        Every skill and every term of ``title`` and ``company`` must match;
+        ``location`` is a case-insensitive substring match. Without a query,
+        matches are returned newest first.
+        """
+        candidates = None
+        for skill in skills:
+            candidates = self._require("skills", skill, candidates)
+        if title:
+            candidates = self._require("titles", title, candidates)
+        if company:
+            candidates = self._require("companies", company, candidates)
+        if location:
+            needle = location.casefold()
+            rows = candidates if candidates is not None else self.rows.values()
+            candidates = {row for row in rows if needle in self.documents[row]["location"].casefold()}
+
+        terms = set(_query_terms(query))
+        if terms:
+            scores = np.zeros(len(self.documents))
+            for term in terms:
+                for field, weight in FIELD_WEIGHTS.items():
+                    rows = self.postings[field].get(term)
+                    if rows:
+                        idf = math.log(1 + len(self.rows) / len(rows))
+                        scores[np.fromiter(rows, dtype=np.int64, count=len(rows))] += weight * idf
+            if candidates is not None:
+                keep = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+                filtered = np.zeros_like(scores)
+                filtered[keep] = scores[keep]
+                scores = filtered
+            matched = np.flatnonzero(scores)
+            if self.embeddings is not None and len(matched):
+                query_vector = self._embed(terms)
+                if len(matched) * 8 < len(self.documents):
+                    scores[matched] += EMBEDDING_WEIGHT * (self.embeddings[matched] @ query_vector)
+                else:
+                    # For broad matches a full matrix-vector product beats gathering the rows first
+                    similarity = self.embeddings[:len(self.documents)] @ query_vector
+                    scores[matched] += EMBEDDING_WEIGHT * similarity[matched]
+            top = matched
+            if len(matched) > offset + limit:
+                top = matched[np.argpartition(-scores[matched], offset + limit - 1)[:offset + limit]]
+            ranked = sorted(((int(row), float(scores[row])) for row in top), key=lambda item: (-item[1], -item[0]))
+            total = len(matched)
+        else:
+            rows = candidates if candidates is not None else self.rows.values()
+            ranked = [(row, None) for row in heapq.nlargest(offset + limit, rows)]
+            total = len(rows)
+        return {
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "results": [
+                {**self.documents[row], "score": round(score, 4) if score is not None else None}
+                for row, score in ranked[offset:offset + limit]
+            ],
+        }
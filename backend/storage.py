@@ -0,0 +1,62 @@
+import asyncio
+import os
+from typing import Any, Callable, Optional
+
+
+class LocalObjectStore:
+    """Stores uploaded files under a local directory."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        path = os.path.realpath(os.path.join(self.root, key))
+        if not path.startswith(os.path.realpath(self.root) + os.sep):
+            raise ValueError(f"Invalid object key: {key}")
+        return path
+
+    def _write(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def _read(self, key: str) -> bytes:
+        with open(self._path(key), "rb") as f:
+            return f.read()
+
+    async def put(self, key: str, data: bytes, content_type: Optional[str] = None) -> str:
+        await asyncio.to_thread(self._write, key, data)
+        return key
+
+    async def get(self, key: str) -> bytes:
+        return await asyncio.to_thread(self._read, key)
+
+
+class SupabaseObjectStore:
+    """Stores uploaded files in a Supabase Storage bucket."""
+
+    def __init__(self, client: Any, bucket: str):
+        self.client = client
+        self.bucket = bucket
+
+    async def put(self, key: str, data: bytes, content_type: Optional[str] = None) -> str:
+        options = {"content-type": content_type or "application/octet-stream", "upsert": "true"}
+        await asyncio.to_thread(lambda: self.client.storage.from_(self.bucket).upload(key, data, options))
+        return key
+
+    async def get(self, key: str) -> bytes:
+        return await asyncio.to_thread(lambda: self.client.storage.from_(self.bucket).download(key))
+
+
+def object_store_from_env(client: Callable[[], Any]):
+    """Build the resume file store selected by RESUME_STORAGE ("supabase" or "local").
+
+    ``client`` returns the Supabase client and is only called for the supabase backend.
+    """
+    backend = os.getenv("RESUME_STORAGE", "supabase")
+    if backend == "local":
+        return LocalObjectStore(os.getenv("RESUME_STORAGE_DIR", os.path.join(os.path.dirname(__file__), "uploads")))
+    if backend == "supabase":
+        return SupabaseObjectStore(client(), os.getenv("RESUME_STORAGE_BUCKET", "resumes"))
+    raise ValueError(f"Unknown RESUME_STORAGE backend: {backend}")
@@ -0,0 +1,39 @@
+import json
+from typing import Any, List
+
+from fastapi.responses import StreamingResponse
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Stop nginx-style proxies from buffering the stream
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format a single Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def sse_response(events) -> StreamingResponse:
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+class ParagraphSplitter:
+    """Incrementally split streamed text on blank lines.
+
+    Mirrors ``text.split("\\n\\n")`` but emits each paragraph as soon as the
+    separator following it has arrived.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        self._buffer += text
+        *complete, self._buffer = self._buffer.split("\n\n")
+        return complete
+
+    def close(self) -> List[str]:
+        remainder, self._buffer = self._buffer, ""
+        return [remainder] if remainder else []
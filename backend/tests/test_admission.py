@@ -0,0 +1,150 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from admission import (
+    ROUTE_OUTPUT_TOKENS, ROUTE_UPLOAD_PROMPT_TOKENS, AdmissionController, AdmissionMiddleware, FakeClock,
+    InMemoryBucketStore, RateLimited, SQLiteBucketStore, TokenBucket, estimate_tokens,
+)
+
+
+def bucket(clock: FakeClock, rate: float = 1.0, capacity: float = 5.0) -> TokenBucket:
+    return TokenBucket("test", rate, capacity, InMemoryBucketStore(), clock)
+
+
+def test_bucket_starts_full_and_refills_at_rate():
+    clock = FakeClock()
+    tokens = bucket(clock)
+    assert tokens.wait_time("a", 5) == 0
+    tokens.take("a", 5)
+    assert tokens.wait_time("a", 1) == pytest.approx(1.0)
+    clock.advance(2)
+    assert tokens.wait_time("a", 2) == 0
+    assert tokens.wait_time("a", 3) == pytest.approx(1.0)
+
+
+def test_bucket_refill_is_capped_at_capacity():
+    clock = FakeClock()
+    tokens = bucket(clock)
+    tokens.take("a", 5)
+    clock.advance(1000)
+    tokens.take("a", 5)
+    assert tokens.wait_time("a", 1) == pytest.approx(1.0)
+
+
+def test_bucket_keys_are_independent():
+    clock = FakeClock()
+    tokens = bucket(clock)
+    tokens.take("a", 5)
+    assert tokens.wait_time("a", 1) > 0
+    assert tokens.wait_time("b", 5) == 0
+
+
+def test_sqlite_store_is_shared_between_controllers(tmp_path):
+    clock = FakeClock()
+    path = str(tmp_path / "buckets.db")
+    first = AdmissionController(user_burst=1, max_wait=0, store=SQLiteBucketStore(path), clock=clock)
+    second = AdmissionController(user_burst=1, max_wait=0, store=SQLiteBucketStore(path), clock=clock)
+    asyncio.run(first.admit("alice", "10.0.0.1", 0))
+    with pytest.raises(RateLimited):
+        asyncio.run(second.admit("alice", "10.0.0.2", 0))
+
+
+def test_per_user_buckets_do_not_limit_other_users():
+    controller = AdmissionController(user_burst=2, max_wait=0, clock=FakeClock())
+
+    async def run():
+        for _ in range(2):
+            await controller.admit("alice", "10.0.0.1", 0)
+        with pytest.raises(RateLimited, match=r"\(user\)"):
+            await controller.admit("alice", "10.0.0.1", 0)
+        await controller.admit("bob", "10.0.0.2", 0)
+
+    asyncio.run(run())
+
+
+def test_global_token_budget_limits_every_user():
+    controller = AdmissionController(tokens_per_minute=6000, max_wait=0, clock=FakeClock())
+
+    async def run():
+        await controller.admit("alice", "10.0.0.1", 6000)
+        with pytest.raises(RateLimited, match=r"\(tpm\)") as rejected:
+            await controller.admit("bob", "10.0.0.2", 1000)
+        assert rejected.value.retry_after == pytest.approx(10.0)
+
+    asyncio.run(run())
+
+
+def test_request_waits_for_refill_within_max_wait():
+    clock = FakeClock()
+    controller = AdmissionController(user_per_minute=60, user_burst=1, max_wait=5, clock=clock)
+
+    async def run():
+        await controller.admit("alice", "10.0.0.1", 0)
+        await controller.admit("alice", "10.0.0.1", 0)
+
+    asyncio.run(run())
+    assert clock.now() == pytest.approx(1.0)
+    assert controller.stats == {"admitted": 2, "queued": 1, "rejected": 0}
+    assert controller.waiting == 0
+
+
+def test_estimate_uses_body_size_and_route_output():
+    assert estimate_tokens("/api/career-advice", {b"content-length": b"4000"}) == (
+        1000 + ROUTE_OUTPUT_TOKENS["/api/career-advice"]
+    )
+
+
+def test_estimate_ignores_upload_size():
+    path = "/api/resume/process"
+    expected = ROUTE_UPLOAD_PROMPT_TOKENS[path] + ROUTE_OUTPUT_TOKENS[path]
+    assert estimate_tokens(path, {b"content-length": str(1024 * 1024).encode()}) == expected
+
+
+@pytest.mark.parametrize("content_length", [b"abc", b"-5", b"1.5"])
+def test_estimate_rejects_malformed_content_length(content_length):
+    with pytest.raises(ValueError):
+        estimate_tokens("/api/career-advice", {b"content-length": content_length})
+
+
+def client(controller: AdmissionController) -> TestClient:
+    app = FastAPI()
+
+    @app.post("/api/career-advice")
+    async def advice():
+        return {"status": "success"}
+
+    app.add_middleware(AdmissionMiddleware, controller=controller)
+    return TestClient(app)
+
+
+def test_middleware_answers_429_with_retry_after():
+    http = client(AdmissionController(user_per_minute=6, user_burst=1, max_wait=0, clock=FakeClock()))
+    headers = {"X-User-Id": "alice"}
+    assert http.post("/api/career-advice", headers=headers).status_code == 200
+    response = http.post("/api/career-advice", headers=headers)
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "10"
+    assert http.post("/api/career-advice", headers={"X-User-Id": "bob"}).status_code == 200
+
+
+def test_middleware_answers_400_for_malformed_content_length():
+    controller = AdmissionController(max_wait=0, clock=FakeClock())
+    app = client(controller).app
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "method": "POST", "path": "/api/career-advice", "client": ("10.0.0.1", 1234),
+        "headers": [(b"content-length", b"nope")],
+    }
+    asyncio.run(AdmissionMiddleware(app, controller)(scope, receive, send))
+    assert sent[0]["status"] == 400
+    assert controller.stats["admitted"] == 0
@@ -0,0 +1,24 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+# Not entered as a context manager, so lifespan (HTTP pools, job workers, search index) does not run
+client = TestClient(main.app)
+JOBS = [{"description": "Python engineer"}]
+
+
+@pytest.mark.parametrize("top_k", [-1, main.ATS_BATCH_TOP_K_MAX + 1])
+def test_batch_top_k_out_of_range_is_rejected(top_k):
+    response = client.post("/api/resume/generate-ats/batch", params={"top_k": top_k},
+                           json={"resume_data": {}, "job_descriptions": JOBS})
+    assert response.status_code == 400
+    assert str(main.ATS_BATCH_TOP_K_MAX) in response.json()["detail"]
+
+
+def test_ats_score_is_local():
+    response = client.post("/api/resume/ats-score", json={
+        "resume_data": {"skills": ["Python"]}, "job_description": {"description": "Python and Go engineer"},
+    })
+    assert response.status_code == 200
+    assert response.json()["data"]["keyword_matches"] == ["python"]
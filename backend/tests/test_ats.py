@@ -0,0 +1,40 @@
+from ats import ATSScorer
+
+POSTINGS = [
+    "Python engineer with AWS and Docker, strong team player",
+    "Java developer, team player, Kubernetes",
+    "Data scientist: Python, SQL, team collaboration",
+]
+
+
+def test_fitted_idf_discounts_common_terms(tmp_path, monkeypatch):
+    path = tmp_path / "idf.json"
+    ATSScorer.fit(POSTINGS).save(str(path))
+    monkeypatch.setenv("ATS_IDF_PATH", str(path))
+    scorer = ATSScorer.from_env()
+    assert scorer.documents == 3
+    assert scorer.idf("python") < scorer.idf("kubernetes")
+
+
+def test_missing_default_table_falls_back_to_uniform_idf(tmp_path, monkeypatch):
+    monkeypatch.delenv("ATS_IDF_PATH", raising=False)
+    monkeypatch.setattr("ats.DEFAULT_IDF_PATH", str(tmp_path / "missing.json"))
+    scorer = ATSScorer.from_env()
+    assert scorer.idf("python") == scorer.idf("kubernetes")
+
+
+def test_keywords_break_ties_alphabetically():
+    scorer = ATSScorer(max_keywords=3)
+    assert list(scorer.keywords("zeta yankee xray alpha")) == ["alpha", "xray", "yankee"]
+
+
+def test_rank_agrees_with_score():
+    scorer = ATSScorer.fit(POSTINGS, max_keywords=4)
+    resume = {"skills": ["Python", "SQL"], "workExperience": [{"position": "Data Scientist"}]}
+    ranking = scorer.rank(resume, POSTINGS)
+    assert [match["index"] for match in ranking][0] == 2
+    for match in ranking:
+        single = scorer.score(resume, POSTINGS[match["index"]])
+        assert match["ats_score"] == single["ats_score"]
+        assert match["keyword_matches"] == single["keyword_matches"]
+        assert match["missing_keywords"] == single["missing_keywords"]
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from extraction import SectionStreamParser, empty_section, repair_json, validate_section
+
+RESPONSE = {
+    "personalInfo": {"name": "Ada Lovelace", "email": "ada@example.com"},
+    "skills": {"technical": ["Python", "C, and \"quoted\" {braces}"]},
+    "workExperience": [{"company": "Acme", "position": "Engineer"}],
+}
+
+
+def feed_all(parser: SectionStreamParser, chunks) -> dict:
+    members = {}
+    for chunk in chunks:
+        members.update(parser.feed(chunk))
+    return members
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_members_are_parsed_across_split_chunks(size):
+    text = json.dumps(RESPONSE)
+    parser = SectionStreamParser()
+    assert feed_all(parser, [text[i:i + size] for i in range(0, len(text), size)]) == RESPONSE
+    assert parser.malformed == []
+    assert parser.truncated() is None
+
+
+def test_members_are_returned_as_soon_as_complete():
+    parser = SectionStreamParser()
+    assert parser.feed('```json\n{"skills": {"technical": ["Go"]}, "educa') == [("skills", {"technical": ["Go"]})]
+    assert parser.feed('tion": []}\n```') == [("education", [])]
+
+
+def test_sections_arriving_out_of_order():
+    text = json.dumps(dict(reversed(list(RESPONSE.items()))))
+    parser = SectionStreamParser()
+    members = feed_all(parser, [text[i:i + 5] for i in range(0, len(text), 5)])
+    assert members == RESPONSE
+    assert list(members) == list(reversed(list(RESPONSE)))
+
+
+def test_malformed_member_is_kept_for_repair():
+    parser = SectionStreamParser()
+    members = feed_all(parser, ['{"skills": {"technical": ["Go",]}, ', '"education": []}'])
+    assert members == {"education": []}
+    assert parser.malformed == [("skills", '{"technical": ["Go",]}')]
+    assert repair_json(parser.malformed[0][1]) == {"technical": ["Go"]}
+
+
+def test_truncated_stream_reports_open_member():
+    parser = SectionStreamParser()
+    members = feed_all(parser, ['{"education": [], "workExperience": [{"company": "Acme"}, {"comp'])
+    assert members == {"education": []}
+    key, partial = parser.truncated()
+    assert key == "workExperience"
+    # The cut-off item is closed where it was opened; the finished ones are kept
+    assert repair_json(partial)[0] == {"company": "Acme"}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": 1,}', {"a": 1}),
+    ('{"a": True, "b": None, "c": "True"}', {"a": True, "b": None, "c": "True"}),
+    # A trailing number may itself be cut off, so it is dropped
+    ('[1, 2, 3', [1, 2]),
+    ('{"a": [1, 2], "b": {"c": "cut', {"a": [1, 2], "b": {}}),
+    ('{"a": "x, y", "b": [', {"a": "x, y", "b": []}),
+    ('{"a": "escaped \\" quote", "b": 1', {"a": 'escaped " quote'}),
+])
+def test_repair_json(text, expected):
+    assert repair_json(text) == expected
+
+
+def test_repair_json_gives_up_on_garbage():
+    with pytest.raises(ValueError, match="Could not repair JSON"):
+        repair_json("not json at all")
+
+
+def test_empty_sections_validate():
+    for name in ("education", "workExperience", "projects", "skills", "personalInfo"):
+        assert validate_section(name, empty_section(name)) == empty_section(name)
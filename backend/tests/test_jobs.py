@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from jobs import CANCELLED, RUNNING, SUCCEEDED, JobLimitExceeded, JobNotCancellable, JobQueue, SQLiteJobStore
+
+
+async def wait_for(queue: JobQueue, job_id: str, status: str) -> None:
+    for _ in range(100):
+        if (await queue.get(job_id)).status == status:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job never became {status}")
+
+
+def test_job_result_is_stored():
+    async def run():
+        queue = JobQueue(workers=1)
+        queue.start()
+        job = await queue.submit("test", lambda: asyncio.sleep(0, result=42))
+        await wait_for(queue, job.id, SUCCEEDED)
+        assert (await queue.get(job.id)).result == 42
+        await queue.stop()
+
+    asyncio.run(run())
+
+
+def test_per_user_limit():
+    async def run():
+        queue = JobQueue(workers=1, per_user_limit=1)
+        await queue.submit("test", lambda: asyncio.sleep(1), user_id="alice")
+        with pytest.raises(JobLimitExceeded):
+            await queue.submit("test", lambda: asyncio.sleep(1), user_id="alice")
+        await queue.submit("test", lambda: asyncio.sleep(1), user_id="bob")
+        await queue.stop()
+
+    asyncio.run(run())
+
+
+def test_cancel_running_job_in_this_worker():
+    async def run():
+        queue = JobQueue(workers=1)
+        job = await queue.submit("test", lambda: asyncio.sleep(10))
+        await wait_for(queue, job.id, RUNNING)
+        await queue.cancel(job.id)
+        await wait_for(queue, job.id, CANCELLED)
+        await queue.stop()
+
+    asyncio.run(run())
+
+
+def test_cancel_across_workers(tmp_path):
+    path = str(tmp_path / "jobs.db")
+
+    async def run():
+        owner, other = JobQueue(SQLiteJobStore(path), workers=1), JobQueue(SQLiteJobStore(path), workers=1)
+        running = await owner.submit("test", lambda: asyncio.sleep(10))
+        await wait_for(owner, running.id, RUNNING)
+        with pytest.raises(JobNotCancellable):
+            await other.cancel(running.id)
+        assert (await other.get(running.id)).status == RUNNING
+
+        # Queued behind the running job, so another worker can still cancel it
+        queued = await owner.submit("test", lambda: asyncio.sleep(0))
+        assert (await other.cancel(queued.id)).status == CANCELLED
+        await owner.cancel(running.id)
+        await wait_for(owner, running.id, CANCELLED)
+        assert (await owner.get(queued.id)).status == CANCELLED
+        await owner.stop()
+
+    asyncio.run(run())
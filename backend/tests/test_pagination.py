@@ -0,0 +1,52 @@
+import base64
+import json
+import uuid
+
+import pytest
+
+from pagination import decode_cursor, encode_cursor, etag_matches, keyset_filter, parse_fields
+
+ROW_ID = str(uuid.uuid4())
+
+
+def raw_cursor(*values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("created_at", ["2024-05-01T12:30:00.123456", "2024-05-01T12:30:00+00:00"])
+def test_cursor_round_trip(created_at):
+    assert decode_cursor(encode_cursor(created_at, ROW_ID)) == (created_at, ROW_ID)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    raw_cursor("2024-05-01T12:30:00"),
+    raw_cursor(1, ROW_ID),
+    raw_cursor("2024-05-01T12:30:00", None),
+    raw_cursor('2024-05-01",id.gt."0', ROW_ID),
+    raw_cursor("2024-05-01T12:30:00", f'{ROW_ID}"),or(id.neq."x'),
+])
+def test_invalid_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+def test_keyset_filter_uses_decoded_values():
+    created_at, row_id = decode_cursor(encode_cursor("2024-05-01T12:30:00", ROW_ID))
+    assert keyset_filter(created_at, row_id) == (
+        f'created_at.lt."2024-05-01T12:30:00",and(created_at.eq."2024-05-01T12:30:00",id.lt."{ROW_ID}")'
+    )
+
+
+def test_parse_fields():
+    assert parse_fields(None, ["id", "name"], ["id"]) == ["id"]
+    assert parse_fields("name, id", ["id", "name"], ["id"]) == ["name", "id"]
+    with pytest.raises(ValueError, match="Unknown fields: secret"):
+        parse_fields("id,secret", ["id", "name"], ["id"])
+
+
+def test_etag_matches():
+    assert etag_matches('W/"abc", "def"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches(None, '"abc"')
+    assert not etag_matches('"def"', '"abc"')
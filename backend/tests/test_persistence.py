@@ -0,0 +1,78 @@
+import asyncio
+
+from persistence import WriteBehindQueue, rejected
+
+
+class APIError(Exception):
+    """Stands in for postgrest's APIError, which carries the PostgREST error code."""
+
+    def __init__(self, code):
+        super().__init__(f"error {code}")
+        self.code = code
+
+
+class FakeTable:
+    def __init__(self, client, name):
+        self.client, self.name, self.rows = client, name, None
+
+    def insert(self, rows):
+        self.rows = rows
+        return self
+
+    def execute(self):
+        self.client.requests += 1
+        if self.client.unavailable:
+            self.client.unavailable -= 1
+            raise APIError(503)
+        if any(row.get("user_id") is None for row in self.rows):
+            raise APIError("23502")
+        self.client.stored.extend(self.rows)
+
+
+class FakeClient:
+    def __init__(self, unavailable: int = 0):
+        self.stored, self.requests, self.unavailable = [], 0, unavailable
+
+    def table(self, name):
+        return FakeTable(self, name)
+
+
+def write(client, rows):
+    async def run():
+        queue = WriteBehindQueue(client, batch_size=len(rows), backoff=0)
+        # put() does not yield while the queue has room, so the worker sees all rows as one batch
+        for row in rows:
+            await queue.put("career_interactions", row)
+        await queue.stop()
+        return queue.stats
+
+    return asyncio.run(run())
+
+
+def test_rejected_codes():
+    assert rejected(APIError("23502"))
+    assert rejected(APIError("22P02"))
+    assert rejected(APIError("PGRST204"))
+    assert rejected(APIError(400))
+    assert not rejected(APIError(503))
+    assert not rejected(APIError("PGRST301"))
+    assert not rejected(ConnectionError("reset"))
+
+
+def test_bad_row_is_dropped_without_losing_its_batch():
+    rows = [{"user_id": f"user-{i}"} for i in range(8)]
+    rows[5]["user_id"] = None
+    client = FakeClient()
+    stats = write(client, rows)
+    assert len(client.stored) == 7
+    assert stats["written"] == 7
+    assert stats["rejected"] == 1
+    assert stats["retries"] == 0
+
+
+def test_unavailable_database_is_retried():
+    client = FakeClient(unavailable=2)
+    stats = write(client, [{"user_id": f"user-{i}"} for i in range(4)])
+    assert len(client.stored) == 4
+    assert stats["retries"] == 2
+    assert stats["rejected"] == stats["failed"] == 0
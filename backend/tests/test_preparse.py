@@ -0,0 +1,45 @@
+import pytest
+
+from preparse import PHONE_RE, preparse_resume
+
+RESUME = """Jane Doe
+jane.doe@example.com | +1 (555) 123-4567 | linkedin.com/in/janedoe
+Pune, India
+
+Experience
+Software Engineer, Acme Corp 2019 - 2023
+
+Skills
+Python, SQL, Docker
+"""
+
+
+@pytest.mark.parametrize("text", ["+1 (555) 123-4567", "555-123-4567", "+49 30 1234 5678", "(020) 7946 0958"])
+def test_phone_numbers_match(text):
+    assert PHONE_RE.search(f"Call {text} today").group(0) == text
+
+
+@pytest.mark.parametrize("text", ["2019 - 2023", "2015-2019", "2010 2014 2018", "2019/2023"])
+def test_year_ranges_are_not_phone_numbers(text):
+    assert PHONE_RE.search(f"Acme Corp {text}") is None
+
+
+def test_contact_details_are_extracted_and_stripped():
+    result = preparse_resume(RESUME)
+    info = result["personalInfo"]
+    assert info["name"] == "Jane Doe"
+    assert info["email"] == "jane.doe@example.com"
+    assert info["phone"] == "+1 (555) 123-4567"
+    assert info["linkedin"] == "linkedin.com/in/janedoe"
+    body = result["body"]
+    assert "jane.doe@example.com" not in body and "555" not in body and "Jane Doe" not in body
+    assert "Pune, India" in body
+    assert "2019 - 2023" in body
+    assert result["keyword_density"]["Python"] > 0
+
+
+def test_headerless_resume_keeps_dates_and_later_lines():
+    text = "\n".join(["Jane Doe", "jane@example.com"] + [f"Worked at Company {i}, 2010 - 2012" for i in range(8)])
+    body = preparse_resume(text)["body"]
+    assert "jane@example.com" not in body
+    assert body.count("2010 - 2012") == 8
@@ -0,0 +1,57 @@
+import threading
+
+from search import ResumeIndex
+
+
+def resume(name: str, skills, company: str = "Acme") -> dict:
+    return {
+        "personalInfo": {"name": name, "location": "Berlin"},
+        "workExperience": [{"position": "Engineer", "company": company}],
+        "skills": skills,
+    }
+
+
+def names(results: dict) -> list:
+    return [result["name"] for result in results["results"]]
+
+
+def test_other_workers_appends_are_picked_up_by_refresh(tmp_path):
+    path = str(tmp_path / "index.jsonl")
+    first, second = ResumeIndex(path, embedding_dim=16), ResumeIndex(path, embedding_dim=16)
+    first.add("1", resume("Ada", ["python"]), "2024-01-01")
+    assert second.search(skills=["python"])["total"] == 0
+    second.refresh()
+    assert names(second.search(skills=["python"])) == ["Ada"]
+
+
+def test_replay_compacts_replaced_documents(tmp_path):
+    path = str(tmp_path / "index.jsonl")
+    index = ResumeIndex(path, embedding_dim=16)
+    for version in range(3):
+        index.add("1", resume("Ada", ["python"], company=f"Acme {version}"), "2024-01-01")
+    index.close()
+
+    reloaded = ResumeIndex(path, embedding_dim=16)
+    assert len(reloaded) == 1
+    assert names(reloaded.search(company="Acme 2")) == ["Ada"]
+    with open(path, encoding="utf-8") as f:
+        assert len(f.readlines()) == 1
+
+
+def test_refresh_in_threads_while_adding(tmp_path):
+    path = str(tmp_path / "index.jsonl")
+    writer, reader = ResumeIndex(path, embedding_dim=16), ResumeIndex(path, embedding_dim=16)
+
+    def add(start: int) -> None:
+        for i in range(start, start + 50):
+            writer.add(str(i), resume(f"Person {i}", ["python"]), f"2024-01-{i % 28 + 1:02d}")
+
+    threads = [threading.Thread(target=add, args=(start,)) for start in (0, 50)]
+    threads += [threading.Thread(target=reader.refresh) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    reader.refresh()
+    assert writer.search(skills=["python"])["total"] == 100
+    assert reader.search(skills=["python"])["total"] == 100
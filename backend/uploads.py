@@ -0,0 +1,78 @@
+from typing import Dict
+
+from fastapi import HTTPException, UploadFile, status
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CHUNK_SIZE = 64 * 1024
+# Allowance for multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD = 16 * 1024
+
+
+class RequestSizeLimitMiddleware:
+    """Reject request bodies above a per-path limit before they are buffered.
+
+    Requests that declare a larger Content-Length are refused immediately;
+    chunked uploads are cut off as soon as the received bytes exceed the
+    limit, so an oversized upload never reaches the multipart parser.
+    """
+
+    def __init__(self, app: ASGIApp, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = self.limits.get(scope.get("path")) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and int(content_length) > limit:
+            await self._reject(send)
+            return
+
+        received = 0
+        rejected = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, rejected
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    rejected = True
+                    raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+            return message
+
+        try:
+            await self.app(scope, limited_receive, send)
+        except HTTPException:
+            if not rejected:
+                raise
+            await self._reject(send)
+
+    @staticmethod
+    async def _reject(send: Send) -> None:
+        body = b'{"detail":"File size exceeds the upload limit"}'
+        await send({
+            "type": "http.response.start",
+            "status": status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+async def read_upload(file: UploadFile, max_size: int) -> bytes:
+    """Read an upload in chunks, aborting with 413 as soon as it exceeds ``max_size``."""
+    buffer = bytearray()
+    while True:
+        chunk = await file.read(CHUNK_SIZE)
+        if not chunk:
+            return bytes(buffer)
+        if len(buffer) + len(chunk) > max_size:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File size exceeds the {max_size // (1024 * 1024)}MB limit"
+            )
+        buffer += chunk
@@ -25,6 +25,8 @@ export interface PortfolioResult {
     professional: PortfolioTemplate;
     dynamic: PortfolioTemplate;
   };
+  // Styles that could not be generated, with the reason
+  errors: Record<string, string>;
 }
 
 export interface ATSResumeResult {
@@ -62,10 +64,28 @@ export const analyzeResume = async (file: File): Promise<ResumeAnalysisResult> =
   }
 };
 
+const JOB_POLL_INTERVAL_MS = 2000;
+
+// Poll a background job until it finishes and return its result
+export const waitForJob = async (jobId: string): Promise<any> => {
+  while (true) {
+    const response = await axios.get(`${API_BASE_URL}/api/jobs/${jobId}`);
+    const job = response.data.data;
+    if (job.status === 'succeeded') {
+      return job.result;
+    }
+    if (job.status === 'failed' || job.status === 'cancelled') {
+      throw new Error(job.error || `Job ${job.status}`);
+    }
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+  }
+};
+
 export const generatePortfolio = async (resumeData: any): Promise<{ data: PortfolioResult }> => {
   try {
     const response = await axios.post(`${API_BASE_URL}/api/resume/generate-portfolio`, resumeData);
-    return response.data;
+    const { portfolios, errors } = await waitForJob(response.data.job_id);
+    return { data: { data: portfolios, errors } };
   } catch (error) {
     if (axios.isAxiosError(error)) {
       throw new Error(error.response?.data?.detail || 'Failed to generate portfolio');
@@ -8,6 +8,7 @@ import { Card } from '@/components/ui/card';
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs';
 import GeneratedContent from './GeneratedContent';
 import { toast } from 'sonner';
+import { waitForJob } from '@/api/resume';
 
 interface ResumeData {
   personalInfo: {
@@ -136,7 +137,7 @@ const UploadResume: React.FC = () => {
       setResumeData(extractedData);
       setProcessingStep('Generating portfolio...');
 
-      // Generate portfolio
+      // Generate portfolio (queued as a background job)
       const portfolioResponse = await fetch('http://localhost:8000/api/resume/generate-portfolio', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
@@ -148,7 +149,11 @@ const UploadResume: React.FC = () => {
         throw new Error(errorData.detail || 'Failed to generate portfolio');
       }
       
-      const { data: portfolioData } = await portfolioResponse.json();
+      const { job_id: portfolioJobId } = await portfolioResponse.json();
+      const { portfolios: portfolioData, errors: portfolioErrors } = await waitForJob(portfolioJobId);
+      if (Object.keys(portfolioErrors).length > 0) {
+        toast.warning(`Some portfolio styles could not be generated: ${Object.keys(portfolioErrors).join(', ')}`);
+      }
       
       setGeneratedContent(prev => ({
         ...prev,
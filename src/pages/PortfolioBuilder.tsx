@@ -79,6 +79,9 @@ const PortfolioBuilder: React.FC = () => {
       const result = await generatePortfolio(resumeData);
       const portfolioData = result.data.data;
       setPortfolioData(portfolioData);
+      if (Object.keys(result.data.errors).length > 0) {
+        toast.warning(`Some portfolio styles could not be generated: ${Object.keys(result.data.errors).join(', ')}`);
+      }
       
       // Store portfolio data in session storage
       sessionStorage.setItem('portfolioData', JSON.stringify(portfolioData));
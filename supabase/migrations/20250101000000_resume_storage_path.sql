@@ -0,0 +1,21 @@
+-- Resume files move to object storage; rows keep a reference to the object
+ALTER TABLE resumes ADD COLUMN IF NOT EXISTS storage_path TEXT;
+
+-- Rows that reference an object no longer need the base64 copy
+ALTER TABLE resumes ALTER COLUMN file_content DROP NOT NULL;
+
+-- Private bucket used by RESUME_STORAGE=supabase (RESUME_STORAGE_BUCKET defaults to "resumes")
+INSERT INTO storage.buckets (id, name, public)
+VALUES ('resumes', 'resumes', false)
+ON CONFLICT (id) DO NOTHING;
+
+-- Drop existing policies if they exist
+DROP POLICY IF EXISTS "Enable resume file uploads" ON storage.objects;
+DROP POLICY IF EXISTS "Enable resume file reads" ON storage.objects;
+
+-- Same access as the resumes table
+CREATE POLICY "Enable resume file uploads" ON storage.objects
+    FOR INSERT WITH CHECK (bucket_id = 'resumes');
+
+CREATE POLICY "Enable resume file reads" ON storage.objects
+    FOR SELECT USING (bucket_id = 'resumes');